@@ -21,6 +21,48 @@ size_t get_free_RAM() {
   return (&stack_dummy - sbrk(0));
 }
 
+// CRC-16/CCITT-FALSE: polynomial 0x1021, initial value 0xFFFF
+uint16_t crc16_ccitt(const uint8_t* data, size_t len, uint16_t crc) {
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t) data[i] << 8;
+    for (uint8_t j = 0; j < 8; j++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+// Wrap the payload into a binary state frame and send it in one go
+void write_state_frame(Stream& Ser, const uint8_t* payload, uint8_t len) {
+  uint8_t frame[4 + 255 + 2];
+  uint16_t crc;
+
+  frame[0] = STATE_FRAME_SYNC_1;
+  frame[1] = STATE_FRAME_SYNC_2;
+  frame[2] = STATE_FRAME_VERSION;
+  frame[3] = len;
+  memcpy(&frame[4], payload, len);
+  crc = crc16_ccitt(&frame[2], len + 2);
+  frame[4 + len] = crc & 0xFF;
+  frame[5 + len] = crc >> 8;
+  Ser.write(frame, len + 6);
+}
+
+// Helpers to pack values into a binary state frame payload
+static void pack_u8(uint8_t* buf, uint8_t& i, uint8_t value) {
+  buf[i++] = value;
+}
+
+static void pack_u32(uint8_t* buf, uint8_t& i, uint32_t value) {
+  memcpy(&buf[i], &value, 4);
+  i += 4;
+}
+
+static void pack_float(uint8_t* buf, uint8_t& i, float value) {
+  memcpy(&buf[i], &value, 4);
+  i += 4;
+}
+
 /*******************************************************************************
   State_Arduino_1
   Reflects the actual state and readings of Arduino #1
@@ -82,6 +124,30 @@ void State_Arduino_1::report(Stream& Ser) {
   Ser.println(msg);
 }
 
+// Send the full state and readings of the Arduino over the passed serial port
+// as a binary state frame. Payload of 43 bytes, same order as 'report'
+void State_Arduino_1::report_binary(Stream& Ser) {
+  uint8_t buf[43];
+  uint8_t i = 0;
+
+  pack_u32(buf, i, get_free_RAM());
+  pack_u8(buf, i, ENA_OTP);
+  pack_u8(buf, i, relay_01); pack_u8(buf, i, relay_02);
+  pack_u8(buf, i, relay_03); pack_u8(buf, i, relay_04);
+  pack_u8(buf, i, relay_05); pack_u8(buf, i, relay_06);
+  pack_u8(buf, i, relay_07); pack_u8(buf, i, relay_08);
+  pack_u8(buf, i, relay_09);
+  pack_float(buf, i, read_GVF_P_diff_bitV);
+  pack_float(buf, i, read_GVF_P_diff_mA);
+  pack_float(buf, i, read_GVF_P_diff_mbar);
+  pack_float(buf, i, set_pump_speed_mA);
+  pack_float(buf, i, read_flow_rate_bitV);
+  pack_float(buf, i, read_flow_rate_mA);
+  pack_u8(buf, i, ENA_PID_pump);
+  pack_float(buf, i, setpoint_flow_rate_m3h);
+  write_state_frame(Ser, buf, i);
+}
+
 /*******************************************************************************
   State_Arduino_2
   Reflects the actual state and readings of Arduino #2
@@ -127,3 +193,22 @@ void State_Arduino_2::report(Stream& Ser) {
         floater_switch + '\t' + FSM_FS_exec + '\t' + FS_unread_msgs_count;
   Ser.println(msg);
 }
+
+// Send the full state and readings of the Arduino over the passed serial port
+// as a binary state frame. Payload of 19 bytes, same order as 'report'
+void State_Arduino_2::report_binary(Stream& Ser) {
+  uint8_t buf[19];
+  uint8_t i = 0;
+
+  pack_u32(buf, i, get_free_RAM());
+  pack_u8(buf, i, relay_01); pack_u8(buf, i, relay_02);
+  pack_u8(buf, i, relay_03); pack_u8(buf, i, relay_04);
+  pack_u8(buf, i, relay_05); pack_u8(buf, i, relay_06);
+  pack_u8(buf, i, relay_07); pack_u8(buf, i, relay_08);
+  pack_u8(buf, i, prox_switch_1); pack_u8(buf, i, prox_switch_2);
+  pack_u8(buf, i, prox_switch_3); pack_u8(buf, i, prox_switch_4);
+  pack_u8(buf, i, floater_switch);
+  pack_u8(buf, i, FSM_FS_exec);
+  pack_u8(buf, i, FS_unread_msgs_count);
+  write_state_frame(Ser, buf, i);
+}
@@ -16,6 +16,19 @@ char* float2string(float value, uint8_t precision);
 extern "C" char *sbrk(int i);
 size_t get_free_RAM();
 
+// Binary state frame, an alternative to the tab delimited ASCII report:
+//   sync bytes 0xA5 0x5A, version (uint8), payload length (uint8), payload,
+//   CRC-16/CCITT-FALSE (uint16) over version, length and payload.
+// All multi-byte values are little endian, which is native to the M0 Pro.
+// The payload holds the same fields in the same order as the ASCII report.
+// Bump the version whenever the payload layout changes.
+#define STATE_FRAME_VERSION 1
+#define STATE_FRAME_SYNC_1 0xA5
+#define STATE_FRAME_SYNC_2 0x5A
+
+uint16_t crc16_ccitt(const uint8_t* data, size_t len, uint16_t crc = 0xFFFF);
+void write_state_frame(Stream& ser, const uint8_t* payload, uint8_t len);
+
 // Finite state machine (FSM) programs of the filling system (FS)
 enum FSM_FS_PROGRAMS : uint8_t {FSM_FS_PROGRAMS_idle,
                                 FSM_FS_PROGRAMS_barrel_1_to_tunnel,
@@ -64,6 +77,9 @@ public:
   // Send the full state and readings of the Arduino over the serial port.
   // Tab delimited
   void report(Stream& ser);
+
+  // Same as 'report', but as a binary state frame
+  void report_binary(Stream& ser);
 };
 
 /*******************************************************************************
@@ -94,6 +110,9 @@ public:
   // Send the full state and readings of the Arduino over the serial port.
   // Tab delimited
   void report(Stream& ser);
+
+  // Same as 'report', but as a binary state frame
+  void report_binary(Stream& ser);
 };
 
 #endif
@@ -269,6 +269,11 @@ void setup() {
 uint32_t prevMillis_WDT_reset = 0;
 uint16_t millisPeriod_WDT_reset = 800;  // [msec] 800
 
+// Streaming mode: push the state as binary frame every N msec without being
+// queried by Python. Set by command "stream<N>", where 0 stops streaming.
+uint32_t prevMillis_stream = 0;
+uint16_t millisPeriod_stream = 0;       // [msec] 0
+
 // DEBUG info
 /*
 uint32_t prevMillis = 0;
@@ -392,6 +397,15 @@ void loop() {
     if (strcmpi(strCmd, "id?") == 0) {
       Ser_python.println("Arduino_#1");
 
+    } else if (strcmp(strCmd, "proto?") == 0) {
+      // Version of the binary state frame reported by "?b"
+      Ser_python.println(STATE_FRAME_VERSION);
+
+    } else if (strncmp(strCmd, "stream", 6) == 0) {
+      // Start pushing binary state frames every N msec, 0 to stop
+      millisPeriod_stream = max(parseFloatInString(strCmd, 6), 0);
+      prevMillis_stream = curMillis;
+
     } else if (strcmp(strCmd, "soft_reset") == 0) {
       // Switch all relays off
       relay_01.setStateToBeActuated(Relay::off);
@@ -525,6 +539,10 @@ void loop() {
       //prevMillis = curMillis;
 
       state.report(Ser_python);
+
+    } else if (strcmp(strCmd, "?b") == 0) {
+      // Same as "?", but as a binary state frame
+      state.report_binary(Ser_python);
     }
   }
 
@@ -643,6 +661,22 @@ void loop() {
   state.relay_08 = relay_08.update();
   state.relay_09 = relay_09.update();
 
+  // ---------------------------------------------------------------------------
+  //   Streaming mode
+  // ---------------------------------------------------------------------------
+
+  if ((millisPeriod_stream > 0) &&
+      (curMillis - prevMillis_stream >= millisPeriod_stream)) {
+    state.report_binary(Ser_python);
+
+    // Advance by whole periods to keep the push rate free of drift, but do
+    // not try to catch up when we fell behind by more than a period
+    prevMillis_stream += millisPeriod_stream;
+    if (curMillis - prevMillis_stream >= millisPeriod_stream) {
+      prevMillis_stream = curMillis;
+    }
+  }
+
   // ---------------------------------------------------------------------------
   //   Reset the watchdog timer (WDT)
   // ---------------------------------------------------------------------------
@@ -569,6 +569,11 @@ void setup() {
 uint32_t prevMillis_WDT_reset = 0;
 uint16_t millisPeriod_WDT_reset = 800;  // [msec] 800
 
+// Streaming mode: push the state as binary frame every N msec without being
+// queried by Python. Set by command "stream<N>", where 0 stops streaming.
+uint32_t prevMillis_stream = 0;
+uint16_t millisPeriod_stream = 0;       // [msec] 0
+
 // DEBUG info
 /*
 uint32_t prevMillis = 0;
@@ -645,6 +650,15 @@ void loop() {
     if (strcmpi(strCmd, "id?") == 0) {
       Ser_python.println("Arduino_#2");
 
+    } else if (strcmp(strCmd, "proto?") == 0) {
+      // Version of the binary state frame reported by "?b"
+      Ser_python.println(STATE_FRAME_VERSION);
+
+    } else if (strncmp(strCmd, "stream", 6) == 0) {
+      // Start pushing binary state frames every N msec, 0 to stop
+      millisPeriod_stream = max(parseFloatInString(strCmd, 6), 0);
+      prevMillis_stream = curMillis;
+
     } else if (strcmp(strCmd, "soft_reset") == 0) {
       // Set filling system program to idle
       FSM_FS.immediateTransitionTo(FS_idle);
@@ -744,6 +758,16 @@ void loop() {
       if (!FS_msg_queue.isEmpty())
         Ser_python.println(FS_msg_queue.pop());
 
+    } else if (strcmp(strCmd, "FS_msgs?") == 0) {
+      // Pop all string messages from the queue in one framed reply: a line
+      // with the number of messages, one line per message and a terminator
+      // line. Saves the Python side a query round-trip per message.
+      Ser_python.println(FS_msg_queue.count());
+      while (!FS_msg_queue.isEmpty()) {
+        Ser_python.println(FS_msg_queue.pop());
+      }
+      Ser_python.println("FS_msgs_end");
+
     } else if (strcmp(strCmd, "FS_clear_msgs") == 0) {
       // Clear all string messages from the queue
       FS_msg_queue.clear();
@@ -755,6 +779,10 @@ void loop() {
       //uint32_t tick = millis();
       state.report(Ser_python);
       //Ser_debug << millis() - tick << endl;
+
+    } else if (strcmp(strCmd, "?b") == 0) {
+      // Same as "?", but as a binary state frame
+      state.report_binary(Ser_python);
     }
   }
 
@@ -800,6 +828,22 @@ void loop() {
     state.FSM_FS_exec = FSM_FS_PROGRAMS_tunnel_to_sewer;
   }
 
+  // ---------------------------------------------------------------------------
+  //   Streaming mode
+  // ---------------------------------------------------------------------------
+
+  if ((millisPeriod_stream > 0) &&
+      (curMillis - prevMillis_stream >= millisPeriod_stream)) {
+    state.report_binary(Ser_python);
+
+    // Advance by whole periods to keep the push rate free of drift, but do
+    // not try to catch up when we fell behind by more than a period
+    prevMillis_stream += millisPeriod_stream;
+    if (curMillis - prevMillis_stream >= millisPeriod_stream) {
+      prevMillis_stream = curMillis;
+    }
+  }
+
   // ---------------------------------------------------------------------------
   //   Reset the watchdog timer (WDT)
   // ---------------------------------------------------------------------------
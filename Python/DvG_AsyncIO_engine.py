@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Single-threaded asyncio engine for the periodical data acquisition of many
+I/O devices, as an alternative to 'DvG_dev_Base__pyqt_lib', where each device
+gets its own pair of DAQ and send threads.
+
+All device polling loops run as coroutines on one asyncio event loop, which
+runs in one thread. Device I/O that can wait without blocking, like a serial
+port or a UDP socket, is awaited on the event loop itself, see the transports
+below. Blocking I/O, like VISA, is handed to a small pool of executor threads
+that is shared by all devices. The results are bridged to the main/GUI thread
+by Qt signals, which Qt delivers as queued connections.
+
+    engine = AsyncIO_engine()
+    engine.signal_DAQ_updated.connect(update_GUI)   # Receives the device name
+
+    async def DAQ_pt104():
+        [success, reply] = await pt104_transport.query(b"...")
+        ...
+        return success
+
+    engine.add_poller("PT104", DAQ_pt104, interval_ms=1000)
+    engine.add_poller("PSU_1", engine.blocking(psu_pyqt.DAQ_update), 200)
+    engine.start()
+    ...
+    # Send a job from the main/GUI thread, mutually exclusive with the poller
+    engine.send("PSU_1", engine.blocking(psu.set_V_source), 12.0)
+    ...
+    engine.stop()
+
+A job and the polling loop of the same device never run at the same time, as
+both hold the asyncio lock of that device. This replaces the device mutex.
+
+See 'DvG_AsyncIO_engine__benchmark.py' for a comparison of the CPU usage and
+the timing jitter against the threading model of 'DvG_dev_Base__pyqt_lib'.
+
+Classes:
+    AsyncIO_engine(N_executor_workers=4, parent=None):
+        Methods:
+            start():
+                Start the event loop thread and all pollers.
+            stop(timeout=2):
+                Cancel all pollers and jobs, and stop the event loop thread.
+            add_poller(name, DAQ_function, interval_ms,
+                       critical_not_alive_count=1):
+                Poll a device every 'interval_ms' by awaiting the coroutine
+                function 'DAQ_function', which returns True when successful.
+            send(name, function, *args):
+                Schedule 'function(*args)', a coroutine function, as a job of
+                the device 'name'. Safe to call from any thread.
+            run(coro, timeout=None):
+                Run the coroutine 'coro' on the event loop from another thread
+                and wait for its result.
+            run_blocking(func, *args):
+                Coroutine that runs the blocking 'func(*args)' in the executor.
+            blocking(func):
+                Wrap the blocking 'func' into a coroutine function.
+
+        Important members:
+            loop (asyncio.AbstractEventLoop):
+            pollers (dict of Poller, keyed by device name):
+                With members 'update_counter', 'not_alive_counter',
+                'obtained_DAQ_update_interval_ms' and 'N_overruns'.
+
+        Signals:
+            signal_DAQ_updated(str):
+                Emitted after each successful DAQ update of a device.
+            signal_connection_lost(str):
+                Emitted once a device has failed 'critical_not_alive_count'
+                DAQ updates. Its poller is stopped.
+
+    Serial_transport(engine, ser):
+        Non-blocking line-based transport on top of an opened 'serial.Serial'
+        port, read by the event loop when data arrives. POSIX only.
+
+        Methods:
+            write(msg):
+            query(msg, terminator=b"\\n", timeout=None):
+                Coroutine returning [success, reply].
+            read_until(terminator=b"\\n", timeout=None):
+                Coroutine returning [success, reply].
+            close():
+
+    UDP_transport():
+        Datagram transport, e.g. for the PT-104.
+
+        Methods:
+            open(engine, remote_addr):
+                Coroutine, class method returning the opened UDP_transport.
+            query(data, timeout=None):
+                Coroutine returning [success, reply datagram].
+            close():
+"""
+__author__      = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__         = ""
+__date__        = "17-10-2026"
+__version__     = "1.0.0"
+
+import asyncio
+import functools
+import threading
+import concurrent.futures
+
+import numpy as np
+from PyQt5 import QtCore
+
+from DvG_debug_functions import dprint, print_fancy_traceback as pft
+
+# Default time-out of the transports [s]
+TRANSPORT_TIMEOUT = 0.5
+
+# ------------------------------------------------------------------------------
+#   AsyncIO_engine
+# ------------------------------------------------------------------------------
+
+class AsyncIO_engine(QtCore.QObject):
+    signal_DAQ_updated     = QtCore.pyqtSignal(str)
+    signal_connection_lost = QtCore.pyqtSignal(str)
+
+    class Poller():
+        def __init__(self, name, DAQ_function, interval_ms,
+                     critical_not_alive_count):
+            self.name = name
+            self.DAQ_function = DAQ_function
+            self.interval_ms = interval_ms
+            self.critical_not_alive_count = critical_not_alive_count
+
+            self.lock = None        # asyncio.Lock, created on the event loop
+            self.task = None
+
+            self.update_counter = 0
+            self.not_alive_counter = 0
+            self.obtained_DAQ_update_interval_ms = np.nan
+            self.N_overruns = 0     # Updates that started later than planned
+
+    def __init__(self, N_executor_workers=4, parent=None):
+        super(AsyncIO_engine, self).__init__(parent=parent)
+
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=N_executor_workers,
+                thread_name_prefix="AsyncIO_engine_blocking")
+        self.pollers = dict()
+        self._thread = None
+
+    # --------------------------------------------------------------------------
+    #   Event loop thread
+    # --------------------------------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run_loop,
+                                        name="AsyncIO_engine", daemon=True)
+        self._thread.start()
+        for poller in self.pollers.values():
+            self.loop.call_soon_threadsafe(self._start_poller, poller)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+        # Let cancelled pollers and jobs finish their clean-up
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self, timeout=2):
+        if self._thread is None:
+            return
+
+        print("Closing thread %s " % "{:.<16}".format(self._thread.name),
+              end='')
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.executor.shutdown(wait=False)
+        if not self._thread.is_alive(): print("done.\n", end='')
+        else: print("FAILED.\n", end='')
+        self._thread = None
+
+    # --------------------------------------------------------------------------
+    #   Pollers
+    # --------------------------------------------------------------------------
+
+    def add_poller(self, name, DAQ_function, interval_ms,
+                   critical_not_alive_count=1):
+        poller = self.Poller(name, DAQ_function, interval_ms,
+                             critical_not_alive_count)
+        self.pollers[name] = poller
+        if self._thread is not None:
+            self.loop.call_soon_threadsafe(self._start_poller, poller)
+        return poller
+
+    def _start_poller(self, poller):
+        if poller.lock is None:
+            poller.lock = asyncio.Lock()
+        poller.task = self.loop.create_task(self._poll(poller))
+
+    async def _poll(self, poller):
+        interval = poller.interval_ms / 1e3
+        t_next = self.loop.time()
+        t_prev = np.nan
+
+        while True:
+            now = self.loop.time()
+            poller.obtained_DAQ_update_interval_ms = (now - t_prev) * 1e3
+            t_prev = now
+            poller.update_counter += 1
+
+            async with poller.lock:
+                try:
+                    success = await poller.DAQ_function()
+                except Exception as err:
+                    pft(err, 3)
+                    success = False
+
+            if success:
+                self.signal_DAQ_updated.emit(poller.name)
+            else:
+                poller.not_alive_counter += 1
+                if (poller.not_alive_counter >=
+                    poller.critical_not_alive_count):
+                    dprint("\nAsyncIO_engine %s: Determined device is not "
+                           "alive anymore." % poller.name)
+                    self.signal_connection_lost.emit(poller.name)
+                    return
+
+            # Fixed timeline, without accumulating drift. Resync when running
+            # behind.
+            t_next += interval
+            delay = t_next - self.loop.time()
+            if delay < 0:
+                poller.N_overruns += 1
+                t_next = self.loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    # --------------------------------------------------------------------------
+    #   Jobs
+    # --------------------------------------------------------------------------
+
+    def send(self, name, function, *args):
+        """Schedule the coroutine function 'function(*args)' as a job of the
+        device 'name', mutually exclusive with its poller. Safe to be called
+        from any thread.
+
+        Returns a concurrent.futures.Future of the result of the job.
+        """
+        return asyncio.run_coroutine_threadsafe(
+                self._job(self.pollers[name], function, args), self.loop)
+
+    async def _job(self, poller, function, args):
+        if poller.lock is None:
+            poller.lock = asyncio.Lock()
+        async with poller.lock:
+            try:
+                return await function(*args)
+            except Exception as err:
+                pft(err, 3)
+
+    def run(self, coro, timeout=None):
+        """Run the coroutine 'coro' on the event loop from another thread,
+        e.g. the main/GUI thread, and wait for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(
+                timeout)
+
+    # --------------------------------------------------------------------------
+    #   Blocking I/O
+    # --------------------------------------------------------------------------
+
+    async def run_blocking(self, func, *args):
+        """Run the blocking 'func(*args)', e.g. a VISA query, in the executor,
+        without blocking the event loop.
+        """
+        return await self.loop.run_in_executor(
+                self.executor, functools.partial(func, *args))
+
+    def blocking(self, func):
+        """Wrap the blocking 'func' into a coroutine function, e.g. to poll a
+        device that only has a blocking DAQ function.
+        """
+        async def wrapper(*args):
+            return await self.run_blocking(func, *args)
+        wrapper.__name__ = getattr(func, '__name__', 'blocking')
+        return wrapper
+
+# ------------------------------------------------------------------------------
+#   Serial_transport
+# ------------------------------------------------------------------------------
+
+class Serial_transport():
+    def __init__(self, engine, ser):
+        self.loop = engine.loop
+        self.ser = ser
+        self.ser.timeout = 0    # Non-blocking reads
+        self._buf = bytearray()
+        self._data_arrived = None
+
+        self.loop.call_soon_threadsafe(self.loop.add_reader,
+                                       self.ser.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        try:
+            data = self.ser.read(max(1, self.ser.in_waiting))
+        except Exception as err:
+            pft(err, 3)
+            return
+
+        self._buf += data
+        if self._data_arrived is not None:
+            self._data_arrived.set()
+
+    def write(self, msg):
+        if isinstance(msg, str):
+            msg = msg.encode()
+        self.ser.write(msg)
+
+    async def read_until(self, terminator=b"\n", timeout=None):
+        if timeout is None:
+            timeout = TRANSPORT_TIMEOUT
+        if self._data_arrived is None:
+            self._data_arrived = asyncio.Event()
+
+        t_deadline = self.loop.time() + timeout
+        while True:
+            i = self._buf.find(terminator)
+            if i >= 0:
+                reply = bytes(self._buf[:i])
+                del self._buf[:i + len(terminator)]
+                return [True, reply]
+
+            remaining = t_deadline - self.loop.time()
+            if remaining <= 0:
+                return [False, None]
+
+            self._data_arrived.clear()
+            try:
+                await asyncio.wait_for(self._data_arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def query(self, msg, terminator=b"\n", timeout=None):
+        """Write 'msg' and await the reply up to 'terminator'. Stale bytes of
+        an earlier reply that timed out are discarded.
+
+        Returns [success, reply], where 'reply' is bytes without terminator.
+        """
+        self._buf.clear()
+        self.write(msg)
+        return await self.read_until(terminator, timeout)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.remove_reader,
+                                       self.ser.fileno())
+
+# ------------------------------------------------------------------------------
+#   UDP_transport
+# ------------------------------------------------------------------------------
+
+class UDP_transport(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.transport = None
+        self._replies = asyncio.Queue()
+
+    @classmethod
+    async def open(cls, engine, remote_addr):
+        [_, protocol] = await engine.loop.create_datagram_endpoint(
+                cls, remote_addr=remote_addr)
+        return protocol
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self._replies.put_nowait(data)
+
+    def error_received(self, exc):
+        dprint("UDP_transport: %s" % exc)
+
+    async def query(self, data, timeout=None):
+        """Send the datagram 'data' and await the reply datagram. Stale
+        replies to earlier queries that timed out are discarded.
+
+        Returns [success, reply].
+        """
+        if timeout is None:
+            timeout = TRANSPORT_TIMEOUT
+
+        while not self._replies.empty():
+            self._replies.get_nowait()
+
+        self.transport.sendto(data)
+        try:
+            reply = await asyncio.wait_for(self._replies.get(), timeout)
+        except asyncio.TimeoutError:
+            return [False, None]
+        return [True, reply]
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark of `DvG_AsyncIO_engine` against the threading model of
+`DvG_dev_Base__pyqt_lib`, using simulated devices with the poll intervals of
+the MHT tunnel set-up.
+
+Each simulated device answers its DAQ query after a random latency. The
+threading model gives every device its own DAQ and send thread and waits for
+the answer by blocking, as the device libraries do. The asyncio engine polls
+all devices from a single event loop thread, once awaiting the answer without
+blocking, as with its serial and UDP transports, and once blocking inside the
+shared executor, as with VISA. In all cases the DAQ update is bridged to the
+main thread by a Qt signal.
+
+Reported per model: the CPU time used relative to the wall time, the number of
+OS threads, and the jitter of the obtained DAQ update interval of all devices
+with respect to their nominal interval.
+
+Dennis van Gils
+17-10-2026
+"""
+
+import sys
+import time
+import random
+import asyncio
+
+import numpy as np
+from PyQt5 import QtCore
+
+import DvG_dev_Base__pyqt_lib as Dev_Base_pyqt_lib
+from DvG_AsyncIO_engine import AsyncIO_engine
+
+DURATION = 10       # [s] per model
+
+# name, DAQ interval [ms], mean latency [ms], latency jitter [ms]
+DEVICES = ([("Arduinos", 100, 8, 2)] +
+           [("PSU_%i" % i, 200, 15, 5) for i in range(1, 4)] +
+           [("MUX_1", 1000, 40, 10), ("MUX_2", 1000, 40, 10),
+            ("MFC", 200, 5, 1), ("chiller", 1000, 30, 5),
+            ("PT104", 1000, 2, 1),
+            ("trav_horz", 250, 5, 1), ("trav_vert", 250, 5, 1)])
+
+class Simulated_device():
+    def __init__(self, name, latency_ms, jitter_ms):
+        self.name = name
+        self.is_alive = True
+        self.mutex = None
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tick_times = []
+
+    def _latency(self):
+        return max(0, random.gauss(self.latency_ms, self.jitter_ms)) / 1e3
+
+    def query_blocking(self):
+        self.tick_times.append(time.perf_counter())
+        time.sleep(self._latency())
+        return True
+
+    async def query_async(self):
+        self.tick_times.append(time.perf_counter())
+        await asyncio.sleep(self._latency())
+        return True
+
+def N_OS_threads():
+    """Number of OS threads of this process, Linux only."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+def create_devices():
+    return [(Simulated_device(name, latency_ms, jitter_ms), interval_ms)
+            for (name, interval_ms, latency_ms, jitter_ms) in DEVICES]
+
+def run_Qt_for(app, duration):
+    QtCore.QTimer.singleShot(round(duration * 1e3), app.quit)
+    app.exec_()
+
+def run_threading_model(app):
+    devices = create_devices()
+    N_signals = [0]
+
+    def count_signal():
+        N_signals[0] += 1
+
+    devs_pyqt = []
+    for (dev, interval_ms) in devices:
+        dev_pyqt = Dev_Base_pyqt_lib.Dev_Base_pyqt(None)
+        dev_pyqt.attach_device(dev)
+        dev_pyqt.create_worker_DAQ(interval_ms, dev.query_blocking,
+                                   DAQ_timer_type=QtCore.Qt.PreciseTimer)
+        dev_pyqt.create_worker_send()
+        dev_pyqt.signal_DAQ_updated.connect(count_signal)
+        devs_pyqt.append(dev_pyqt)
+
+    for dev_pyqt in devs_pyqt:
+        dev_pyqt.start_thread_worker_DAQ()
+        dev_pyqt.start_thread_worker_send()
+
+    result = measure(app, devices, N_signals)
+    for dev_pyqt in devs_pyqt:
+        dev_pyqt.close_all_threads()
+    return result
+
+def run_engine_model(app, blocking):
+    devices = create_devices()
+    N_signals = [0]
+
+    def count_signal(name):
+        N_signals[0] += 1
+
+    engine = AsyncIO_engine()
+    engine.signal_DAQ_updated.connect(count_signal)
+    for (dev, interval_ms) in devices:
+        engine.add_poller(dev.name,
+                          engine.blocking(dev.query_blocking) if blocking
+                          else dev.query_async, interval_ms)
+    engine.start()
+
+    result = measure(app, devices, N_signals)
+    engine.stop()
+    return result
+
+def measure(app, devices, N_signals):
+    # Let all threads settle before measuring
+    run_Qt_for(app, 1)
+    N_threads = N_OS_threads()
+    for (dev, _) in devices:
+        dev.tick_times.clear()
+    N_signals[0] = 0
+
+    t0_cpu = time.process_time()
+    t0 = time.perf_counter()
+    run_Qt_for(app, DURATION)
+    cpu_pct = (time.process_time() - t0_cpu) / (time.perf_counter() - t0) * 100
+
+    deviations = np.concatenate(
+            [np.diff(dev.tick_times) * 1e3 - interval_ms
+             for (dev, interval_ms) in devices])
+    return (cpu_pct, N_threads, N_signals[0], deviations)
+
+# ------------------------------------------------------------------------------
+#   Main
+# ------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    app = QtCore.QCoreApplication(sys.argv)
+
+    print("%i simulated devices, %i s per model\n" % (len(DEVICES), DURATION))
+
+    rows = []
+    for (label, run) in (
+            ("threads (2 per device)", run_threading_model),
+            ("asyncio, non-blocking", lambda app: run_engine_model(app, False)),
+            ("asyncio, executor", lambda app: run_engine_model(app, True))):
+        [cpu_pct, N_threads, N_updates, deviations] = run(app)
+        abs_dev = np.abs(deviations)
+        rows.append("%-26s %7.1f %8i %8i %10.2f %10.2f %10.2f" %
+                    (label, cpu_pct, N_threads, N_updates, np.std(deviations),
+                     np.percentile(abs_dev, 99), np.max(abs_dev)))
+
+    print("\n%-26s %7s %8s %8s %10s %10s %10s" %
+          ("model", "CPU [%]", "threads", "updates", "jitter std",
+           "jitter p99", "jitter max"))
+    print("%-26s %7s %8s %8s %10s %10s %10s" %
+          ("", "", "", "", "[ms]", "[ms]", "[ms]"))
+    print("\n".join(rows))
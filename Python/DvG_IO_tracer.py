@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Class IO_tracer records every device I/O transaction, i.e. every call to
+'write', 'query' and alike of a device instance, into a binary ring file: when
+it was made, by which device, the command, the number of bytes sent plus
+received, the latency and whether it succeeded. Intended to find out which
+transaction was slow when a run shows hiccups in its DAQ updates. Opt-in, e.g.
+by the command line argument '--trace-io' of MHT_tunnel_control_v1p3.
+
+    tracer = IO_tracer("IO_trace.bin")
+    tracer.attach(psu)      # Before attaching the device to its Dev_Base_pyqt
+    ...
+    tracer.close()
+
+The ring file is memory-mapped and holds a fixed number of records of 64 bytes
+each. Once full, the oldest records get overwritten. Adding a record is a
+single assignment into the memory map, without any locking or file I/O by the
+calling thread, which costs a few microseconds. Hence, the tracer can be left
+on during a whole run. Its layout is:
+    header   (HEADER_DTYPE, 64 bytes)
+    records  (RECORD_DTYPE, 64 bytes each, 'capacity' of them)
+
+Read it back in by 'read_trace()', or summarize it per command by the tool
+'Tools/MHT_IO_trace_summary.py'.
+
+A transaction succeeded when the traced method returned True, or a list or
+tuple starting with True, e.g. '[success, ans_str]'. A method returning None,
+like 'PT104.UDP_send()', succeeded when it did not raise. Binary commands,
+e.g. of the ThermoFlex chiller, are stored as '0x' followed by their hex
+digits. Commands and device names longer than their field get truncated.
+Calls nested inside each other each get recorded, e.g. 'Arduino.query' calling
+'Arduino.write' and 'Arduino.read_reply'.
+
+Reads, i.e. the methods in READ_METHODS, are recorded under the command last
+sent to the same device, as they carry no command themselves. This way the
+read half of a split transaction, e.g. 'Arduino.request_state' followed by
+'Arduino.read_state', shows up next to its command. Its latency is the time
+spent waiting for the reply.
+
+Classes:
+    IO_tracer(filepath, capacity=2**20):
+        Args:
+            filepath (str or pathlib.Path):
+                Ring file to create. An existing file gets overwritten.
+            capacity (int, optional):
+                Number of records the ring file holds, 64 MiB by default.
+
+        Methods:
+            attach(dev, method_names=TRACED_METHODS, device_name=None):
+                Trace the calls to the methods 'method_names' of the device
+                instance 'dev'. Methods 'dev' does not have are skipped. The
+                device name defaults to 'dev.name'.
+            flush():
+                Write the ring file to disk.
+            close():
+                Flush and close the ring file. Traced methods stay wrapped,
+                but are no longer recorded.
+
+        Important members:
+            N_written (int):
+                Number of records written since creation, including the ones
+                overwritten.
+
+Functions:
+    read_trace(filepath):
+        Return the records of a ring file as a NumPy structured array of
+        dtype RECORD_DTYPE, sorted in time.
+"""
+__author__      = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__         = ""
+__date__        = "17-10-2026"
+__version__     = "1.1.0"
+
+import time
+import functools
+import itertools
+from pathlib import Path
+
+import numpy as np
+
+TRACE_MAGIC = b"DvGIOT\x01\n"
+
+HEADER_DTYPE = np.dtype([('magic'      , 'S8'),
+                         ('record_size', '<u4'),
+                         ('reserved'   , '<u4'),
+                         ('capacity'   , '<u8'),
+                         ('N_written'  , '<u8'),
+                         ('t_created'  , '<f8'),
+                         ('padding'    , 'V24')])
+
+# Outcome of a transaction
+[OUTCOME_OK, OUTCOME_FAILED, OUTCOME_EXCEPTION] = range(3)
+
+RECORD_DTYPE = np.dtype([('time'      , '<f8'),  # [s] since epoch, at start
+                         ('latency_ms', '<f4'),
+                         ('N_bytes'   , '<u4'),  # Sent plus received
+                         ('outcome'   , 'i1'),
+                         ('method'    , 'S11'),
+                         ('device'    , 'S12'),
+                         ('command'   , 'S24')])
+
+# Methods of the device libraries that perform (part of) a transaction
+TRACED_METHODS = ("write", "query", "UDP_send", "UDP_recv", "read_reply",
+                  "read_frame", "read_state")
+
+# Methods of the above that only read, without a command of their own
+READ_METHODS = ("UDP_recv", "read_reply", "read_frame", "read_state")
+
+def _as_bytes(msg):
+    if isinstance(msg, str):
+        return msg.encode('ascii', 'replace')
+    if isinstance(msg, (bytes, bytearray)):
+        return b"0x" + bytes(msg).hex().encode()
+    return b""
+
+def _len(reply):
+    return len(reply) if isinstance(reply, (str, bytes, bytearray)) else 0
+
+class IO_tracer():
+    def __init__(self, filepath, capacity=2**20):
+        self.filepath = Path(filepath)
+        self.capacity = capacity
+
+        with self.filepath.open('wb') as f:
+            f.truncate(HEADER_DTYPE.itemsize + capacity * RECORD_DTYPE.itemsize)
+
+        self._header = np.memmap(self.filepath, dtype=HEADER_DTYPE, mode='r+',
+                                 shape=(1,))
+        self._header[0] = (TRACE_MAGIC, RECORD_DTYPE.itemsize, 0, capacity, 0,
+                           time.time(), b"")
+        self._records = np.memmap(self.filepath, dtype=RECORD_DTYPE,
+                                  mode='r+', offset=HEADER_DTYPE.itemsize,
+                                  shape=(capacity,))
+
+        # Timestamps derived from the monotonic clock, one call less per record
+        self._t0_perf = time.perf_counter()
+        self._t0_epoch = time.time()
+
+        # Record slots get handed out lock-free: 'next()' on an itertools
+        # counter is atomic in CPython.
+        self._counter = itertools.count()
+        self.N_written = 0
+        self.is_open = True
+
+    def attach(self, dev, method_names=TRACED_METHODS, device_name=None):
+        if device_name is None:
+            device_name = getattr(dev, "name", "")
+        device = device_name.encode('ascii', 'replace')
+
+        # Command last sent to this device, shared by its traced methods. Only
+        # the thread holding the device mutex does I/O, hence no locking.
+        last_command = [b""]
+
+        for name in method_names:
+            method = getattr(dev, name, None)
+            if callable(method):
+                setattr(dev, name, self._traced(method, name.encode(), device,
+                                                name in READ_METHODS,
+                                                last_command))
+
+    def _traced(self, method, method_name, device, is_read, last_command):
+        @functools.wraps(method)
+        def traced_method(*args, **kwargs):
+            if is_read:
+                [command, N_sent] = [last_command[0], 0]
+            else:
+                command = _as_bytes(args[0]) if args else b""
+                last_command[0] = command
+                N_sent = len(command)
+
+            t0 = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except:
+                self._record(t0, method_name, device, command, N_sent,
+                             OUTCOME_EXCEPTION)
+                raise
+
+            if isinstance(result, (list, tuple)) and len(result) > 0:
+                outcome = OUTCOME_OK if result[0] is True else OUTCOME_FAILED
+                reply = result[1] if len(result) > 1 else None
+            elif result is None or result is True:
+                [outcome, reply] = [OUTCOME_OK, None]
+            else:
+                [outcome, reply] = [OUTCOME_FAILED, None]
+
+            self._record(t0, method_name, device, command,
+                         N_sent + _len(reply), outcome)
+            return result
+        return traced_method
+
+    def _record(self, t0, method_name, device, command, N_bytes, outcome):
+        latency_ms = (time.perf_counter() - t0) * 1e3
+        if not self.is_open:
+            return
+
+        i = next(self._counter)
+        self._records[i % self.capacity] = (
+                self._t0_epoch + (t0 - self._t0_perf), latency_ms, N_bytes,
+                outcome, method_name, device, command)
+        self.N_written = i + 1
+
+    def flush(self):
+        if self.is_open:
+            self._header[0]['N_written'] = self.N_written
+            self._header.flush()
+            self._records.flush()
+
+    def close(self):
+        if self.is_open:
+            self.flush()
+            self.is_open = False
+            del self._records
+            del self._header
+
+# ------------------------------------------------------------------------------
+#   read_trace
+# ------------------------------------------------------------------------------
+
+def read_trace(filepath):
+    header = np.fromfile(filepath, dtype=HEADER_DTYPE, count=1)[0]
+    if header['magic'] != TRACE_MAGIC:
+        raise ValueError("'%s' is not an I/O trace file." % filepath)
+
+    records = np.fromfile(filepath, dtype=RECORD_DTYPE,
+                          offset=HEADER_DTYPE.itemsize)
+    records = records[records['time'] > 0]      # Slots never written
+    return records[np.argsort(records['time'], kind='stable')]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Class StateBuffer publishes self-consistent snapshots of a state object that
+is written field by field by one thread, e.g. a device's DAQ thread, to be read
+by other threads, e.g. the main/GUI thread or a logger, without any locking.
+
+The writing thread fills the back buffer, being the state object itself, and
+calls 'publish()' once all fields of an update have been written. This copies
+the fields into a new immutable namedtuple, the front buffer, which replaces the
+former front buffer by a single reference assignment. Such an assignment is
+atomic in Python. Reading threads call 'snapshot()' and get the front buffer:
+an immutable, self-consistent set of values that belong to one and the same
+update, even when the writing thread publishes new snapshots in the meantime.
+Hence, reading threads never have to lock the device mutex.
+
+    state_buffer = StateBuffer(dev.state)
+    ...
+    # Writing thread
+    dev.state.V_meas = ...
+    dev.state.I_meas = ...
+    state_buffer.publish()
+    ...
+    # Reading thread
+    snap = state_buffer.snapshot()
+    print(snap.V_meas * snap.I_meas)
+
+Each 'publish()' allocates a new front buffer instead of flipping between a
+fixed pair of buffers. This way, a reader can hold on to a snapshot for as long
+as it likes, without the writer ever overwriting it.
+
+Class DirtyFields lets a reader, e.g. a GUI update routine, find the fields
+that changed since the snapshot it processed last time. Only the widgets of
+those fields need to be redrawn.
+
+    dirty_fields = DirtyFields()
+    ...
+    snap = state_buffer.snapshot()
+    dirty = dirty_fields.update(snap)
+    if "V_meas" in dirty:
+        qlin_V_meas.setText("%.3f" % snap.V_meas)
+
+Class:
+    StateBuffer(state, fields=None, exclude=(), name="StateSnapshot"):
+        Args:
+            state:
+                The state object, written to by a single thread.
+            fields (list of str, optional):
+                Names of the fields to publish. Defaults to all public
+                attributes of 'state' holding a scalar, string, list or NumPy
+                array. Lists and arrays are copied when published. For a state
+                generated by a DvG_StateSchema, in order of its declaration.
+            exclude (list of str, optional):
+                Names of the fields to leave out when 'fields' is not given.
+            name (str, optional):
+                Class name of the snapshot namedtuple.
+
+        Methods:
+            publish():
+                Publish the current values of the fields as a new snapshot.
+            snapshot():
+                Return the latest published snapshot, a namedtuple.
+
+        Important members:
+            fields (tuple of str):
+            publish_counter (int):
+
+    DirtyFields():
+        Methods:
+            update(snapshot):
+                Return the set of names of the fields of 'snapshot' that differ
+                from the snapshot passed in the previous call. All fields are
+                dirty at the first call and after 'reset()'. NaN equals NaN.
+            reset():
+                Mark all fields dirty at the next call of 'update()', e.g. to
+                redraw all widgets.
+"""
+__author__      = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__         = ""
+__date__        = "17-10-2026"
+__version__     = "1.2.0"
+
+import operator
+import collections
+
+import numpy as np
+
+# Field values of these types are published as is, because they are immutable
+_IMMUTABLE_TYPES = (bool, int, float, str, bytes, type(None), np.generic)
+
+# Field values of these types are copied when published
+_MUTABLE_TYPES = (list, np.ndarray)
+
+class StateBuffer():
+    def __init__(self, state, fields=None, exclude=(), name="StateSnapshot"):
+        self.state = state
+
+        if fields is None:
+            # In order of declaration for a state generated by a StateSchema
+            schema = getattr(state, 'schema', None)
+            candidates = dir(state) if schema is None else schema.names
+            fields = [field for field in candidates
+                      if not field.startswith('_') and field not in exclude
+                      and isinstance(getattr(state, field),
+                                     _IMMUTABLE_TYPES + _MUTABLE_TYPES)]
+        self.fields = tuple(fields)
+
+        self.Snapshot = collections.namedtuple(name, self.fields)
+        self._getter = operator.attrgetter(*self.fields)
+        self._copy_mutables = any(isinstance(getattr(state, field),
+                                             _MUTABLE_TYPES)
+                                  for field in self.fields)
+
+        self.publish_counter = 0
+        self._front = None
+        self.publish()
+
+    def publish(self):
+        """Publish the current values of the fields of the state object as a
+        new snapshot. To be called by the writing thread only.
+        """
+        values = self._getter(self.state)
+        if len(self.fields) == 1:
+            values = (values,)
+        if self._copy_mutables:
+            values = [value.copy() if isinstance(value, _MUTABLE_TYPES)
+                      else value for value in values]
+
+        # Atomic swap of the front buffer
+        self._front = self.Snapshot._make(values)
+        self.publish_counter += 1
+
+    def snapshot(self):
+        """Return the latest published snapshot. Safe to be called from any
+        thread without locking.
+        """
+        return self._front
+
+# ------------------------------------------------------------------------------
+#   DirtyFields
+# ------------------------------------------------------------------------------
+
+def _differs(a, b):
+    if a is b:
+        return False
+    try:
+        return bool(a != b) and not (a != a and b != b)     # NaN equals NaN
+    except ValueError:
+        # NumPy arrays
+        return not np.array_equal(a, b, equal_nan=True)
+
+class DirtyFields():
+    def __init__(self):
+        self._prev = None
+
+    def update(self, snapshot):
+        prev = self._prev
+        self._prev = snapshot
+        if prev is None or prev._fields != snapshot._fields:
+            return set(snapshot._fields)
+        if prev is snapshot:
+            return set()
+
+        return {field for (field, a, b) in zip(snapshot._fields, snapshot, prev)
+                if _differs(a, b)}
+
+    def reset(self):
+        self._prev = None
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Class StateSchema generates a compact state container out of a single
+declaration, listing per field its name, NumPy dtype, unit and default value.
+The same declaration yields:
+
+    - a class with '__slots__', for plain and fast attribute access without a
+      per-instance '__dict__', and
+    - a NumPy structured dtype, to copy a whole state into a single record in
+      one go, e.g. for logging to file or to be stored into a record array.
+
+    STATE_SCHEMA = StateSchema([
+        # name      , dtype, unit, default
+        ("V_meas"   , "<f8", "V" , np.nan),
+        ("ENA_OCP"  , "?"  , ""  , False),
+        ("all_errors", None, ""  , [])])
+    State = STATE_SCHEMA.State
+
+    state = State()
+    state.V_meas = 12.0
+    record = state.to_record()  # numpy.void of dtype STATE_SCHEMA.dtype
+
+Fields with dtype None are attributes only and are left out of the record,
+e.g. lists and error strings. Mutable defaults, like lists, are copied for each
+new instance. Assigning to an attribute that is not declared raises an
+AttributeError, which catches typos in field names early.
+
+The units end up in the headers of a log file, see 'units_header()', and in
+the metadata of a binary log. That way the log reader recovers the names,
+dtypes and units of all columns from the log file itself.
+
+Class:
+    StateSchema(fields, name="State"):
+        Args:
+            fields (list of tuples):
+                (name, dtype, unit) or (name, dtype, unit, default). The
+                default value defaults to NaN for floating point dtypes, to
+                zero for all other dtypes and to None for dtype None.
+            name (str, optional):
+                Class name of the generated state class.
+
+        Methods:
+            to_record(state):
+                Return the record fields of 'state' as a numpy.void record.
+            names_header(sep="\\t"):
+                Return the record field names joined by 'sep'.
+            units_header(sep="\\t"):
+                Return the record field units, in brackets, joined by 'sep'.
+
+        Important members:
+            State (class):
+                Generated state class with '__slots__'. Its instances have the
+                methods 'to_record()' and 'reset()' and carry the class member
+                'schema' pointing back to this StateSchema.
+            names (tuple of str):
+                All field names.
+            dtype (numpy.dtype):
+                Structured dtype of the record fields.
+            units (dict):
+                Unit of each record field, keyed by field name.
+"""
+__author__      = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__         = ""
+__date__        = "17-10-2026"
+__version__     = "1.0.0"
+
+import copy
+import operator
+
+import numpy as np
+
+class StateSchema():
+    def __init__(self, fields, name="State"):
+        names = []
+        defaults = []
+        record_fields = []
+        self.units = dict()
+
+        for field in fields:
+            (field_name, dtype, unit) = field[0:3]
+            if dtype is not None:
+                dtype = np.dtype(dtype)
+                record_fields.append((field_name, dtype))
+                self.units[field_name] = unit
+
+            if len(field) > 3:
+                default = field[3]
+            elif dtype is None:
+                default = None
+            elif dtype.kind in 'fc':
+                default = np.nan
+            else:
+                default = np.zeros((), dtype=dtype).item()
+
+            names.append(field_name)
+            defaults.append(default)
+
+        self.names = tuple(names)
+        self.dtype = np.dtype(record_fields)
+        self._record_getter = (operator.attrgetter(*self.dtype.names)
+                               if self.dtype.names else lambda state: ())
+        self.State = self._make_class(name, tuple(zip(names, defaults)))
+
+    def _make_class(self, name, defaults):
+        schema = self
+
+        def __init__(self):
+            self.reset()
+
+        def reset(self):
+            """Set all fields back to their default values."""
+            for (field_name, default) in defaults:
+                setattr(self, field_name, copy.copy(default))
+
+        def to_record(self):
+            """Return the record fields as a numpy.void record."""
+            return schema.to_record(self)
+
+        return type(name, (object,),
+                    {'__slots__': self.names,
+                     '__init__': __init__,
+                     'reset': reset,
+                     'to_record': to_record,
+                     'schema': self})
+
+    def to_record(self, state):
+        """Return the record fields of 'state' as a numpy.void record of dtype
+        'self.dtype'. Values that do not fit the dtype, like None for a float,
+        become NaN.
+        """
+        values = self._record_getter(state)
+        if len(self.dtype.names) == 1:
+            values = (values,)
+        return np.array(values, dtype=self.dtype)[()]
+
+    def names_header(self, sep="\t"):
+        """Return the names of the record fields joined by 'sep', e.g. as the
+        column header of a text log.
+        """
+        return sep.join(self.dtype.names)
+
+    def units_header(self, sep="\t"):
+        """Return the units of the record fields, each between brackets,
+        joined by 'sep', e.g. as the units header of a text log.
+        """
+        return sep.join("[%s]" % self.units[field_name]
+                        for field_name in self.dtype.names)
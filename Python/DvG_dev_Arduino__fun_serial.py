@@ -11,9 +11,29 @@ the serial connection. It must reply to ``query('id?')`` with an ASCII string
 response. Choosing a unique identity response per each Arduino in your project
 allows for auto-connecting to these Arduinos without specifying the serial port.
 
-Only ASCII based communication is supported so-far. Binary encoded communication
-will be possible as well after a few modifications to this library have been
-made (work in progress).
+Binary state frames:
+    Besides ASCII, the state of the Arduino can be reported as a binary frame
+    with a fixed struct layout, which is a lot shorter to transmit and to parse
+    than a line of tab delimited floats. A frame consists of
+        sync bytes      FRAME_SYNC (2 bytes)
+        version         (uint8)
+        payload length  (uint8)
+        payload         (fixed struct layout, little endian)
+        CRC             (uint16, little endian, CRC-16/CCITT-FALSE over the
+                         version, length and payload bytes)
+    Call ``negotiate_binary_state`` once after connecting, passing the NumPy
+    structured dtype of the payload. It asks the Arduino for its frame version
+    using the 'proto?' query. When the version matches, ``query_state`` will
+    request binary frames, otherwise it falls back to the ASCII protocol. Old
+    firmware that does not know 'proto?' hence keeps on working as before.
+
+Streaming mode:
+    Instead of being polled, the Arduino can push binary state frames at a
+    fixed interval by itself, see ``start_streaming``. A reader thread then
+    continuously drains the serial port and timestamps each frame on arrival.
+    ``query_state`` returns the latest received frame without any serial I/O,
+    saving a full round-trip per sample. Replies to other queries sent in the
+    meantime are ASCII lines, which the reader thread passes on to ``query``.
 
 #### On the Arduino side
 I also provide a C++ library for the Arduino(-like) device. It provides
@@ -38,26 +58,69 @@ Classes:
                 Write a string to the serial port.
             query(...)
                 Write a string to the serial port and return the reply.
+            read_reply(...)
+                Read a reply from the serial port, e.g. after self.write().
+            query_multiline(...)
+                Write a string to the serial port and return the framed
+                multi-line reply as a list of strings.
             query_ascii_values(...)
                 Write a string to the serial port and return the reply, parsed
                 into a list of floats.
-
-        Important member:
+            negotiate_binary_state(...)
+                Check whether the Arduino supports binary state frames.
+            read_frame()
+                Read a binary frame from the serial port and check it.
+            query_binary_values(...)
+                Write a string to the serial port and return the binary frame
+                reply, parsed into a NumPy record.
+            query_state(...)
+                Query the state as binary frame when negotiated, or as ASCII
+                otherwise, and return it as a list of floats.
+            request_state(...), read_state(...)
+                The two halves of query_state(), to overlap the round-trips
+                of several Arduinos.
+            start_streaming(...)
+                Let the Arduino push binary state frames at a fixed interval.
+            stop_streaming()
+                Stop the Arduino from pushing state frames.
+
+        Important members:
             ser: serial.Serial instance belonging to the Arduino
+            state_time: Time of arrival [s, time.time()] of the state last
+                returned by query_state()
+            is_streaming: True when in streaming mode
+            N_frames_superseded: Number of streamed state frames that got
+                replaced by a newer one before read_state() picked them up
 """
 __author__      = "Dennis van Gils"
 __authoremail__ = "vangils.dennis@gmail.com"
 __url__         = "https://github.com/Dennis-van-Gils/DvG_dev_Arduino"
-__date__        = "15-09-2018"
-__version__     = "1.0.1"
+__date__        = "17-10-2026"
+__version__     = "1.1.1"
 
 import sys
+import time
+import queue
+import struct
+import binascii
+import threading
 import serial
 import serial.tools.list_ports
 from pathlib import Path
 
+import numpy as np
+
 from DvG_debug_functions import print_fancy_traceback as pft
 
+# Binary state frames, see module docstring
+FRAME_SYNC = b"\xA5\x5A"
+FRAME_HEADER = struct.Struct("<BB")     # version, payload length
+FRAME_CRC = struct.Struct("<H")
+
+def frame_crc(data):
+    """CRC-16/CCITT-FALSE, as used by the binary state frames"""
+    return binascii.crc_hqx(data, 0xFFFF)
+
 class Arduino():
     def __init__(self, name="Ard", baudrate=9600,
                  read_timeout=1, write_timeout=1,
@@ -90,6 +153,20 @@ class Arduino():
         # Is the connection to the device alive?
         self.is_alive = False
 
+        # NumPy structured dtype of the binary state frame payload, when
+        # negotiated by self.negotiate_binary_state(). None means ASCII.
+        self.state_dtype = None
+        self.state_frame_version = None
+
+        # Time of arrival [s] of the state last returned by self.query_state()
+        self.state_time = np.nan
+
+        # Streaming mode, see self.start_streaming()
+        self.stream_interval_ms = None
+        self._stream_reader = None
+        self.N_frames_superseded = 0
+        self._N_frame_read = 0   # Frame number last returned by read_state()
+
         # Placeholder for keeping track of future automated data acquisition as
         # used by e.g. DvG_dev_Arduino__pyqt_lib.py
         self.update_counter = 0
@@ -105,6 +182,9 @@ class Arduino():
     def close(self):
         """Close the serial port, disregarding any exceptions
         """
+        if self._stream_reader is not None:
+            self.stop_streaming()
+
         # Prevent Windows, thinking to be smart, from keeping the port open in
         # case the connection got lost
         try: self.ser.cancel_read()
@@ -323,6 +403,31 @@ class Arduino():
                 continue.
                 2: Will raise the exception again.
 
+        Returns:
+            success (bool):
+                True if successful, False otherwise.
+            ans_str (str):
+                Reply received from the device. [None] if unsuccessful.
+        """
+        if self._stream_reader is not None:
+            # Discard replies to earlier queries that timed out
+            self._stream_reader.discard_replies()
+
+        if self.write(msg_str, timeout_warning_style):
+            return self.read_reply(timeout_warning_style)
+
+        return [False, None]
+
+    def read_reply(self, timeout_warning_style=1):
+        """Read a single reply line from the serial device. Splitting off the
+        read from self.query() allows to first send out queries to several
+        devices and only then wait for their replies, overlapping the
+        round-trips.
+
+        Args:
+            timeout_warning_style (int, optional):
+                See self.query().
+
         Returns:
             success (bool):
                 True if successful, False otherwise.
@@ -332,36 +437,39 @@ class Arduino():
         success = False
         ans_str = None
 
-        if self.write(msg_str, timeout_warning_style):
-            try:
+        try:
+            if self._stream_reader is not None:
+                # The reader thread owns the incoming data
+                ans_bytes = self._stream_reader.read_reply(self.read_timeout)
+            else:
                 ans_bytes = self.ser.read_until(self.read_term_char.encode())
-            except (serial.SerialTimeoutException,
-                    serial.SerialException) as err:
-                # Note though: The Serial library does not throw an
-                # exception when it actually times out! We will check for
-                # zero received bytes as indication for timeout, later.
-                pft(err, 3)
-            except Exception as err:
-                pft(err, 3)
-                sys.exit(1)
+        except (serial.SerialTimeoutException,
+                serial.SerialException) as err:
+            # Note though: The Serial library does not throw an
+            # exception when it actually times out! We will check for
+            # zero received bytes as indication for timeout, later.
+            pft(err, 3)
+        except Exception as err:
+            pft(err, 3)
+            sys.exit(1)
+        else:
+            if (len(ans_bytes) == 0):
+                # Received 0 bytes, probably due to a timeout.
+                if timeout_warning_style == 1:
+                    pft("Received 0 bytes. Read probably timed out.", 3)
+                elif timeout_warning_style == 2:
+                    raise(serial.SerialTimeoutException)
             else:
-                if (len(ans_bytes) == 0):
-                    # Received 0 bytes, probably due to a timeout.
-                    if timeout_warning_style == 1:
-                        pft("Received 0 bytes. Read probably timed out.", 3)
-                    elif timeout_warning_style == 2:
-                        raise(serial.SerialTimeoutException)
+                try:
+                    ans_str = ans_bytes.decode('utf8').strip()
+                except UnicodeDecodeError as err:
+                    # Print error and struggle on
+                    pft(err, 3)
+                except Exception as err:
+                    pft(err, 3)
+                    sys.exit(1)
                 else:
-                    try:
-                        ans_str = ans_bytes.decode('utf8').strip()
-                    except UnicodeDecodeError as err:
-                        # Print error and struggle on
-                        pft(err, 3)
-                    except Exception as err:
-                        pft(err, 3)
-                        sys.exit(1)
-                    else:
-                        success = True
+                    success = True
 
         return [success, ans_str]
 
@@ -379,7 +487,47 @@ class Arduino():
                 [None] if unsuccessful.
         """
         [success, ans_str] = self.query(msg_str)
+        return self._parse_ascii_values(success, ans_str, separator)
+
+    def query_multiline(self, msg_str, end_str):
+        """Send a message to the serial device and subsequently read a framed
+        multi-line reply, consisting of a line holding the number N of lines
+        that follow, the N lines itself and a terminator line 'end_str'. This
+        retrieves a batch of items in a single round-trip, instead of one
+        query per item.
+
+        Returns:
+            success (bool):
+                True if successful, False otherwise.
+            ans_list (list):
+                The N lines received from the device, as strings. [] if
+                unsuccessful.
+        """
+        [success, ans_str] = self.query(msg_str)
+        if not success:
+            return [False, []]
 
+        try:
+            N_lines = int(ans_str)
+        except ValueError as err:
+            pft(err, 3)
+            return [False, []]
+
+        ans_list = []
+        for i in range(N_lines + 1):
+            [success, ans_str] = self.read_reply()
+            if not success:
+                return [False, []]
+            ans_list.append(ans_str)
+
+        if ans_list.pop() != end_str:
+            pft("Multi-line reply to '%s' lacks its terminator '%s'." %
+                (msg_str, end_str), 3)
+            return [False, []]
+
+        return [True, ans_list]
+
+    def _parse_ascii_values(self, success, ans_str, separator):
         if success and not(ans_str == ''):
             try:
                 ans_floats = list(map(float, ans_str.split(separator)))
@@ -394,6 +542,390 @@ class Arduino():
 
         return [False, []]
 
+    # --------------------------------------------------------------------------
+    #   Binary state frames
+    # --------------------------------------------------------------------------
+
+    def negotiate_binary_state(self, dtype, version, negotiate_timeout=0.2):
+        """Ask the Arduino for the version of its binary state frame with the
+        'proto?' query. When it matches 'version', subsequent calls to
+        self.query_state() will request binary frames with payload 'dtype'.
+        Otherwise, e.g. for old firmware not replying to 'proto?' at all, the
+        ASCII protocol is kept.
+
+        Args:
+            dtype (numpy.dtype):
+                Structured dtype of the payload, fields in the same order as
+                the ASCII state reply.
+            version (int):
+                Frame version expected by the caller.
+            negotiate_timeout (float, optional):
+                [s] Read timeout used for the 'proto?' query only. Defaults to
+                0.2.
+
+        Returns: True when binary state frames are used, False otherwise.
+        """
+        self.state_dtype = None
+        self.state_frame_version = None
+        if not self.is_alive:
+            return False
+
+        read_timeout = self.ser.timeout
+        self.ser.timeout = negotiate_timeout
+        try:
+            [success, ans_str] = self.query("proto?", timeout_warning_style=2)
+        except (serial.SerialTimeoutException, serial.SerialException):
+            success = False
+        finally:
+            self.ser.timeout = read_timeout
+
+        try:
+            firmware_version = int(ans_str) if success else None
+        except ValueError:
+            firmware_version = None
+
+        if firmware_version == version:
+            self.state_dtype = np.dtype(dtype)
+            self.state_frame_version = version
+            print("'%s' uses binary state frames, version %i\n" %
+                  (self.name, version))
+            return True
+
+        # Discard any late or unexpected reply
+        self.ser.reset_input_buffer()
+        print("'%s' uses ASCII state reports (frame version %s, expected %i)\n"
+              % (self.name, firmware_version, version))
+        return False
+
+    def read_frame(self):
+        """Read a binary frame from the serial port. Any bytes preceding the
+        sync bytes are discarded. The CRC and the frame version are checked.
+
+        Returns:
+            success (bool):
+                True if successful, False otherwise.
+            payload (bytes):
+                Payload of the frame. [None] if unsuccessful.
+        """
+        try:
+            ans_bytes = self.ser.read_until(FRAME_SYNC)
+            if not ans_bytes.endswith(FRAME_SYNC):
+                pft("No frame received. Read probably timed out.", 3)
+                return [False, None]
+
+            header = self.ser.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                pft("Incomplete frame received. Read probably timed out.", 3)
+                return [False, None]
+
+            [version, N_payload] = FRAME_HEADER.unpack(header)
+            body = self.ser.read(N_payload + FRAME_CRC.size)
+        except (serial.SerialTimeoutException,
+                serial.SerialException) as err:
+            pft(err, 3)
+            return [False, None]
+        except Exception as err:
+            pft(err, 3)
+            sys.exit(1)
+
+        if len(body) < N_payload + FRAME_CRC.size:
+            pft("Incomplete frame received. Read probably timed out.", 3)
+            return [False, None]
+
+        payload = body[:N_payload]
+        [crc] = FRAME_CRC.unpack(body[N_payload:])
+        if frame_crc(header + payload) != crc:
+            pft("Frame CRC mismatch.", 3)
+            return [False, None]
+        if version != self.state_frame_version:
+            pft("Unexpected frame version %i." % version, 3)
+            return [False, None]
+
+        return [True, payload]
+
+    def query_binary_values(self, msg_str, dtype):
+        """Send a message to the serial device and subsequently read the
+        binary frame reply. The payload is parsed into a NumPy record of
+        structured dtype 'dtype'.
+
+        Returns:
+            success (bool):
+                True if successful, False otherwise.
+            record (numpy.void):
+                Reply received from the device. [None] if unsuccessful.
+        """
+        if not self.write(msg_str):
+            return [False, None]
+
+        return self.read_binary_values(dtype)
+
+    def read_binary_values(self, dtype):
+        """Read a binary frame reply, parsed into a NumPy record of structured
+        dtype 'dtype'. See self.query_binary_values().
+        """
+        [success, payload] = self.read_frame()
+        if not success:
+            return [False, None]
+        if len(payload) != dtype.itemsize:
+            pft("Frame payload of %i bytes, expected %i." %
+                (len(payload), dtype.itemsize), 3)
+            return [False, None]
+
+        return [True, np.frombuffer(payload, dtype=dtype)[0]]
+
+    def query_state(self, msg_str="?", separator='\t'):
+        """Query the state of the Arduino. Requests a binary state frame using
+        'msg_str' + 'b' when negotiated by self.negotiate_binary_state(), and
+        the ASCII state reply 'msg_str' otherwise. Either way, the values are
+        returned as a list of floats, in the order of the ASCII reply.
+
+        Returns:
+            success (bool):
+                True if successful, False otherwise.
+            ans_floats (list):
+                Reply received from the device and parsed into a list of floats.
+                [] if unsuccessful.
+        """
+        if not self.request_state(msg_str):
+            return [False, []]
+
+        return self.read_state(separator)
+
+    def request_state(self, msg_str="?"):
+        """First half of self.query_state(): Send the state query without
+        waiting for the reply. Query several Arduinos this way before reading
+        back their states using self.read_state(), so that their round-trips
+        overlap instead of add up.
+
+        Returns: True if successful, False otherwise.
+        """
+        if self._stream_reader is not None:
+            return True     # Streaming mode: nothing to request
+        if self.state_dtype is None:
+            return self.write(msg_str)
+        return self.write(msg_str + "b")
+
+    def read_state(self, separator='\t'):
+        """Second half of self.query_state(): Read the reply to the state query
+        sent by self.request_state().
+
+        Returns: See self.query_state().
+        """
+        if self._stream_reader is not None:
+            # Streaming mode: no I/O, take the latest frame that got pushed
+            latest = self._stream_reader.latest
+            if (latest is None or time.time() - latest[0] >
+                STREAM_MAX_AGE_INTERVALS * self.stream_interval_ms / 1e3):
+                pft("No recent state frame received from '%s'." % self.name,
+                    3)
+                return [False, []]
+            [self.state_time, record, N_frame] = latest
+            if self._N_frame_read > 0:
+                self.N_frames_superseded += max(
+                        N_frame - self._N_frame_read - 1, 0)
+            self._N_frame_read = N_frame
+            return [True, list(map(float, record.item()))]
+
+        if self.state_dtype is None:
+            [success, ans_str] = self.read_reply()
+            [success, ans_floats] = self._parse_ascii_values(success, ans_str,
+                                                             separator)
+            if success:
+                self.state_time = time.time()
+            return [success, ans_floats]
+
+        [success, record] = self.read_binary_values(self.state_dtype)
+        if not success:
+            return [False, []]
+
+        self.state_time = time.time()
+        return [True, list(map(float, record.item()))]
+
+    # --------------------------------------------------------------------------
+    #   Streaming mode
+    # --------------------------------------------------------------------------
+
+    def start_streaming(self, interval_ms, on_frame=None):
+        """Let the Arduino push a binary state frame every 'interval_ms' by
+        sending it 'stream<interval_ms>', and start a reader thread draining
+        the serial port. Requires binary state frames to be negotiated first,
+        see self.negotiate_binary_state().
+
+        Args:
+            interval_ms (int):
+                [ms] Interval at which the Arduino pushes its state.
+            on_frame (callable, optional):
+                Called from within the reader thread for each received state
+                frame as on_frame(time of arrival [s], NumPy record). Keep it
+                short, e.g. waking up a DAQ worker.
+
+        Returns: True if successful, False otherwise.
+        """
+        if self.state_dtype is None:
+            pft("'%s' can only stream binary state frames, which have not "
+                "been negotiated." % self.name, 3)
+            return False
+
+        if self._stream_reader is not None:
+            self.stop_streaming()
+
+        self.ser.reset_input_buffer()
+        self.stream_interval_ms = interval_ms
+        self._N_frame_read = 0
+        self._stream_reader = _StreamReader(self, on_frame)
+        self._stream_reader.start()
+
+        if not self.write("stream%i" % interval_ms):
+            self.stop_streaming()
+            return False
+
+        return True
+
+    def stop_streaming(self):
+        """Stop the Arduino from pushing state frames and stop the reader
+        thread. Subsequent queries are polled again.
+        """
+        if self._stream_reader is None:
+            return
+
+        if self.is_alive:
+            self.write("stream0")
+        self._stream_reader.running = False
+        self._stream_reader.join(2 * self.read_timeout)
+        self._stream_reader = None
+        self.stream_interval_ms = None
+
+        # Discard frames that were still underway
+        try: self.ser.reset_input_buffer()
+        except: pass
+
+    @property
+    def is_streaming(self):
+        return self._stream_reader is not None
+
+# ------------------------------------------------------------------------------
+#   _StreamReader
+# ------------------------------------------------------------------------------
+
+# In streaming mode, query_state() fails when the latest frame is older than
+# this number of stream intervals
+STREAM_MAX_AGE_INTERVALS = 3
+
+class _StreamReader(threading.Thread):
+    """Background thread that continuously drains the serial port of an
+    Arduino in streaming mode. Binary state frames are checked, timestamped on
+    arrival and kept as 'latest'. Any ASCII line in between is a reply to a
+    query and is put onto the 'replies' queue for Arduino.query() to pick up.
+    Both never interleave on the wire, as the Arduino sends each in one go.
+    """
+    def __init__(self, ard, on_frame=None):
+        super().__init__(name="%s stream reader" % ard.name, daemon=True)
+        self.ard = ard
+        self.on_frame = on_frame
+        self.replies = queue.Queue()
+        self.running = True
+
+        # Tuple (time of arrival [s], NumPy record, frame number) of the latest
+        # valid frame. Replaced as a whole, hence atomic to read from other
+        # threads. The frame number counts from 1.
+        self.latest = None
+        self.N_frames = 0
+        self.N_bad_frames = 0
+
+        # After a bad frame, everything up to the next sync bytes is discarded
+        self._resyncing = False
+
+    def read_reply(self, timeout):
+        """Returns the next ASCII reply line, or b"" when timed out."""
+        try:
+            return self.replies.get(timeout=timeout)
+        except queue.Empty:
+            return b""
+
+    def discard_replies(self):
+        while True:
+            try:
+                self.replies.get_nowait()
+            except queue.Empty:
+                break
+
+    def run(self):
+        buf = b""
+        while self.running:
+            try:
+                data = self.ard.ser.read(max(1, self.ard.ser.in_waiting))
+            except Exception as err:
+                if self.running:
+                    pft(err, 3)
+                break
+
+            if data:
+                buf = self.parse(buf + data, time.time())
+
+    def parse(self, buf, t_arrival):
+        """Consume all complete frames and reply lines from 'buf'.
+
+        Returns: The remaining incomplete bytes.
+        """
+        term_char = self.ard.read_term_char.encode()
+        dtype = self.ard.state_dtype
+        N_header = len(FRAME_SYNC) + FRAME_HEADER.size
+
+        while buf:
+            i_sync = buf.find(FRAME_SYNC)
+            if self._resyncing:
+                # Never mistake the payload of a bad frame for a reply line
+                if i_sync < 0:
+                    # Keep a possibly incomplete sync at the end
+                    return buf[1 - len(FRAME_SYNC):]
+                buf = buf[i_sync:]
+                i_sync = 0
+                self._resyncing = False
+
+            i_term = buf.find(term_char)
+
+            if i_sync == 0:
+                if len(buf) < N_header:
+                    break
+                [version, N_payload] = FRAME_HEADER.unpack_from(
+                        buf, len(FRAME_SYNC))
+                i_end = N_header + N_payload + FRAME_CRC.size
+                if len(buf) < i_end:
+                    break
+
+                payload = buf[N_header:N_header + N_payload]
+                [crc] = FRAME_CRC.unpack_from(buf, N_header + N_payload)
+                if (frame_crc(buf[len(FRAME_SYNC):N_header + N_payload]) == crc
+                    and version == self.ard.state_frame_version
+                    and N_payload == dtype.itemsize):
+                    record = np.frombuffer(payload, dtype=dtype)[0]
+                    self.N_frames += 1
+                    self.latest = (t_arrival, record, self.N_frames)
+                    if self.on_frame is not None:
+                        self.on_frame(t_arrival, record)
+                    buf = buf[i_end:]
+                else:
+                    # Resync on the next sync bytes
+                    self.N_bad_frames += 1
+                    self._resyncing = True
+                    buf = buf[len(FRAME_SYNC):]
+
+            elif i_term >= 0 and (i_sync < 0 or i_term < i_sync):
+                self.replies.put(buf[:i_term + len(term_char)])
+                buf = buf[i_term + len(term_char):]
+
+            elif i_sync > 0:
+                # Discard garbage preceding a frame
+                buf = buf[i_sync:]
+
+            else:
+                # Incomplete reply line. Guard against endless garbage.
+                if len(buf) > 4096:
+                    buf = b""
+                break
+
+        return buf
+
 # ------------------------------------------------------------------------------
 #   read_port_config_file
 # ------------------------------------------------------------------------------
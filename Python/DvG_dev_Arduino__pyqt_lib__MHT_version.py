@@ -6,15 +6,18 @@ acquisition for the two Arduino devices running the Twente MHT Tunnel.
 __author__      = "Dennis van Gils"
 __authoremail__ = "vangils.dennis@gmail.com"
 __url__         = "Modified https://github.com/Dennis-van-Gils/DvG_dev_Arduino"
-__date__        = "15-09-2018"
-__version__     = "1.0.2 modified for MHT tunnel"
+__date__        = "17-10-2026"
+__version__     = "1.5.2 modified for MHT tunnel"
 
-import queue
+import time
 import numpy as np
 
 from PyQt5 import QtCore
 
 from DvG_debug_functions import ANSI, dprint, print_fancy_traceback as pft
+from DvG_dev_Base__pyqt_lib import (DAQ_trigger, Job_priority, Job_scheduler,
+                                    Timing_profiler, Deadline_scheduler,
+                                    Refresh_throttle)
 import DvG_dev_Arduino__fun_serial as Arduino_functions
 
 # Show debug info in terminal? Warning: Slow! Do not leave on unintentionally.
@@ -59,17 +62,41 @@ class Arduino_pyqt(QtCore.QObject):
 
         - Worker_send:
             Maintains a thread-safe queue where desired device I/O operations
-            can be put onto, and sends the queued operations first in first out
-            (FIFO) to the device.
+            can be put onto, and sends the queued operations in order of
+            priority, first in first out (FIFO) within the same priority, to
+            the device.
+
+    In streaming mode, where the Arduinos push their state by themselves, pass
+    'DAQ_trigger_by=DAQ_trigger.EXTERNAL_WAKE_UP_CALL' and call
+    'worker_DAQ.wake_up()' on arrival of each state frame, instead of letting
+    an internal timer poll the Arduinos. When polling, pass
+    'DAQ_trigger_by=DAQ_trigger.DEADLINE_TIMER' to poll at the deadlines of a
+    uniformly spaced timeline. Each update then has its scheduled time in
+    'DAQ_scheduled_time_ms' and its actual time in 'DAQ_acquired_time_ms', see
+    'DvG_dev_Base__pyqt_lib.Deadline_scheduler'.
+
+    Member 'profiler' times the DAQ updates and the jobs of 'worker_send' in
+    the same sections as 'DvG_dev_Base__pyqt_lib.Dev_Base_pyqt', except that
+    the device I/O calls are timed per Arduino, e.g. 'io.Ard 1.query', and the
+    lock wait covers the mutexes of both Arduinos. Its statistics are emitted
+    by 'signal_timing_stats' every second.
+
+    As with 'Dev_Base_pyqt', 'signal_GUI_refresh' follows 'signal_DAQ_updated'
+    at most 'GUI_throttle.max_rate_Hz' times per second, see
+    'DvG_dev_Base__pyqt_lib.Refresh_throttle'.
     """
     signal_DAQ_updated     = QtCore.pyqtSignal()
+    signal_GUI_refresh     = QtCore.pyqtSignal()
     signal_connection_lost = QtCore.pyqtSignal()
+    signal_timing_stats    = QtCore.pyqtSignal(dict)
 
     def __init__(self,
                  ard1: Arduino_functions.Arduino,
                  ard2: Arduino_functions.Arduino,
                  DAQ_update_interval_ms=250,
                  DAQ_function_to_run_each_update=None,
+                 DAQ_trigger_by=DAQ_trigger.INTERNAL_TIMER,
+                 DAQ_skip_missed_deadlines=True,
                  parent=None):
         super(Arduino_pyqt, self).__init__(parent=parent)
 
@@ -82,6 +109,14 @@ class Arduino_pyqt(QtCore.QObject):
         self.ard1.mutex = QtCore.QMutex()
         self.ard2.mutex = QtCore.QMutex()
 
+        self.profiler = Timing_profiler()
+        self.profiler.wrap(self.ard1, prefix="io.%s." % self.ard1.name)
+        self.profiler.wrap(self.ard2, prefix="io.%s." % self.ard2.name)
+
+        self.GUI_throttle = Refresh_throttle(parent=self)
+        self.signal_DAQ_updated.connect(self.GUI_throttle.trigger)
+        self.GUI_throttle.signal_refresh.connect(self.signal_GUI_refresh)
+
         self.DAQ_update_counter = 0
         self.DAQ_ard1_not_alive_counter = 0
         self.DAQ_ard2_not_alive_counter = 0
@@ -89,11 +124,16 @@ class Arduino_pyqt(QtCore.QObject):
         self.obtained_DAQ_update_interval_ms = np.nan
         self.obtained_DAQ_rate_Hz = np.nan
 
+        self.DAQ_scheduled_time_ms = np.nan
+        self.DAQ_acquired_time_ms = np.nan
+
         self.worker_DAQ = self.Worker_DAQ(
                 DAQ_update_interval_ms=DAQ_update_interval_ms,
                 DAQ_function_to_run_each_update=DAQ_function_to_run_each_update,
                 DAQ_critical_not_alive_count=3,
                 DAQ_timer_type=QtCore.Qt.PreciseTimer,
+                DAQ_trigger_by=DAQ_trigger_by,
+                DAQ_skip_missed_deadlines=DAQ_skip_missed_deadlines,
                 DEBUG=DEBUG_worker_DAQ)
 
         self.worker_send = self.Worker_send(
@@ -180,6 +220,10 @@ class Arduino_pyqt(QtCore.QObject):
 
     def close_thread_worker_DAQ(self):
         if self.thread_DAQ is not None:
+            if (self.worker_DAQ.trigger_by ==
+                DAQ_trigger.EXTERNAL_WAKE_UP_CALL):
+                self.worker_DAQ.stop()
+                self.worker_DAQ.qwc.wakeAll()
             self.thread_DAQ.quit()
             print("Closing thread %s " %
                   "{:.<16}".format(self.thread_DAQ.objectName()), end='')
@@ -272,6 +316,25 @@ class Arduino_pyqt(QtCore.QObject):
                 it to PyQt5.QtCore.Qt.PreciseTimer with ~1 ms granularity, but
                 it is resource heavy. Use sparingly.
 
+            DAQ_trigger_by (optional, default=DAQ_trigger.INTERNAL_TIMER):
+                INTERNAL_TIMER: Update every 'DAQ_update_interval_ms', timed by
+                a QTimer.
+                EXTERNAL_WAKE_UP_CALL: Update each time 'wake_up()' is called,
+                e.g. on arrival of a state frame pushed by the Arduino in
+                streaming mode. The obtained DAQ rate then follows the rate of
+                the Arduino instead of the timer jitter of the host. A wake-up
+                call arriving during an update triggers the next update. More
+                calls arriving during that same update are counted in
+                'N_wake_ups_superseded'.
+                DEADLINE_TIMER: Update at the deadlines of a uniformly spaced
+                timeline, see 'DvG_dev_Base__pyqt_lib.Deadline_scheduler', by
+                re-arming a single-shot PreciseTimer after each update.
+
+            DAQ_skip_missed_deadlines (bool, optional, default=True):
+                Only used by DAQ_trigger.DEADLINE_TIMER: Skip the deadlines
+                missed by an overrun, instead of running the missed updates
+                back-to-back.
+
             DEBUG (bool, optional, default=False):
                 Show debug info in terminal? Warning: Slow! Do not leave on
                 unintentionally.
@@ -281,6 +344,8 @@ class Arduino_pyqt(QtCore.QObject):
                      DAQ_function_to_run_each_update=None,
                      DAQ_critical_not_alive_count=3,
                      DAQ_timer_type=QtCore.Qt.CoarseTimer,
+                     DAQ_trigger_by=DAQ_trigger.INTERNAL_TIMER,
+                     DAQ_skip_missed_deadlines=True,
                      DEBUG=False):
             super().__init__(None)
             self.DEBUG = DEBUG
@@ -293,6 +358,20 @@ class Arduino_pyqt(QtCore.QObject):
             self.function_to_run_each_update = DAQ_function_to_run_each_update
             self.critical_not_alive_count = DAQ_critical_not_alive_count
             self.timer_type = DAQ_timer_type
+            self.trigger_by = DAQ_trigger_by
+
+            if self.trigger_by == DAQ_trigger.EXTERNAL_WAKE_UP_CALL:
+                self.qwc = QtCore.QWaitCondition()
+                self.mutex_wait = QtCore.QMutex()
+                self.running = True
+                self.triggered = False  # Guarded by 'mutex_wait'
+            self.N_wake_ups_superseded = 0
+
+            if self.trigger_by == DAQ_trigger.DEADLINE_TIMER:
+                self.deadline = Deadline_scheduler(DAQ_update_interval_ms,
+                                                   DAQ_skip_missed_deadlines)
+            else:
+                self.deadline = None
 
             self.calc_DAQ_rate_every_N_iter = round(1e3/self.update_interval_ms)
             self.prev_tick_DAQ_update = 0
@@ -308,17 +387,62 @@ class Arduino_pyqt(QtCore.QObject):
                 dprint("Worker_DAQ  %s run : thread %s" %
                        (self.dev.name, curThreadName()), self.DEBUG_color)
 
-            self.timer = QtCore.QTimer()
-            self.timer.setInterval(self.update_interval_ms)
-            self.timer.timeout.connect(self.update)
-            self.timer.setTimerType(self.timer_type)
-            self.timer.start()
+            # INTERNAL TIMER
+            if self.trigger_by == DAQ_trigger.INTERNAL_TIMER:
+                self.timer = QtCore.QTimer()
+                self.timer.setInterval(self.update_interval_ms)
+                self.timer.timeout.connect(self.update)
+                self.timer.setTimerType(self.timer_type)
+                self.timer.start()
+
+            # DEADLINE TIMER
+            elif self.trigger_by == DAQ_trigger.DEADLINE_TIMER:
+                self.timer = QtCore.QTimer()
+                self.timer.setSingleShot(True)
+                self.timer.timeout.connect(self.update)
+                self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+                self.deadline.start()
+                self.timer.start(0)
+
+            # EXTERNAL WAKE UP
+            elif self.trigger_by == DAQ_trigger.EXTERNAL_WAKE_UP_CALL:
+                while self.running:
+                    locker_wait = QtCore.QMutexLocker(self.mutex_wait)
+
+                    if self.DEBUG:
+                        dprint("Worker_DAQ  %s: waiting for trigger" %
+                               self.dev.name, self.DEBUG_color)
+
+                    # A wake-up call that arrived while updating is not lost
+                    while self.running and not self.triggered:
+                        self.qwc.wait(self.mutex_wait)
+                    self.triggered = False
+                    locker_wait.unlock()
+
+                    if self.running:
+                        self.update()
+
+                if self.DEBUG:
+                    dprint("Worker_DAQ  %s: done running" % self.dev.name,
+                           self.DEBUG_color)
+
+        @QtCore.pyqtSlot()
+        def stop(self):
+            """Only useful with DAQ_trigger.EXTERNAL_WAKE_UP_CALL
+            """
+            locker_wait = QtCore.QMutexLocker(self.mutex_wait)
+            self.running = False
+            self.qwc.wakeAll()
+            locker_wait.unlock()
 
         @QtCore.pyqtSlot()
         def update(self):
+            profiler = self.outer.profiler
             self.outer.DAQ_update_counter += 1
+            t_start = time.perf_counter()
             locker1 = QtCore.QMutexLocker(self.ard1.mutex)
             locker2 = QtCore.QMutexLocker(self.ard2.mutex)
+            profiler.record("lock_wait", time.perf_counter() - t_start)
 
             if self.DEBUG:
                 dprint("Worker_DAQ  %s: iter %i" %
@@ -331,6 +455,14 @@ class Arduino_pyqt(QtCore.QObject):
                     now - self.prev_tick_DAQ_update)
             self.prev_tick_DAQ_update = now
 
+            # Time stamps of this update
+            if self.deadline is not None:
+                [self.outer.DAQ_scheduled_time_ms,
+                 self.outer.DAQ_acquired_time_ms] = self.deadline.tick()
+            else:
+                self.outer.DAQ_scheduled_time_ms = now
+                self.outer.DAQ_acquired_time_ms = now
+
             # Keep track of the obtained DAQ rate
             # Start at iteration 5 to ensure we have stabilized
             if self.outer.DAQ_update_counter == 5:
@@ -341,6 +473,7 @@ class Arduino_pyqt(QtCore.QObject):
                         self.calc_DAQ_rate_every_N_iter /
                         (now - self.prev_tick_DAQ_rate) * 1e3)
                 self.prev_tick_DAQ_rate = now
+                self.outer.signal_timing_stats.emit(profiler.stats())
 
             # Check the alive counters
             if (self.outer.DAQ_ard1_not_alive_counter >=
@@ -351,7 +484,10 @@ class Arduino_pyqt(QtCore.QObject):
 
                 locker1.unlock()
                 locker2.unlock()
-                self.timer.stop()
+                if self.trigger_by == DAQ_trigger.INTERNAL_TIMER:
+                    self.timer.stop()
+                elif self.trigger_by == DAQ_trigger.EXTERNAL_WAKE_UP_CALL:
+                    self.stop()
                 self.outer.signal_DAQ_updated.emit()
                 self.outer.signal_connection_lost.emit()
                 return
@@ -364,7 +500,10 @@ class Arduino_pyqt(QtCore.QObject):
 
                 locker1.unlock()
                 locker2.unlock()
-                self.timer.stop()
+                if self.trigger_by == DAQ_trigger.INTERNAL_TIMER:
+                    self.timer.stop()
+                elif self.trigger_by == DAQ_trigger.EXTERNAL_WAKE_UP_CALL:
+                    self.stop()
                 self.outer.signal_DAQ_updated.emit()
                 self.outer.signal_connection_lost.emit()
                 return
@@ -374,7 +513,9 @@ class Arduino_pyqt(QtCore.QObject):
             # ------------------------
 
             if not(self.function_to_run_each_update is None):
+                tick = time.perf_counter()
                 [success1, success2] = self.function_to_run_each_update()
+                profiler.record("DAQ_function", time.perf_counter() - tick)
                 if not success1: self.outer.DAQ_ard1_not_alive_counter += 1
                 if not success2: self.outer.DAQ_ard2_not_alive_counter += 1
 
@@ -389,7 +530,28 @@ class Arduino_pyqt(QtCore.QObject):
                 dprint("Worker_DAQ  %s: unlocked" % self.dev.name,
                        self.DEBUG_color)
 
+            tick = time.perf_counter()
             self.outer.signal_DAQ_updated.emit()
+            tock = time.perf_counter()
+            profiler.record("signal_emit", tock - tick)
+            profiler.record("update", tock - t_start)
+
+            if self.deadline is not None:
+                self.timer.start(self.deadline.next_delay_ms())
+
+        # ----------------------------------------------------------------------
+        #   wake_up
+        # ----------------------------------------------------------------------
+
+        def wake_up(self):
+            if self.trigger_by == DAQ_trigger.EXTERNAL_WAKE_UP_CALL:
+                locker_wait = QtCore.QMutexLocker(self.mutex_wait)
+                if self.triggered:
+                    # The previous wake-up call is still pending
+                    self.N_wake_ups_superseded += 1
+                self.triggered = True
+                self.qwc.wakeAll()
+                locker_wait.unlock()
 
     # --------------------------------------------------------------------------
     #   Worker_send
@@ -399,8 +561,9 @@ class Arduino_pyqt(QtCore.QObject):
     class Worker_send(QtCore.QObject):
         """This worker maintains a thread-safe queue where desired device I/O
         operations, a.k.a. jobs, can be put onto. The worker will send out the
-        operations to the device, first in first out (FIFO), until the queue is
-        empty again.
+        operations to the device until the queue is empty again. Jobs are sent
+        in order of their priority, and first in first out (FIFO) within the
+        same priority, see 'DvG_dev_Base__pyqt_lib.Job_scheduler'.
 
         The worker should be placed inside a separate thread. This worker uses
         the QWaitCondition mechanism. Hence, it will only send out all
@@ -428,14 +591,12 @@ class Arduino_pyqt(QtCore.QObject):
             self.ard2 = self.outer.ard2
 
             self.running = True
+            self.triggered = False  # Guarded by 'mutex'
             self.mutex = QtCore.QMutex()
             self.qwc = QtCore.QWaitCondition()
 
-            # Use a 'sentinel' value to signal the start and end of the queue
-            # to ensure proper multithreaded operation.
-            self.sentinel = None
-            self.queue = queue.Queue()
-            self.queue.put(self.sentinel)
+            # Jobs are (ard, msg_str) or (ard, func, *args)
+            self.scheduler = Job_scheduler()
 
             if self.DEBUG:
                 dprint("Worker_send %s init: thread %s" %
@@ -447,45 +608,55 @@ class Arduino_pyqt(QtCore.QObject):
                 dprint("Worker_send %s run : thread %s" %
                        (self.dev.name, curThreadName()), self.DEBUG_color)
 
+            profiler = self.outer.profiler
             while self.running:
                 locker_worker = QtCore.QMutexLocker(self.mutex)
 
                 if self.DEBUG:
                     dprint("Worker_send %s: waiting for trigger" %
                            self.dev.name, self.DEBUG_color)
-                self.qwc.wait(self.mutex)
+
+                # A trigger that arrived while processing is not lost
+                while self.running and not self.triggered:
+                    self.qwc.wait(self.mutex)
+                self.triggered = False
+                locker_worker.unlock()
+
                 if self.DEBUG:
                     dprint("Worker_send %s: trigger received" %
                            self.dev.name, self.DEBUG_color)
 
-                """Process all jobs until the queue is empty. We must iterate 2
-                times because we use a sentinel in a FIFO queue. First iter
-                removes the old sentinel. Second iter processes the remaining
-                queue items and will put back a new sentinel again.
-                """
-                for i in range(2):
-                    for job in iter(self.queue.get_nowait, self.sentinel):
-                        ard  = job[0]
+                # Process all jobs until the queue is empty
+                while self.running:
+                    job = self.scheduler.get()
+                    if job is None:
+                        break
+
+                    ard = job.instruction
+                    if callable(job.args[0]):
+                        func = job.args[0]
+                        args = job.args[1:]
+                    else:
                         func = ard.write
-                        args = job[1:]
-
-                        if self.DEBUG:
-                            dprint("Worker_send %s: %s %s" %
-                                   (ard.name, func.__name__, args),
-                                   self.DEBUG_color)
-
-                        # Send I/O operation to the device
-                        locker = QtCore.QMutexLocker(ard.mutex)
-                        try:
-                            func(*args)
-                        except Exception as err:
-                            pft(err)
-                        locker.unlock()
-
-                    # Put sentinel back in
-                    self.queue.put(self.sentinel)
-
-                locker_worker.unlock()
+                        args = job.args
+
+                    if self.DEBUG:
+                        dprint("Worker_send %s: %s %s" %
+                               (ard.name, func.__name__, args),
+                               self.DEBUG_color)
+
+                    # Send I/O operation to the device
+                    tick = time.perf_counter()
+                    locker = QtCore.QMutexLocker(ard.mutex)
+                    tock = time.perf_counter()
+                    profiler.record("job_lock_wait", tock - tick)
+                    try:
+                        func(*args)
+                    except Exception as err:
+                        pft(err)
+                    profiler.record("job.%s.%s" % (ard.name, func.__name__),
+                                    time.perf_counter() - tock)
+                    locker.unlock()
 
             if self.DEBUG:
                 dprint("Worker_send %s: done running" % self.dev.name,
@@ -493,17 +664,43 @@ class Arduino_pyqt(QtCore.QObject):
 
         @QtCore.pyqtSlot()
         def stop(self):
+            locker_worker = QtCore.QMutexLocker(self.mutex)
             self.running = False
+            self.qwc.wakeAll()
+            locker_worker.unlock()
+
+        def process_queue(self):
+            """Trigger processing the worker_send queue.
+            """
+            locker_worker = QtCore.QMutexLocker(self.mutex)
+            self.triggered = True
+            self.qwc.wakeAll()
+            locker_worker.unlock()
 
     # --------------------------------------------------------------------------
     #   send
     # --------------------------------------------------------------------------
 
-    def send(self, ard: Arduino_functions.Arduino, write_msg_str):
+    def send(self, ard: Arduino_functions.Arduino, write_msg_str,
+             priority=Job_priority.NORMAL, coalesce_key=None):
         """Send I/O operation 'write' with argument 'msg_str' to the Arduino
-        'ard' via the worker_send queue and process the queue.
+        'ard' via the worker_send queue and process the queue. Use
+        'priority=Job_priority.SAFETY' for messages that have to jump ahead of
+        all other pending messages, like tripping the heaters. Pass a
+        'coalesce_key' for setpoints of which only the latest value matters:
+        a pending message with the same key gets replaced by this message,
+        and moves up when this message has a higher priority.
         """
-        self.worker_send.queue.put((ard, write_msg_str))
-
-        # Trigger processing the worker_send queue.
-        self.worker_send.qwc.wakeAll()
\ No newline at end of file
+        self.worker_send.scheduler.put(
+                ard, (write_msg_str,), priority,
+                coalesce_key=None if coalesce_key is None else
+                             (ard, coalesce_key))
+        self.worker_send.process_queue()
+
+    def send_function(self, ard: Arduino_functions.Arduino, func, *args):
+        """Run 'func(*args)' via the worker_send queue, with the mutex of the
+        Arduino 'ard' locked, and process the queue. Useful to move device I/O
+        that is not time critical off the DAQ thread.
+        """
+        self.worker_send.scheduler.put(ard, (func,) + args)
+        self.worker_send.process_queue()
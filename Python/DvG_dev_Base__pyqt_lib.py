@@ -6,6 +6,50 @@ and periodical data acquisition for an I/O device.
 MAIN CONTENTS:
 --------------
 
+    Enums:
+        DAQ_trigger
+        Job_priority
+
+    Class:
+        Timing_histogram()
+            Methods:
+                record(...)
+                stats()
+                reset()
+
+    Class:
+        Timing_profiler()
+            Methods:
+                record(...)
+                wrap(...)
+                stats()
+                reset()
+
+    Class:
+        Deadline_scheduler(...)
+            Methods:
+                start()
+                tick()
+                next_delay_ms()
+                reset_metrics()
+
+    Class:
+        Refresh_throttle(...)
+            Methods:
+                trigger()
+
+            Signals:
+                signal_refresh()
+
+    Class:
+        Job_scheduler()
+            Methods:
+                put(...)
+                get()
+                cancel(...)
+                clear()
+                reset_metrics()
+
     Class:
         Dev_Base_pyqt(...)
             Methods:
@@ -17,6 +61,8 @@ MAIN CONTENTS:
                 close_thread_worker_DAQ()
                 close_thread_worker_send()
                 close_all_threads()
+                write_latest(...)
+                cancel_write_latest(...)
 
             Inner-class instances:
                 worker_DAQ(...)
@@ -29,33 +75,576 @@ MAIN CONTENTS:
                         process_queue()
                         queued_instruction(...)
 
+                    Main data attributes:
+                        scheduler:
+                            Job_scheduler instance holding the queued jobs and
+                            the queue-depth and wait-time metrics.
+
             Main data attributes:
                 DAQ_update_counter
                 obtained_DAQ_update_interval_ms
                 obtained_DAQ_rate_Hz
+                DAQ_scheduled_time_ms
+                DAQ_acquired_time_ms
+                profiler:
+                    Timing_profiler instance, always on, timing the sections
+                    of each DAQ update, each device I/O call and each job of
+                    'worker_send'.
+                min_write_interval_ms:
+                    Minimum time between two writes of the same instruction via
+                    'write_latest(...)'.
+                state_buffer:
+                    DvG_StateBuffer.StateBuffer instance of 'dev.state', when
+                    the attached device has a 'state' member. A snapshot is
+                    published after each successful DAQ update. Other threads,
+                    like the main/GUI thread, should read
+                    'state_buffer.snapshot()' instead of 'dev.state'. No need
+                    to lock 'dev.mutex' for that.
+                GUI_throttle:
+                    Refresh_throttle instance coalescing 'signal_DAQ_updated'
+                    into 'signal_GUI_refresh'.
 
             Signals:
                 signal_DAQ_updated()
+                signal_GUI_refresh()
                 signal_connection_lost()
+                signal_timing_stats(dict)
 """
 __author__      = "Dennis van Gils"
 __authoremail__ = "vangils.dennis@gmail.com"
 __url__         = "https://github.com/Dennis-van-Gils/DvG_dev_Arduino"
-__date__        = "19-09-2018"
-__version__     = "1.1.0"
+__date__        = "17-10-2026"
+__version__     = "1.6.1"
 
 from enum import IntEnum, unique
-import queue
+import collections
+import functools
+import heapq
+import itertools
+import math
+import time
 import numpy as np
 from PyQt5 import QtCore
 from DvG_debug_functions import ANSI, dprint, print_fancy_traceback as pft
+from DvG_StateBuffer import StateBuffer
 
 # Short-hand alias for DEBUG information
 def curThreadName(): return QtCore.QThread.currentThread().objectName()
 
 @unique
 class DAQ_trigger(IntEnum):
-    [INTERNAL_TIMER, EXTERNAL_WAKE_UP_CALL] = range(2)
+    [INTERNAL_TIMER, EXTERNAL_WAKE_UP_CALL, DEADLINE_TIMER] = range(3)
+
+@unique
+class Job_priority(IntEnum):
+    # Lower value gets processed first
+    [SAFETY, NORMAL, LOW] = range(3)
+
+# Methods of a device instance that perform device I/O. These get timed by the
+# profiler of Dev_Base_pyqt when present, see 'Timing_profiler.wrap()'.
+DEVICE_IO_METHODS = ("write", "read", "query", "query_ascii_values",
+                     "query_binary_values", "query_multiline", "read_reply",
+                     "read_frame", "UDP_send", "UDP_recv")
+
+# ------------------------------------------------------------------------------
+#   Timing_histogram
+# ------------------------------------------------------------------------------
+
+Timing_stats = collections.namedtuple(
+        "Timing_stats", ["N", "mean_ms", "p50_ms", "p95_ms", "p99_ms",
+                         "max_ms"])
+
+class Timing_histogram():
+    """Histogram of durations with a fixed number of logarithmically spaced
+    bins, 20 per decade from 1 us up to 100 s. Recording a duration costs a
+    logarithm and an increment, regardless of the number of recordings. The
+    percentiles are resolved to within 12 %, i.e. the width of a bin, while
+    the maximum and mean are exact.
+
+    Methods:
+        record(duration):
+            Add a duration in seconds.
+
+        stats():
+            Return a Timing_stats namedtuple (N, mean_ms, p50_ms, p95_ms,
+            p99_ms, max_ms). Values are NaN when nothing has been recorded.
+
+        reset():
+            Clear all recordings.
+    """
+    BINS_PER_DECADE = 20
+    T_MIN = 1e-6                # [s] Lower edge of the first bin
+    N_BINS = 8 * BINS_PER_DECADE
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.N_BINS
+        self.N = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, duration):
+        # Not guarded by a mutex: A recording lost to a race between threads is
+        # of no concern for timing statistics.
+        if duration > self.T_MIN:
+            i = int(math.log10(duration / self.T_MIN) * self.BINS_PER_DECADE)
+            if i >= self.N_BINS: i = self.N_BINS - 1
+        else:
+            i = 0
+        self.counts[i] += 1
+        self.N += 1
+        self.sum += duration
+        if duration > self.max: self.max = duration
+
+    def _percentile(self, cumsum, fraction):
+        i = np.searchsorted(cumsum, fraction * cumsum[-1])
+        # Upper edge of the bin, but never more than the maximum
+        upper = self.T_MIN * 10**((i + 1) / self.BINS_PER_DECADE)
+        return min(upper, self.max) * 1e3
+
+    def stats(self):
+        if self.N == 0:
+            return Timing_stats(0, *[np.nan] * 5)
+
+        cumsum = np.cumsum(self.counts)
+        return Timing_stats(self.N,
+                            self.sum / self.N * 1e3,
+                            self._percentile(cumsum, 0.50),
+                            self._percentile(cumsum, 0.95),
+                            self._percentile(cumsum, 0.99),
+                            self.max * 1e3)
+
+# ------------------------------------------------------------------------------
+#   Timing_profiler
+# ------------------------------------------------------------------------------
+
+class Timing_profiler():
+    """Collection of Timing_histogram instances, one per named section of
+    code. Intended to be always on, hence kept lightweight. Time a section by
+    calling 'time.perf_counter()' before and after and pass the difference to
+    'record()'.
+
+    Methods:
+        record(section, duration):
+            Add a duration in seconds to the histogram of 'section', which gets
+            created on first use.
+
+        wrap(obj, method_names=DEVICE_IO_METHODS, prefix="io."):
+            Time every call to the methods 'method_names' of the instance 'obj'
+            in the section 'prefix' + method name. Methods that 'obj' does not
+            have are skipped. Calls nested inside each other each get timed,
+            e.g. 'query' calling 'write'.
+
+        stats():
+            Return a dict of a Timing_stats namedtuple per section, in order of
+            first use.
+
+        reset():
+            Clear all histograms.
+
+    Important members:
+        histograms (dict):
+            Timing_histogram per section.
+    """
+    def __init__(self):
+        self.histograms = dict()
+
+    def record(self, section, duration):
+        histogram = self.histograms.get(section)
+        if histogram is None:
+            histogram = self.histograms.setdefault(section, Timing_histogram())
+        histogram.record(duration)
+
+    def wrap(self, obj, method_names=DEVICE_IO_METHODS, prefix="io."):
+        for name in method_names:
+            method = getattr(obj, name, None)
+            if callable(method):
+                setattr(obj, name, self._timed(method, prefix + name))
+
+    def _timed(self, method, section):
+        @functools.wraps(method)
+        def timed_method(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(section, time.perf_counter() - t0)
+        return timed_method
+
+    def stats(self):
+        return {section: histogram.stats()
+                for (section, histogram) in list(self.histograms.items())}
+
+    def reset(self):
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+# ------------------------------------------------------------------------------
+#   Deadline_scheduler
+# ------------------------------------------------------------------------------
+
+class Deadline_scheduler():
+    """Schedules the DAQ updates of a 'Worker_DAQ' against an absolute,
+    monotonic timeline: update k is due at 't_start + k * interval'. Unlike a
+    repeating QTimer, a slow update does not shift all later updates, hence
+    the samples stay uniformly spaced in time without drift.
+
+    An update that has not finished before the next one is due is an overrun.
+    With 'skip_missed' the deadlines that have passed in the meantime are
+    skipped, i.e. the next update is due at the first deadline still ahead.
+    Otherwise, all missed updates are run back-to-back to catch up.
+
+    Timestamps are in milliseconds since epoch, as by
+    'QtCore.QDateTime.currentMSecsSinceEpoch()', but derived from the
+    monotonic clock 'time.perf_counter()'.
+
+    Args:
+        interval_ms:
+            Interval in milliseconds between two scheduled updates.
+
+        skip_missed (bool, optional, default=True):
+            Skip the deadlines missed by an overrun?
+
+    Methods:
+        start():
+            Start the timeline, with the first update due now.
+
+        tick():
+            To be called at the start of each update. Returns the tuple
+            (scheduled time, actual time) of this update.
+
+        next_delay_ms():
+            To be called at the end of each update. Advances to the next
+            deadline and returns the time to wait for it in whole
+            milliseconds, rounded up.
+
+        reset_metrics():
+            Reset the overrun metrics.
+
+    Important members:
+        scheduled_time_ms (float):
+            Time at which the last update was due.
+        acquired_time_ms (float):
+            Time at which the last update actually started.
+        lateness_ms (float):
+            Difference between the two above.
+        max_lateness_ms (float):
+        N_overruns (int):
+            Number of updates that ran past the deadline of the next update.
+        N_skipped (int):
+            Number of deadlines skipped because of overruns.
+    """
+    def __init__(self, interval_ms, skip_missed=True):
+        self.interval = interval_ms / 1e3
+        self.skip_missed = skip_missed
+
+        # Maps the monotonic clock onto ms since epoch
+        self._t0_perf = time.perf_counter()
+        self._t0_epoch_ms = QtCore.QDateTime.currentMSecsSinceEpoch()
+
+        self._t_start = self._t0_perf
+        self._k = 0                 # Index of the current deadline
+
+        self.scheduled_time_ms = np.nan
+        self.acquired_time_ms = np.nan
+        self.lateness_ms = np.nan
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.max_lateness_ms = np.nan
+        self.N_overruns = 0
+        self.N_skipped = 0
+
+    def _epoch_ms(self, t):
+        return self._t0_epoch_ms + (t - self._t0_perf) * 1e3
+
+    def start(self):
+        self._t_start = time.perf_counter()
+        self._k = 0
+
+    def tick(self):
+        now = time.perf_counter()
+        self.scheduled_time_ms = self._epoch_ms(self._t_start +
+                                                self._k * self.interval)
+        self.acquired_time_ms = self._epoch_ms(now)
+        self.lateness_ms = self.acquired_time_ms - self.scheduled_time_ms
+        if not self.max_lateness_ms >= self.lateness_ms:    # Also when NaN
+            self.max_lateness_ms = self.lateness_ms
+        return (self.scheduled_time_ms, self.acquired_time_ms)
+
+    def next_delay_ms(self):
+        self._k += 1
+        remaining = self._t_start + self._k * self.interval - time.perf_counter()
+        if remaining < 0:
+            self.N_overruns += 1
+            if self.skip_missed:
+                N_missed = math.ceil(-remaining / self.interval)
+                self._k += N_missed
+                self.N_skipped += N_missed
+                remaining += N_missed * self.interval
+            else:
+                return 0
+
+        return math.ceil(remaining * 1e3)
+
+# ------------------------------------------------------------------------------
+#   Refresh_throttle
+# ------------------------------------------------------------------------------
+
+class Refresh_throttle(QtCore.QObject):
+    """Coalesces a signal that fires at a high rate, e.g. 'signal_DAQ_updated',
+    into at most 'max_rate_Hz' emissions per second of 'signal_refresh'. Meant
+    to drive the GUI, which does not need to redraw at the full DAQ rate.
+
+    Connect the signal to 'trigger()'. A trigger arriving sooner than
+    1 / 'max_rate_Hz' after the last refresh is held back, and all triggers
+    held back get emitted as a single refresh when the interval has passed.
+    Hence, the last trigger of a burst always results in a refresh. The
+    throttle lives in the thread that creates it, typically the main/GUI
+    thread, so triggers from a worker thread arrive as queued signals.
+
+    Args:
+        max_rate_Hz (optional, default=None):
+            Maximum number of refreshes per second. None or 0 passes every
+            trigger on as a refresh.
+
+    Methods:
+        trigger():
+            Request a refresh.
+
+    Important members:
+        max_rate_Hz:
+            Can be changed at any time.
+        N_triggered (int):
+        N_refreshed (int):
+
+    Signals:
+        signal_refresh()
+    """
+    signal_refresh = QtCore.pyqtSignal()
+
+    def __init__(self, max_rate_Hz=None, parent=None):
+        super().__init__(parent=parent)
+        self.max_rate_Hz = max_rate_Hz
+        self.N_triggered = 0
+        self.N_refreshed = 0
+
+        self._t_last_refresh = -np.inf     # [ms]
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._refresh)
+
+    @QtCore.pyqtSlot()
+    def trigger(self):
+        self.N_triggered += 1
+        if self._timer.isActive():
+            # Coalesced into the pending refresh
+            return
+
+        if not self.max_rate_Hz:
+            self._refresh()
+            return
+
+        remaining_ms = (self._t_last_refresh + 1e3 / self.max_rate_Hz -
+                        time.perf_counter() * 1e3)
+        if remaining_ms > 0:
+            self._timer.start(math.ceil(remaining_ms))
+        else:
+            self._refresh()
+
+    def _refresh(self):
+        self._t_last_refresh = time.perf_counter() * 1e3
+        self.N_refreshed += 1
+        self.signal_refresh.emit()
+
+# ------------------------------------------------------------------------------
+#   Job_scheduler
+# ------------------------------------------------------------------------------
+
+class Job_scheduler():
+    """Thread-safe priority queue of the jobs of a 'Worker_send', i.e. the
+    device I/O operations waiting to be sent out.
+
+    Jobs are handed out in order of their priority, see 'Job_priority', and
+    first in first out (FIFO) within the same priority. Hence, safety jobs like
+    tripping a heater or stopping a motor jump ahead of all other pending jobs.
+
+    A job can be given a 'coalesce_key'. When a job with the same key is still
+    pending, that job gets the arguments of the new job instead of adding
+    another job. The pending job keeps its place in the queue, unless the new
+    job has a higher priority in which case it moves up. Hence, a burst of
+    setpoint changes results in a single write of the latest setpoint.
+
+    A job can cancel pending jobs by their 'coalesce_key'. Reprioritizing alone
+    is not enough for safety jobs: a pending 'turn on' that got overtaken by a
+    'turn off' would still be sent out afterwards, undoing the safety job.
+
+    A job can be given a deadline. When it could not be started in time, it is
+    dropped as being stale.
+
+    Methods:
+        put(instruction, args=(), priority=Job_priority.NORMAL,
+            coalesce_key=None, deadline_ms=None, cancels=()):
+            Add a job, after dropping the pending jobs having any of the
+            coalesce keys listed in 'cancels'. Returns True when added as a
+            new job, False when coalesced with a pending job.
+
+        get():
+            Pop the next job to process, or return None when the queue is
+            empty. Expired jobs are skipped.
+
+        cancel(keys):
+            Drop the pending jobs having any of the listed coalesce keys.
+            Returns the number of dropped jobs.
+
+        clear():
+            Drop all pending jobs.
+
+        reset_metrics():
+            Reset all metrics, except 'queue_depth'.
+
+    Important members:
+        queue_depth (int):
+            Number of pending jobs.
+        max_queue_depth (int):
+        N_processed (int):
+            Number of jobs handed out by 'get()'.
+        N_coalesced (int):
+            Number of jobs merged into a pending job.
+        N_expired (int):
+            Number of jobs dropped because their deadline had passed.
+        N_cancelled (int):
+            Number of jobs dropped by 'cancel()' or 'put(cancels=...)'.
+        last_wait_time_ms (float):
+            Time between adding and handing out the last job.
+        max_wait_time_ms (float):
+        mean_wait_time_ms (float):
+    """
+    class Job():
+        __slots__ = ("priority", "seq", "instruction", "args", "coalesce_key",
+                     "t_added", "t_deadline")
+
+        def __lt__(self, other):
+            return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def __init__(self):
+        self.mutex = QtCore.QMutex()
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = dict()      # Pending jobs by their coalesce key
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.max_queue_depth = len(self._heap)
+        self.N_processed = 0
+        self.N_coalesced = 0
+        self.N_expired = 0
+        self.N_cancelled = 0
+        self.last_wait_time_ms = np.nan
+        self.max_wait_time_ms = np.nan
+        self._sum_wait_time_ms = 0
+
+    @property
+    def queue_depth(self):
+        return len(self._heap)
+
+    @property
+    def mean_wait_time_ms(self):
+        if self.N_processed == 0:
+            return np.nan
+        return self._sum_wait_time_ms / self.N_processed
+
+    def put(self, instruction, args=(), priority=Job_priority.NORMAL,
+            coalesce_key=None, deadline_ms=None, cancels=()):
+        now = time.perf_counter()
+        t_deadline = (None if deadline_ms is None else
+                      now + deadline_ms / 1e3)
+
+        locker = QtCore.QMutexLocker(self.mutex)
+        # Cancel under the same lock, so that the worker can never pick up a
+        # cancelled job in between
+        self._cancel(cancels)
+
+        if coalesce_key is not None and coalesce_key in self._pending:
+            job = self._pending[coalesce_key]
+            job.instruction = instruction
+            job.args = args
+            job.t_deadline = t_deadline
+            if priority < job.priority:
+                # Move up, e.g. an over-temperature trip replacing a pending
+                # 'okay' must not wait behind the normal jobs
+                job.priority = priority
+                heapq.heapify(self._heap)
+            self.N_coalesced += 1
+            locker.unlock()
+            return False
+
+        job = self.Job()
+        job.priority = priority
+        job.seq = next(self._seq)
+        job.instruction = instruction
+        job.args = args
+        job.coalesce_key = coalesce_key
+        job.t_added = now
+        job.t_deadline = t_deadline
+        heapq.heappush(self._heap, job)
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = job
+
+        self.max_queue_depth = max(self.max_queue_depth, len(self._heap))
+        locker.unlock()
+        return True
+
+    def get(self):
+        locker = QtCore.QMutexLocker(self.mutex)
+        while self._heap:
+            job = heapq.heappop(self._heap)
+            if job.coalesce_key is not None:
+                del self._pending[job.coalesce_key]
+
+            now = time.perf_counter()
+            if job.t_deadline is not None and now > job.t_deadline:
+                self.N_expired += 1
+                continue
+
+            wait_time_ms = (now - job.t_added) * 1e3
+            self.N_processed += 1
+            self.last_wait_time_ms = wait_time_ms
+            self.max_wait_time_ms = (wait_time_ms if self.N_processed == 1
+                                     else max(self.max_wait_time_ms,
+                                              wait_time_ms))
+            self._sum_wait_time_ms += wait_time_ms
+            locker.unlock()
+            return job
+
+        locker.unlock()
+        return None
+
+    def cancel(self, keys):
+        locker = QtCore.QMutexLocker(self.mutex)
+        N_cancelled = self._cancel(keys)
+        locker.unlock()
+        return N_cancelled
+
+    def _cancel(self, keys):
+        # Expects 'self.mutex' to be locked
+        cancelled = [self._pending.pop(key) for key in keys
+                     if key in self._pending]
+        if cancelled:
+            cancelled_ids = set(map(id, cancelled))
+            self._heap = [job for job in self._heap
+                          if id(job) not in cancelled_ids]
+            heapq.heapify(self._heap)
+            self.N_cancelled += len(cancelled)
+        return len(cancelled)
+
+    def clear(self):
+        locker = QtCore.QMutexLocker(self.mutex)
+        self._heap.clear()
+        self._pending.clear()
+        locker.unlock()
 
 # ------------------------------------------------------------------------------
 #   InnerClassDescriptor
@@ -92,8 +681,9 @@ class Dev_Base_pyqt(QtCore.QObject):
 
         - Worker_send:
             Maintains a thread-safe queue where desired device I/O operations
-            can be put onto, and sends the queued operations first in first out
-            (FIFO) to the device.
+            can be put onto, and sends the queued operations in order of
+            priority, first in first out (FIFO) within the same priority, to
+            the device.
 
     This class can be mixed into your own specific device_pyqt class definition.
     Hint: Look up 'mixin class' for Python.
@@ -131,6 +721,11 @@ class Dev_Base_pyqt(QtCore.QObject):
             Safer and more convenient than calling 'close_thread_worker_DAQ' and
             'close_thread_worker_send', individually.
 
+        write_latest(...):
+            Write a setpoint to the device via the 'worker_send' queue, where
+            the latest value wins. Bursts of new setpoints, e.g. when typing or
+            dragging in the GUI, collapse into a single write.
+
     Inner-class instances:
         worker_DAQ
         worker_send
@@ -154,18 +749,61 @@ class Dev_Base_pyqt(QtCore.QObject):
             Obtained acquisition rate of 'worker_DAQ' in Hertz, evaluated every
             second.
 
+        DAQ_scheduled_time_ms:
+            Time at which the current 'worker_DAQ' update was due, in
+            milliseconds since epoch. Only differs from 'DAQ_acquired_time_ms'
+            with 'DAQ_trigger.DEADLINE_TIMER', where it lies on a uniformly
+            spaced timeline. Intended to time stamp the sample acquired by the
+            DAQ function.
+
+        DAQ_acquired_time_ms:
+            Time at which the current 'worker_DAQ' update actually started, in
+            milliseconds since epoch.
+
+        min_write_interval_ms (default=0):
+            Minimum time in milliseconds between two writes of the same
+            instruction via 'write_latest(...)'. Set it for slow devices.
+
+        profiler (Timing_profiler):
+            Always-on timing of the following sections, each in a histogram:
+                'lock_wait'    : waiting for 'dev.mutex' in a DAQ update
+                'DAQ_function' : the user-supplied DAQ function
+                'publish'      : publishing the state snapshot
+                'signal_emit'  : emitting 'signal_DAQ_updated'
+                'update'       : the whole DAQ update
+                'io.<method>'  : each call to a device I/O method, see
+                                 'DEVICE_IO_METHODS', by either worker
+                'job_lock_wait': waiting for 'dev.mutex' in 'worker_send'
+                'job.<name>'   : each job of 'worker_send', by instruction
+
+        GUI_throttle (Refresh_throttle):
+            Coalesces 'signal_DAQ_updated' into 'signal_GUI_refresh'. Set
+            'GUI_throttle.max_rate_Hz' to limit the number of GUI refreshes
+            per second, without lowering the DAQ rate. Unlimited by default.
+
     Signals:
         signal_DAQ_updated:
             Emitted by 'worker_DAQ' when 'update' has finished.
 
+        signal_GUI_refresh:
+            Emitted in the main/GUI thread after 'signal_DAQ_updated', but at
+            most 'GUI_throttle.max_rate_Hz' times per second. Connect the GUI
+            update routine to this signal instead of to 'signal_DAQ_updated'.
+
         signal_connection_lost:
             Indicates that we lost connection to the device, because one or more
             device I/O operations failed. Emitted by 'worker_DAQ' during
             'update' when 'DAQ_not_alive_counter' is equal to or larger than
             'worker_DAQ.critical_not_alive_count'.
+
+        signal_timing_stats (dict):
+            Emitted by 'worker_DAQ' each time 'obtained_DAQ_rate_Hz' has been
+            evaluated, i.e. every second, passing 'profiler.stats()'.
     """
     signal_DAQ_updated     = QtCore.pyqtSignal()
+    signal_GUI_refresh     = QtCore.pyqtSignal()
     signal_connection_lost = QtCore.pyqtSignal()
+    signal_timing_stats    = QtCore.pyqtSignal(dict)
 
     def __init__(self, parent):
         super(Dev_Base_pyqt, self).__init__(parent=parent)
@@ -180,6 +818,20 @@ class Dev_Base_pyqt(QtCore.QObject):
         self.obtained_DAQ_update_interval_ms = np.nan
         self.obtained_DAQ_rate_Hz = np.nan
 
+        self.DAQ_scheduled_time_ms = np.nan
+        self.DAQ_acquired_time_ms = np.nan
+
+        self.state_buffer = None
+
+        self.min_write_interval_ms = 0
+        self._write_slots = dict()  # Write slots by their instruction
+
+        self.profiler = Timing_profiler()
+
+        self.GUI_throttle = Refresh_throttle(parent=self)
+        self.signal_DAQ_updated.connect(self.GUI_throttle.trigger)
+        self.GUI_throttle.signal_refresh.connect(self.signal_GUI_refresh)
+
     class NoAttachedDevice():
         name = "NoAttachedDevice"
         is_alive = False
@@ -195,6 +847,9 @@ class Dev_Base_pyqt(QtCore.QObject):
         if type(self.dev) == self.NoAttachedDevice:
             self.dev = dev
             self.dev.mutex = QtCore.QMutex()
+            self.profiler.wrap(dev)
+            if hasattr(dev, 'state'):
+                self.state_buffer = StateBuffer(dev.state)
         else:
             pft("Device can be attached only once. Already attached to '%s'." %
                 self.dev.name)
@@ -315,6 +970,92 @@ class Dev_Base_pyqt(QtCore.QObject):
         if hasattr(self, 'thread_DAQ') : self.close_thread_worker_DAQ()
         if hasattr(self, 'thread_send'): self.close_thread_worker_send()
 
+    # --------------------------------------------------------------------------
+    #   write_latest
+    # --------------------------------------------------------------------------
+
+    class Write_slot():
+        # Holds the latest value of a setpoint that awaits being written
+        __slots__ = ("instruction", "pass_args", "follow_up", "timer",
+                     "t_last_write")
+
+    def write_latest(self, instruction, pass_args=(), follow_up=()):
+        """Write a setpoint to the device via the 'worker_send' queue, where
+        the latest value wins. To be called from the main/GUI thread only.
+
+        Each instruction has its own write slot. A new value replaces the value
+        of a write that is still waiting in the queue, see 'Job_scheduler'.
+        Writes of the same instruction are spaced at least
+        'min_write_interval_ms' apart. A value arriving sooner is held back and
+        written when the interval has passed, unless it has been superseded by
+        an even newer value by then. Hence, a slow device never builds up a
+        backlog of stale setpoints.
+
+        Args:
+            instruction:
+                Reference to a device I/O function, e.g.
+                'self.dev.send_setpoint'.
+
+            pass_args (optional, default=()):
+                Argument(s) to be passed to the instruction, see
+                'Worker_send.add_to_queue'.
+
+            follow_up (list of tuples, optional, default=()):
+                Jobs to put on the queue after each write, each being a tuple
+                (instruction, *args). E.g. to read back the setpoint.
+        """
+        if type(pass_args) is not tuple: pass_args = (pass_args,)
+
+        slot = self._write_slots.get(instruction)
+        if slot is None:
+            slot = self.Write_slot()
+            slot.instruction = instruction
+            slot.timer = QtCore.QTimer(self)
+            slot.timer.setSingleShot(True)
+            slot.timer.timeout.connect(lambda: self._write_slot(slot))
+            slot.t_last_write = -np.inf
+            self._write_slots[instruction] = slot
+
+        slot.pass_args = pass_args
+        slot.follow_up = follow_up
+
+        if slot.timer.isActive():
+            # The held back value gets replaced
+            return
+
+        remaining_ms = (slot.t_last_write + self.min_write_interval_ms -
+                        time.perf_counter() * 1e3)
+        if remaining_ms > 0:
+            slot.timer.start(int(np.ceil(remaining_ms)))
+        else:
+            self._write_slot(slot)
+
+    def cancel_write_latest(self, instruction):
+        """Drop the value of 'instruction' that is still waiting to be written
+        via 'write_latest', both a held back value and a write pending in the
+        queue. E.g. to prevent a pending move from being sent out after a stop
+        of the motor. To be called from the main/GUI thread only.
+
+        Returns True when a value got dropped.
+        """
+        slot = self._write_slots.get(instruction)
+        if slot is None:
+            return False
+
+        was_held_back = slot.timer.isActive()
+        slot.timer.stop()
+        N_cancelled = self.worker_send.scheduler.cancel((instruction,))
+        return was_held_back or N_cancelled > 0
+
+    def _write_slot(self, slot):
+        slot.t_last_write = time.perf_counter() * 1e3
+        scheduler = self.worker_send.scheduler
+        scheduler.put(slot.instruction, slot.pass_args,
+                      coalesce_key=slot.instruction)
+        for job in slot.follow_up:
+            scheduler.put(job[0], tuple(job[1:]), coalesce_key=tuple(job))
+        self.worker_send.process_queue()
+
     # --------------------------------------------------------------------------
     #   Worker_DAQ
     # --------------------------------------------------------------------------
@@ -388,11 +1129,28 @@ class Dev_Base_pyqt(QtCore.QObject):
                 it is resource heavy. Use sparingly.
 
             DAQ_trigger_by (optional, default=DAQ_trigger.INTERNAL_TIMER):
-                TO DO: write description
+                INTERNAL_TIMER: Update every 'DAQ_update_interval_ms', timed by
+                a repeating QTimer. A slow update shifts all later updates.
+                EXTERNAL_WAKE_UP_CALL: Update each time 'wake_up()' is called.
+                DEADLINE_TIMER: Update at the deadlines of a uniformly spaced
+                timeline, see 'Deadline_scheduler', by re-arming a single-shot
+                QTimer after each update. The timer is always a PreciseTimer,
+                as a CoarseTimer may fire early. Overruns get counted in
+                'deadline.N_overruns'.
+
+            DAQ_skip_missed_deadlines (bool, optional, default=True):
+                Only used by DAQ_trigger.DEADLINE_TIMER: Skip the deadlines
+                missed by an overrun, instead of running the missed updates
+                back-to-back.
 
             DEBUG (bool, optional, default=False):
                 Show debug info in terminal? Warning: Slow! Do not leave on
                 unintentionally.
+
+        Main data attributes:
+            deadline:
+                Deadline_scheduler instance with DAQ_trigger.DEADLINE_TIMER,
+                None otherwise.
         """
         def __init__(self,
                      DAQ_update_interval_ms,
@@ -400,6 +1158,7 @@ class Dev_Base_pyqt(QtCore.QObject):
                      DAQ_critical_not_alive_count=1,
                      DAQ_timer_type=QtCore.Qt.CoarseTimer,
                      DAQ_trigger_by=DAQ_trigger.INTERNAL_TIMER,
+                     DAQ_skip_missed_deadlines=True,
                      DEBUG=False):
             super().__init__(None)
             self.DEBUG = DEBUG
@@ -417,6 +1176,12 @@ class Dev_Base_pyqt(QtCore.QObject):
                 self.mutex_wait = QtCore.QMutex()
                 self.running = True
 
+            if self.trigger_by == DAQ_trigger.DEADLINE_TIMER:
+                self.deadline = Deadline_scheduler(DAQ_update_interval_ms,
+                                                   DAQ_skip_missed_deadlines)
+            else:
+                self.deadline = None
+
             self.calc_DAQ_rate_every_N_iter = max(
                     round(1e3/self.update_interval_ms), 1)
             self.prev_tick_DAQ_update = 0
@@ -440,6 +1205,15 @@ class Dev_Base_pyqt(QtCore.QObject):
                 self.timer.setTimerType(self.timer_type)
                 self.timer.start()
 
+            # DEADLINE TIMER
+            elif self.trigger_by == DAQ_trigger.DEADLINE_TIMER:
+                self.timer = QtCore.QTimer()
+                self.timer.setSingleShot(True)
+                self.timer.timeout.connect(self.update)
+                self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+                self.deadline.start()
+                self.timer.start(0)
+
             # EXTERNAL WAKE UP
             elif self.trigger_by == DAQ_trigger.EXTERNAL_WAKE_UP_CALL:
                 while self.running:
@@ -466,7 +1240,11 @@ class Dev_Base_pyqt(QtCore.QObject):
 
         @QtCore.pyqtSlot()
         def update(self):
+            profiler = self.outer.profiler
+            t_start = time.perf_counter()
             locker = QtCore.QMutexLocker(self.dev.mutex)
+            t_locked = time.perf_counter()
+            profiler.record("lock_wait", t_locked - t_start)
             self.outer.DAQ_update_counter += 1
 
             if self.DEBUG:
@@ -481,6 +1259,14 @@ class Dev_Base_pyqt(QtCore.QObject):
                         now - self.prev_tick_DAQ_update)
             self.prev_tick_DAQ_update = now
 
+            # Time stamps of this update
+            if self.deadline is not None:
+                [self.outer.DAQ_scheduled_time_ms,
+                 self.outer.DAQ_acquired_time_ms] = self.deadline.tick()
+            else:
+                self.outer.DAQ_scheduled_time_ms = now
+                self.outer.DAQ_acquired_time_ms = now
+
             # Keep track of the obtained DAQ rate
             # Start at iteration 5 to ensure we have stabilized
             if self.outer.DAQ_update_counter == 5:
@@ -491,6 +1277,7 @@ class Dev_Base_pyqt(QtCore.QObject):
                         self.calc_DAQ_rate_every_N_iter /
                         (now - self.prev_tick_DAQ_rate) * 1e3)
                 self.prev_tick_DAQ_rate = now
+                self.outer.signal_timing_stats.emit(profiler.stats())
 
             # Check the not alive counter
             if (self.outer.DAQ_not_alive_counter >=
@@ -513,8 +1300,16 @@ class Dev_Base_pyqt(QtCore.QObject):
             # ----------------------------------
 
             if not(self.function_to_run_each_update is None):
-                if not(self.function_to_run_each_update()):
+                tick = time.perf_counter()
+                success = self.function_to_run_each_update()
+                tock = time.perf_counter()
+                profiler.record("DAQ_function", tock - tick)
+
+                if not(success):
                     self.outer.DAQ_not_alive_counter += 1
+                elif self.outer.state_buffer is not None:
+                    self.outer.state_buffer.publish()
+                    profiler.record("publish", time.perf_counter() - tock)
 
             # ----------------------------------
             #   End user-supplied DAQ function
@@ -525,7 +1320,14 @@ class Dev_Base_pyqt(QtCore.QObject):
                        self.DEBUG_color)
 
             locker.unlock()
+            tick = time.perf_counter()
             self.outer.signal_DAQ_updated.emit()
+            tock = time.perf_counter()
+            profiler.record("signal_emit", tock - tick)
+            profiler.record("update", tock - t_start)
+
+            if self.deadline is not None:
+                self.timer.start(self.deadline.next_delay_ms())
 
         # ----------------------------------------------------------------------
         #   wake_up
@@ -543,8 +1345,9 @@ class Dev_Base_pyqt(QtCore.QObject):
     class Worker_send(QtCore.QObject):
         """This worker maintains a thread-safe queue where desired device I/O
         operations, a.k.a. jobs, can be put onto. The worker will send out the
-        operations to the device, first in first out (FIFO), until the queue is
-        empty again.
+        operations to the device until the queue is empty again. Jobs are sent
+        in order of their priority, and first in first out (FIFO) within the
+        same priority, see 'Job_scheduler'.
 
         The worker should be placed inside a separate thread. This worker uses
         the QWaitCondition mechanism. Hence, it will only send out all
@@ -552,6 +1355,9 @@ class Dev_Base_pyqt(QtCore.QObject):
         woken up by calling 'Worker_send.process_queue()'. When it has emptied
         the queue, the thread will go back to sleep again.
 
+        The device mutex is locked per job instead of for the whole queue, so
+        that DAQ updates can interleave with a long queue of jobs.
+
         No direct changes to the GUI should be performed inside this class. If
         needed, use the QtCore.pyqtSignal() mechanism to instigate GUI changes.
 
@@ -619,12 +1425,9 @@ class Dev_Base_pyqt(QtCore.QObject):
             self.qwc = QtCore.QWaitCondition()
             self.mutex_wait = QtCore.QMutex()
             self.running = True
+            self.triggered = False  # Guarded by 'mutex_wait'
 
-            # Use a 'sentinel' value to signal the start and end of the queue
-            # to ensure proper multithreaded operation.
-            self.sentinel = None
-            self.queue = queue.Queue()
-            self.queue.put(self.sentinel)
+            self.scheduler = Job_scheduler()
 
             if self.DEBUG:
                 dprint("Worker_send %s init: thread %s" %
@@ -636,6 +1439,7 @@ class Dev_Base_pyqt(QtCore.QObject):
                 dprint("Worker_send %s run : thread %s" %
                        (self.dev.name, curThreadName()), self.DEBUG_color)
 
+            profiler = self.outer.profiler
             while self.running:
                 locker_wait = QtCore.QMutexLocker(self.mutex_wait)
 
@@ -643,55 +1447,49 @@ class Dev_Base_pyqt(QtCore.QObject):
                     dprint("Worker_send %s: waiting for trigger" %
                            self.dev.name, self.DEBUG_color)
 
-                self.qwc.wait(self.mutex_wait)
-                locker = QtCore.QMutexLocker(self.dev.mutex)
+                # A trigger that arrived while processing is not lost
+                while self.running and not self.triggered:
+                    self.qwc.wait(self.mutex_wait)
+                self.triggered = False
+                locker_wait.unlock()
                 self.update_counter += 1
 
-                if self.DEBUG:
-                    dprint("Worker_send %s: lock %i" %
-                           (self.dev.name, self.update_counter),
-                           self.DEBUG_color)
+                # Process all jobs until the queue is empty. The device mutex
+                # is released in between jobs.
+                while self.running:
+                    job = self.scheduler.get()
+                    if job is None:
+                        break
 
-                """Process all jobs until the queue is empty. We must iterate 2
-                times because we use a sentinel in a FIFO queue. First iter
-                removes the old sentinel. Second iter processes the remaining
-                queue items and will put back a new sentinel again.
-                """
-                for i in range(2):
-                    for job in iter(self.queue.get_nowait, self.sentinel):
-                        func = job[0]
-                        args = job[1:]
-
-                        if self.DEBUG:
-                            if type(func) == str:
-                                dprint("Worker_send %s: %s %s" %
-                                       (self.dev.name, func, args),
-                                       self.DEBUG_color)
-                            else:
-                                dprint("Worker_send %s: %s %s" %
-                                       (self.dev.name, func.__name__, args),
-                                       self.DEBUG_color)
-
-                        if self.alt_process_jobs_function is None:
-                            # Default job processing:
-                            # Send I/O operation to the device
-                            try:
-                                func(*args)
-                            except Exception as err:
-                                pft(err)
-                        else:
-                            # User-supplied job processing
-                            self.alt_process_jobs_function(func, args)
-
-                    # Put sentinel back in
-                    self.queue.put(self.sentinel)
+                    func = job.instruction
+                    args = job.args
 
-                if self.DEBUG:
-                    dprint("Worker_send %s: unlocked" % self.dev.name,
-                           self.DEBUG_color)
+                    tick = time.perf_counter()
+                    locker = QtCore.QMutexLocker(self.dev.mutex)
+                    tock = time.perf_counter()
+                    profiler.record("job_lock_wait", tock - tick)
 
-                locker.unlock()
-                locker_wait.unlock()
+                    if self.DEBUG:
+                        dprint("Worker_send %s: %s %s" %
+                               (self.dev.name,
+                                func if type(func) == str else func.__name__,
+                                args), self.DEBUG_color)
+
+                    if self.alt_process_jobs_function is None:
+                        # Default job processing:
+                        # Send I/O operation to the device
+                        try:
+                            func(*args)
+                        except Exception as err:
+                            pft(err)
+                    else:
+                        # User-supplied job processing
+                        self.alt_process_jobs_function(func, args)
+
+                    profiler.record("job." + (func if type(func) == str else
+                                              getattr(func, "__name__", "?")),
+                                    time.perf_counter() - tock)
+                    locker.unlock()
 
             if self.DEBUG:
                 dprint("Worker_send %s: done running" % self.dev.name,
@@ -699,13 +1497,18 @@ class Dev_Base_pyqt(QtCore.QObject):
 
         @QtCore.pyqtSlot()
         def stop(self):
+            locker_wait = QtCore.QMutexLocker(self.mutex_wait)
             self.running = False
+            self.qwc.wakeAll()
+            locker_wait.unlock()
 
         # ----------------------------------------------------------------------
         #   add_to_queue
         # ----------------------------------------------------------------------
 
-        def add_to_queue(self, instruction, pass_args=()):
+        def add_to_queue(self, instruction, pass_args=(),
+                         priority=Job_priority.NORMAL, coalesce=False,
+                         deadline_ms=None, cancels=()):
             """Put an instruction on the worker_send queue.
             E.g. add_to_queue(self.dev.write, "toggle LED")
 
@@ -725,9 +1528,36 @@ class Dev_Base_pyqt(QtCore.QObject):
                     tuple, but for convenience any other type will also be
                     accepted if it concerns just a single argument that needs to
                     be passed.
+
+                priority (Job_priority, optional, default=NORMAL):
+                    Use 'Job_priority.SAFETY' for instructions that have to
+                    jump ahead of all other pending instructions, like turning
+                    off a power output or stopping a motor.
+
+                coalesce (bool, optional, default=False):
+                    When True and the same instruction is still pending, that
+                    pending instruction gets the new arguments instead, e.g.
+                    for setpoints of which only the latest value matters.
+
+                deadline_ms (float, optional, default=None):
+                    Drop the instruction when it could not be started within
+                    this time.
+
+                cancels (list, optional, default=()):
+                    Pending instructions to drop before adding this one. Only
+                    instructions that were queued with 'coalesce=True' or via
+                    'write_latest' can be cancelled. E.g. a motor stop
+                    cancelling a pending jog, which would otherwise be sent
+                    out after the stop.
+
+            Returns True when added as a new job, False when coalesced with a
+            pending job.
             """
             if type(pass_args) is not tuple: pass_args = (pass_args,)
-            self.queue.put((instruction, *pass_args))
+            return self.scheduler.put(
+                    instruction, pass_args, priority,
+                    coalesce_key=instruction if coalesce else None,
+                    deadline_ms=deadline_ms, cancels=cancels)
 
         # ----------------------------------------------------------------------
         #   process_queue
@@ -736,15 +1566,22 @@ class Dev_Base_pyqt(QtCore.QObject):
         def process_queue(self):
             """Trigger processing the worker_send queue.
             """
+            locker_wait = QtCore.QMutexLocker(self.mutex_wait)
+            self.triggered = True
             self.qwc.wakeAll()
+            locker_wait.unlock()
 
         # ----------------------------------------------------------------------
         #   queued_instruction
         # ----------------------------------------------------------------------
 
-        def queued_instruction(self, instruction, pass_args=()):
+        def queued_instruction(self, instruction, pass_args=(),
+                               priority=Job_priority.NORMAL, coalesce=False,
+                               deadline_ms=None, cancels=()):
             """Put an instruction on the worker_send queue and process the
             queue. See 'add_to_queue' for more details.
             """
-            self.add_to_queue(instruction, pass_args)
+            added = self.add_to_queue(instruction, pass_args, priority,
+                                      coalesce, deadline_ms, cancels)
             self.process_queue()
+            return added
@@ -21,6 +21,7 @@ import struct
 from pathlib import Path
 
 from DvG_debug_functions import print_fancy_traceback as pft
+from DvG_StateSchema import StateSchema
 
 # Serial settings
 RS232_BAUDRATE = 38400      # Baudrate according to the manual
@@ -31,10 +32,13 @@ RS232_TIMEOUT  = 0.1        # [sec]
 # ------------------------------------------------------------------------------
 
 class Bronkhorst_MFC():
-    class State():
-        # Container for the process and measurement variables
-        setpoint  = None        # Setpoint read out of the MFC    [ln/min]
-        flow_rate = None        # Flow rate measured by the MFC   [ln/min]
+    # Container for the process and measurement variables
+    State = StateSchema([
+        # name           dtype   unit      default
+        ("setpoint"      , "<f8", "ln/min", None),  # Read out of the MFC
+        ("flow_rate"     , "<f8", "ln/min", None),  # Measured by the MFC
+        ("prev_flow_rate", None , "ln/min", None),  # See the pyqt lib
+    ]).State
 
     # --------------------------------------------------------------------------
     #   __init__
@@ -265,4 +265,4 @@ class Bronkhorst_MFC_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
         setpoint = min(setpoint, self.dev.max_flow_rate)
         self.qled_send_setpoint.setText("%.2f" % setpoint)
 
-        self.worker_send.queued_instruction(self.dev.send_setpoint, setpoint)
\ No newline at end of file
+        self.write_latest(self.dev.send_setpoint, setpoint)
\ No newline at end of file
@@ -24,6 +24,7 @@ from pathlib import Path
 
 import numpy as np
 from DvG_debug_functions import print_fancy_traceback as pft
+from DvG_StateSchema import StateSchema
 
 # Serial settings
 RS232_BAUDRATE = 115200
@@ -55,10 +56,12 @@ class Compax3_traverse():
         PSB1 = np.nan               # bit 14
         PSB2 = np.nan               # bit 15
 
-    class State():
-        # Container for the process and measurement variables
-        cur_pos = np.nan            # position [mm]
-        error_msg = np.nan          # error string message
+    # Container for the process and measurement variables
+    State = StateSchema([
+        # name      dtype   unit  default
+        ("cur_pos"  , "<f8", "mm"),          # Position
+        ("error_msg", None , ""  , np.nan),  # Error string message
+    ]).State
 
     def __init__(self, name='trav'):
         self.ser = None                 # serial.Serial device instance
@@ -293,7 +296,11 @@ class Compax3_traverse():
                     sys.exit(0)
                 else:
                     ans_str = ans_bytes.decode('utf8').strip()
-                    if ans_str[0] == '>':
+                    if len(ans_str) == 0:
+                        # Received 0 bytes, probably due to a timeout
+                        pft("Received 0 bytes. Read probably timed out.", 3)
+                        ans_str = None
+                    elif ans_str[0] == '>':
                         # Successfull operation without meaningfull reply
                         success = True
                     elif ans_str[0] == '!':
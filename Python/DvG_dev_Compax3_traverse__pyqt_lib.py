@@ -19,6 +19,7 @@ from DvG_pyqt_controls import (SS_GROUP,
 
 import DvG_dev_Compax3_traverse__fun_RS232 as compax3_functions
 import DvG_dev_Base__pyqt_lib as Dev_Base_pyqt_lib
+from DvG_dev_Base__pyqt_lib import Job_priority
 
 # Show debug info in terminal? Warning: Slow! Do not leave on unintentionally.
 DEBUG_worker_DAQ  = False
@@ -284,34 +285,44 @@ class Compax3_traverse_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
             new_pos = float(self.qled_new_pos.text())
         except:
             raise()
-        self.worker_send.queued_instruction(self.dev.move_to_target_position,
-                                            (new_pos, 2))
+        self.write_latest(self.dev.move_to_target_position, (new_pos, 2))
 
     @QtCore.pyqtSlot()
     def process_pbtn_jog_plus_pressed(self):
         if not(self.jog_plus_is_active):
             self.jog_plus_is_active = True
-            self.worker_send.queued_instruction(self.dev.jog_plus)
+            self.worker_send.queued_instruction(self.dev.jog_plus,
+                                                coalesce=True)
 
     @QtCore.pyqtSlot()
     def process_pbtn_jog_plus_released(self):
         self.jog_plus_is_active = False
-        self.worker_send.queued_instruction(self.dev.stop_motion_but_keep_power)
+        self.stop_motion(self.dev.stop_motion_but_keep_power)
 
     @QtCore.pyqtSlot()
     def process_pbtn_jog_minus_pressed(self):
         if not(self.jog_minus_is_active):
             self.jog_minus_is_active = True
-            self.worker_send.queued_instruction(self.dev.jog_minus)
+            self.worker_send.queued_instruction(self.dev.jog_minus,
+                                                coalesce=True)
 
     @QtCore.pyqtSlot()
     def process_pbtn_jog_minus_released(self):
         self.jog_minus_is_active = False
-        self.worker_send.queued_instruction(self.dev.stop_motion_but_keep_power)
+        self.stop_motion(self.dev.stop_motion_but_keep_power)
 
     @QtCore.pyqtSlot()
     def process_pbtn_stop(self):
-        self.worker_send.queued_instruction(self.dev.stop_motion_and_remove_power)
+        self.stop_motion(self.dev.stop_motion_and_remove_power)
+
+    def stop_motion(self, instruction):
+        # Send out the stop ahead of all other jobs and drop the pending jogs
+        # and move. Those would otherwise be sent out after the stop, moving
+        # the traverse again with nothing left to stop it.
+        self.cancel_write_latest(self.dev.move_to_target_position)
+        self.worker_send.queued_instruction(
+                instruction, priority=Job_priority.SAFETY,
+                cancels=(self.dev.jog_plus, self.dev.jog_minus))
 
     # --------------------------------------------------------------------------
     #   connect_signals_to_slots
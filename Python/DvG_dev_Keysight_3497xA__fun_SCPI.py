@@ -23,6 +23,7 @@ import visa
 import numpy as np
 
 from DvG_debug_functions import print_fancy_traceback
+from DvG_StateSchema import StateSchema
 
 WRITE_TERMINATION = '\n'
 READ_TERMINATION = '\n'
@@ -65,29 +66,30 @@ class K3497xA():
     """
     can_check_error_queue_by_polling_stb = False
 
-    class State():
-        """Container for the process and measurement variables.
-        An empty list [] indicates that the parameter is not initialized or
-        that the last query was unsuccessful in communication.
-        """
+    # Container for the process and measurement variables.
+    # An empty list [] indicates that the parameter is not initialized or that
+    # the last query was unsuccessful in communication.
+    State = StateSchema([
+        # name                      dtype unit default
         # All the channels in the scan list retreived from the 3497xA [list of
         # strings]. This can be used to e.g. populate a table view with correct
         # labels.
-        all_scan_list_channels = []
+        ("all_scan_list_channels", None, "", []),
 
         # List of readings returned by the device after a full scan cycle
-        readings = []
+        ("readings"              , None, "", []),
 
         # The single error string retreived from the error queue of the device.
         # None indicates no error is left in the queue.
-        error = None
+        ("error"                 , None, "", None),
 
         # This list of strings is provided to be able to store all errors from
         # the device queue. This list is populated by calling 'query_error'
         # until no error is left in the queue. This list can then be printed to
         # screen or GUI and the user should 'acknowledge' the list, after which
         # the list can be emptied (=[]) again.
-        all_errors = []
+        ("all_errors"            , None, "", []),
+    ]).State
 
     class Diag():
         """Container for the diagnostic information.
@@ -21,6 +21,7 @@ import numpy as np
 from pathlib import Path
 
 from DvG_debug_functions import print_fancy_traceback as pft
+from DvG_StateSchema import StateSchema
 
 # 'No error left' reply from the PSU
 STR_NO_ERROR = "ERR 0"
@@ -32,47 +33,58 @@ VISA_TIMEOUT = 4000      # 4000 [msec]
 PATH_CONFIG = Path(os.getcwd() + "/config/settings_Keysight_PSU.txt")
 
 class PSU():
-    class State():
-        """Container for the process and measurement variables.
-        [numpy.nan] values indicate that the parameter is not initialized or
-        that the last query was unsuccessful in communication.
-        """
-        V_source = 0        # Voltage to be sourced [V]
-        I_source = 0        # Current to be sourced [A]
-        P_source = 0        # Power to be sourced, when PID controller is on [W]
-        ENA_PID = False     # Is the PID controller on the power ouput enabled?
-
-        V_meas = np.nan         # Measured output voltage [V]
-        I_meas = np.nan         # Measured output current [A]
-        P_meas = np.nan         # Derived output power    [W]
-
-        OVP_level  = np.nan     # Over-voltage protection level [V]
-        ENA_OCP    = False      # Is over-current protection enabled?
-        ENA_output = False      # Is power output enabled (by software)?
+    # Container for the process and measurement variables.
+    # [numpy.nan] values indicate that the parameter is not initialized or that
+    # the last query was unsuccessful in communication.
+    State = StateSchema([
+        # name          dtype  unit  default
+        ("V_source"   , "<f8", "V" , 0),        # Voltage to be sourced
+        ("I_source"   , "<f8", "A" , 0),        # Current to be sourced
+        ("P_source"   , "<f8", "W" , 0),        # Power to be sourced, when PID
+                                                # controller is on
+        ("ENA_PID"    , "?"  , ""  , False),    # Is the PID controller on the
+                                                # power ouput enabled?
+
+        ("V_meas"     , "<f8", "V" , np.nan),   # Measured output voltage
+        ("I_meas"     , "<f8", "A" , np.nan),   # Measured output current
+        ("P_meas"     , "<f8", "W" , np.nan),   # Derived output power
+
+        ("OVP_level"  , "<f8", "V" , np.nan),   # Over-voltage protection level
+        ("ENA_OCP"    , "?"  , ""  , False),    # Is over-current protection
+                                                # enabled?
+        ("ENA_output" , "?"  , ""  , False),    # Is power output enabled (by
+                                                # software)?
 
         # The error string retreived from the error queue of the device. None
         # indicates no error is left in the queue.
-        error = None
+        ("error"      , None , ""  , None),
 
         # This list of strings is provided to be able to store all errors from
         # the device queue. This list is populated by calling 'query_error'
         # until no error is left in the queue. This list can then be printed to
         # screen or GUI and the user should 'acknowledge' the list, after which
         # the list can be emptied (=[]) again.
-        all_errors = []
+        ("all_errors" , None , ""  , []),
 
         # Questionable condition status registers
-        status_QC_OV  = False   # Output disabled by over-voltage protection
-        status_QC_OC  = False   # Output disabled by over-current protection
-        status_QC_PF  = False   # Output disabled because AC power failed
-        status_QC_OT  = False   # Output disabled by over-temperature protection
-        status_QC_INH = False   # Output turned off by external J1 inhibit signal (ENABLE)
-        status_QC_UNR = False   # The output is unregulated
+        ("status_QC_OV" , "?", "", False),  # Output disabled by over-voltage
+                                            # protection
+        ("status_QC_OC" , "?", "", False),  # Output disabled by over-current
+                                            # protection
+        ("status_QC_PF" , "?", "", False),  # Output disabled because AC power
+                                            # failed
+        ("status_QC_OT" , "?", "", False),  # Output disabled by
+                                            # over-temperature protection
+        ("status_QC_INH", "?", "", False),  # Output turned off by external J1
+                                            # inhibit signal (ENABLE)
+        ("status_QC_UNR", "?", "", False),  # The output is unregulated
 
         # Operation condition status registers
-        status_OC_WTG = False   # Unit waiting for transient trigger
-        status_OC_CV  = False   # Output in constant voltage
-        status_OC_CC  = False   # Output in constant current
+        ("status_OC_WTG", "?", "", False),  # Unit waiting for transient
+                                            # trigger
+        ("status_OC_CV" , "?", "", False),  # Output in constant voltage
+        ("status_OC_CC" , "?", "", False),  # Output in constant current
+    ]).State
 
     class Config():
         V_source  = 120         # Voltage to be sourced [V]
@@ -26,7 +26,7 @@ from DvG_debug_functions import dprint, print_fancy_traceback as pft
 import DvG_PID_controller
 import DvG_dev_Keysight_N8700_PSU__fun_SCPI as N8700_functions
 import DvG_dev_Base__pyqt_lib               as Dev_Base_pyqt_lib
-from   DvG_dev_Base__pyqt_lib import DAQ_trigger
+from   DvG_dev_Base__pyqt_lib import DAQ_trigger, Job_priority
 
 # Monospace font
 FONT_MONOSPACE = QtGui.QFont("Monospace", 12, weight=QtGui.QFont.Bold)
@@ -485,10 +485,14 @@ class PSU_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
         if self.pbtn_ENA_output.isChecked():
             # Clear output protection, if triggered and turn on output
             self.worker_send.queued_instruction(
-                    self.dev.clear_output_protection_and_turn_on)
+                    self.dev.clear_output_protection_and_turn_on,
+                    coalesce=True)
         else:
-            # Turn off output
-            self.worker_send.queued_instruction(self.dev.turn_off)
+            # Turn off output. A turn-on that is still pending must not be
+            # sent out after the turn-off.
+            self.worker_send.queued_instruction(
+                    self.dev.turn_off, priority=Job_priority.SAFETY,
+                    cancels=(self.dev.clear_output_protection_and_turn_on,))
 
     def process_pbtn_ENA_PID(self):
         self.dev.state.ENA_PID = self.pbtn_ENA_PID.isChecked()
@@ -558,11 +562,10 @@ class PSU_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
 
         if (voltage < 0): voltage = 0
 
-        self.worker_send.add_to_queue(self.dev.set_V_source, voltage)
-        self.worker_send.add_to_queue(self.dev.query_V_source)
-        self.worker_send.add_to_queue("signal_GUI_input_field_update",
-                                      GUI_input_fields.V_source)
-        self.worker_send.process_queue()
+        self.write_latest(self.dev.set_V_source, voltage,
+                          follow_up=[(self.dev.query_V_source,),
+                                     ("signal_GUI_input_field_update",
+                                      GUI_input_fields.V_source)])
 
     def send_I_source_from_textbox(self):
         try:
@@ -574,11 +577,10 @@ class PSU_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
 
         if (current < 0): current = 0
 
-        self.worker_send.add_to_queue(self.dev.set_I_source, current)
-        self.worker_send.add_to_queue(self.dev.query_I_source)
-        self.worker_send.add_to_queue("signal_GUI_input_field_update",
-                                      GUI_input_fields.I_source)
-        self.worker_send.process_queue()
+        self.write_latest(self.dev.set_I_source, current,
+                          follow_up=[(self.dev.query_I_source,),
+                                     ("signal_GUI_input_field_update",
+                                      GUI_input_fields.I_source)])
 
     def set_P_source_from_textbox(self):
         try:
@@ -5,12 +5,14 @@
 __author__      = "Dennis van Gils"
 __authoremail__ = "vangils.dennis@gmail.com"
 __url__         = ""
-__date__        = "15-09-2018"
-__version__     = "1.0.0"
+__date__        = "17-10-2026"
+__version__     = "1.1.0"
 
 import socket
 import numpy as np
 
+from DvG_StateSchema import StateSchema
+
 # ITS-90 resistance-temperature relation for PT100/PT1000
 # R_t = R_0 * (1 + A*t + B*t^2 + C*(t-100)*t^3)
 # R_t: resistance at T 'C   [Ohm]
@@ -53,18 +55,20 @@ class PT104():
         MAC        = None
         checksum   = None
 
-    class State():
-        # Container for the process and measurement variables
-        # Resistance readings of channels 1 to 4 [Ohm]
-        ch1_R = np.nan
-        ch2_R = np.nan
-        ch3_R = np.nan
-        ch4_R = np.nan
-        # Temperature readings of channels 1 to 4 ['C]
-        ch1_T = np.nan
-        ch2_T = np.nan
-        ch3_T = np.nan
-        ch4_T = np.nan
+    # Container for the process and measurement variables
+    State = StateSchema([
+        # name  dtype   unit
+        # Resistance readings of channels 1 to 4
+        ("ch1_R", "<f8", "Ohm"),
+        ("ch2_R", "<f8", "Ohm"),
+        ("ch3_R", "<f8", "Ohm"),
+        ("ch4_R", "<f8", "Ohm"),
+        # Temperature readings of channels 1 to 4
+        ("ch1_T", "<f8", "deg_C"),
+        ("ch2_T", "<f8", "deg_C"),
+        ("ch3_T", "<f8", "deg_C"),
+        ("ch4_T", "<f8", "deg_C"),
+    ]).State
 
     # --------------------------------------------------------------------------
     #   __init__
@@ -24,6 +24,7 @@ from pathlib import Path
 
 import numpy as np
 from DvG_debug_functions import print_fancy_traceback as pft
+from DvG_StateSchema import StateSchema
 
 # Serial settings
 RS232_BAUDRATE = 9600       # Baudrate according to the manual
@@ -117,13 +118,15 @@ class ThermoFlex_chiller():
         powering_down         = np.nan
         fault_tripped         = np.nan
 
-    class State():
-        # Container for the process and measurement variables
-        setpoint     = np.nan   # Setpoint read out of the chiller         ['C]
-        temp         = np.nan   # Temperature measured by the chiller      ['C]
-        flow         = np.nan   # Flow rate measured by the chiller        [LPM]
-        supply_pres  = np.nan   # Supply pressure measured by the chiller  [bar]
-        suction_pres = np.nan   # Suction pressure measured by the chiller [bar]
+    # Container for the process and measurement variables
+    State = StateSchema([
+        # name         dtype   unit
+        ("setpoint"    , "<f8", "deg_C"),  # Read out of the chiller
+        ("temp"        , "<f8", "deg_C"),  # Measured by the chiller
+        ("flow"        , "<f8", "LPM"),    # Measured by the chiller
+        ("supply_pres" , "<f8", "bar"),    # Measured by the chiller
+        ("suction_pres", "<f8", "bar"),    # Measured by the chiller
+    ]).State
 
     # --------------------------------------------------------------------------
     #   __init__
@@ -380,7 +383,10 @@ class ThermoFlex_chiller():
             else:
                 # Check for errors reported by a possibly connected ThermoFlex
                 # chiller
-                if (len(ans_bytes) >= 4) and ans_bytes[3] == 0x0f:
+                if len(ans_bytes) == 0:
+                    # Received 0 bytes, probably due to a timeout
+                    pft("Received 0 bytes. Read probably timed out.", 3)
+                elif (len(ans_bytes) >= 4) and ans_bytes[3] == 0x0f:
                     # Error reported by chiller
                     if ans_bytes[5] == 1:
                         pft("Bad command received by chiller", 3)
@@ -20,6 +20,7 @@ from DvG_debug_functions import print_fancy_traceback as pft
 
 import DvG_dev_ThermoFlex_chiller__fun_RS232 as chiller_functions
 import DvG_dev_Base__pyqt_lib                as Dev_Base_pyqt_lib
+from DvG_dev_Base__pyqt_lib import Job_priority
 
 # Special characters
 CHAR_DEG_C = chr(176) + 'C'
@@ -96,6 +97,9 @@ class ThermoFlex_chiller_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
 
         self.attach_device(dev)
 
+        # Slow device at 9600 baud: Space out the writes of new setpoints
+        self.min_write_interval_ms = 500
+
         self.create_worker_DAQ(DAQ_update_interval_ms,
                                self.DAQ_update,
                                DAQ_critical_not_alive_count,
@@ -480,9 +484,14 @@ class ThermoFlex_chiller_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
     @QtCore.pyqtSlot()
     def process_pbtn_on(self):
         if self.dev.status_bits.running:
-            self.worker_send.queued_instruction(self.dev.turn_off)
+            # A turn-on that is still pending must not be sent out after the
+            # turn-off
+            self.worker_send.queued_instruction(
+                    self.dev.turn_off, priority=Job_priority.SAFETY,
+                    cancels=(self.dev.turn_on,))
         else:
-            self.worker_send.queued_instruction(self.dev.turn_on)
+            self.worker_send.queued_instruction(self.dev.turn_on,
+                                                coalesce=True)
 
     @QtCore.pyqtSlot()
     def process_pbtn_read_alarm_values(self):
@@ -509,7 +518,7 @@ class ThermoFlex_chiller_pyqt(Dev_Base_pyqt_lib.Dev_Base_pyqt, QtCore.QObject):
         setpoint = min(setpoint, self.dev.max_setpoint_degC)
         self.send_setpoint.setText("%.1f" % setpoint)
 
-        self.worker_send.queued_instruction(self.dev.send_setpoint, setpoint)
+        self.write_latest(self.dev.send_setpoint, setpoint)
 
     # --------------------------------------------------------------------------
     #   connect_signals_to_slots
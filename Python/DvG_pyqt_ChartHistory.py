@@ -8,58 +8,393 @@ pushes new data points into the history buffers by calling `add_new_reading(s)`,
 and another thread performs the GUI refresh and redraws the data behind the plot
 by calling `update_curve`.
 
+Class MultiChartHistory does the same for several channels that are acquired
+at the same time, e.g. all the channels of a multiplexer scan. It stores a
+single `x` array shared by all channels and a 2-D `y` array with one column per
+channel, and drives one `pyqtgraph.PlotDataItem` per channel. A whole row of
+readings is added at once and all curves are updated from a single snapshot,
+i.e. a single mutex lock. ChartHistory is the special case of a
+MultiChartHistory with one channel.
+
 New readings are stored in an history array of fixed size. Newest readings
 are placed at the end of the array. Array full? -> FIFO.
 
-Class:
-    ChartHistory(chart_history_length, plot_data_item):
+Optionally, the buffered data can be decimated before it is handed over to
+PyQtGraph, see `apply_downsampling`. The decimation is min/max based, i.e.
+peak-preserving: The visible x-range is divided into buckets of roughly one
+screen pixel wide and only the minimum and maximum reading of each bucket are
+plotted, i.e. ~2 points per screen pixel. A single-sample spike hence stays
+visible at any zoom level, contrary to averaging. The decimated data is cached
+per bucket width, i.e. per selected x-range, and is updated incrementally with
+the readings that have arrived since the previous redraw.
+
+To display a longer history than the raw buffers can hold, e.g. 24 hours or a
+multi-day measurement campaign, a chart history can be given a list of
+aggregate tiers, e.g. 1 s, 10 s and 1 min buckets. Each tier stores the
+minimum, mean and maximum of every channel per bucket in its own circular
+buffer of fixed size, hence memory use is bounded and constant regardless of
+the run length. Which data gets plotted is chosen automatically from the
+visible x-range: The raw buffers when they cover it, otherwise the finest tier
+that does.
+
+A redraw is skipped when no new readings have arrived and no setting affecting
+the plotted data has changed since the previous redraw, e.g. for a device that
+went offline. Hidden curves are not redrawn. They get redrawn from the data of
+the last redraw as soon as they are shown again.
+
+The history buffers are preallocated numpy arrays acting as a circular buffer.
+Each buffer is allocated twice the history length and every reading is written
+to both halves. This way the full history, ordered from oldest to newest, is
+always available as one contiguous slice of the buffer and a snapshot boils
+down to a single memory copy, regardless of where the write index currently
+is.
+
+Classes:
+    MinMaxDecimation(bucket_width, N_channels):
+        Peak-preserving decimation of a multi-channel time series into buckets
+        of fixed width along the x-axis. Used internally by MultiChartHistory.
+
+    MultiChartHistory(chart_history_length, plot_data_items, N_channels,
+                      tiers):
         Args:
             chart_history_length:
                 Number of data points to store in each history buffer.
-            plot_data_item:
-                Instance of `pyqtgraph.PlotDataItem` to plot out the buffered
-                data to.
+            plot_data_items:
+                List of instances of `pyqtgraph.PlotDataItem` to plot out the
+                buffered data to, one per channel.
+            N_channels (optional):
+                Number of channels. Only needed when `plot_data_items` is not
+                given.
+            tiers (optional):
+                List of tuples (bucket_width, N_buckets) describing the
+                aggregate tiers, ordered from fine to coarse. `bucket_width` is
+                in units of x. Default: None, i.e. raw data only.
 
         Methods:
             apply_downsampling(...):
-                Calls the downsampling routines of PyQtGraph, but in the future
-                I will provide my own routines for downsampling here.
+                Enable or disable min/max decimation down to ~2 points per
+                screen pixel.
             add_new_reading(...):
-                Add single data point (x, y) to the history buffers.
+                Add single data point (x, row_y) to the history buffers, where
+                `row_y` holds one reading per channel.
             add_new_readings(...):
-                Add lists of data points (list_x, list_y) to the history
-                buffers.
-            update_curve():
-                Update the data behind the curve and redraw.
+                Add lists of data points (list_x, table_y) to the history
+                buffers, where `table_y` has one row per reading and one column
+                per channel.
+            snapshot():
+                Return a copy of the buffered data, ordered from oldest to
+                newest.
+            update_curves():
+                Update the data behind all visible curves and redraw, when
+                new readings have arrived or the settings have changed.
+            tier_snapshot(i_tier):
+                Return a copy of the aggregated data of the tier with index
+                `i_tier` as a tuple (x, table_min, table_mean, table_max).
             clear():
-                Clear buffers.
+                Clear buffers, including the aggregate tiers.
 
-        Important member:
+        Important members:
+            curves:
+                List of the `pyqtgraph.PlotDataItem` instances, one per
+                channel.
             x_axis_divisor:
                 If the x-data is time, you can use this divisor value to
                 transform the x-axis units from e.g. milliseconds to seconds or
                 minutes.
             y_axis_divisor:
                 Same functionality as x_axis_divisor
+            tier_aggregate:
+                Either 'minmax' (default) to plot the min/max envelope of the
+                aggregate tiers, or 'mean' to plot their mean.
+
+    ChartHistory(chart_history_length, plot_data_item, tiers):
+        Args:
+            chart_history_length:
+                Number of data points to store in each history buffer.
+            plot_data_item:
+                Instance of `pyqtgraph.PlotDataItem` to plot out the buffered
+                data to.
+            tiers (optional):
+                See MultiChartHistory.
+
+        Methods:
+            Same as MultiChartHistory, but `add_new_reading(s)` and `snapshot`
+            take and return a single `y` value per reading, and
+            update_curve():
+                Update the data behind the curve and redraw.
+
+        Important members:
+            curve:
+                The `pyqtgraph.PlotDataItem` instance.
+            x_axis_divisor
+            y_axis_divisor
 """
 __author__      = "Dennis van Gils"
 __authoremail__ = "vangils.dennis@gmail.com"
 __url__         = "https://github.com/Dennis-van-Gils/DvG_PyQt_misc"
-__date__        = "14-09-2018"
-__version__     = "1.0.0"
+__date__        = "17-10-2026"
+__version__     = "1.5.2"
 
-import collections
+import math
+import functools
 
 import numpy as np
 from PyQt5 import QtCore
 import pyqtgraph as pg
 
-class ChartHistory(object):
+# Maximum number of min/max decimation caches per chart history, i.e. the
+# number of different x-ranges that are remembered
+MAX_DECIMATION_CACHES = 8
+
+# ------------------------------------------------------------------------------
+#   MinMaxDecimation
+# ------------------------------------------------------------------------------
+
+class MinMaxDecimation(object):
+    """Min/max (peak-preserving) decimation of a multi-channel time series
+    into buckets of fixed width `bucket_width` along the x-axis. The buckets
+    are aligned to multiples of `bucket_width`, hence new readings can be
+    appended incrementally without reducing the existing buckets again, except
+    for the last one which might need merging.
+
+    Per bucket the x-values of the first and last reading are kept together
+    with the minimum and maximum reading of each channel, ignoring NaNs.
+
+    Methods:
+        append(x, table_y):
+            Reduce and append new readings, ordered from oldest to newest.
+        trim(x_lo):
+            Drop the buckets that lie entirely before `x_lo`.
+        curve_data():
+            Return the decimated data as a tuple (x, table_y) with two points
+            per bucket: The minimum followed by the maximum.
+        clear():
+            Drop all buckets.
+    """
+    def __init__(self, bucket_width, N_channels=1):
+        self.bucket_width = bucket_width
+        self.N_channels = N_channels
+        self.clear()
+
+        # Bookkeeping by the owner of the cache, to decide whether the cache
+        # can be updated incrementally
+        self.x_lo = np.inf
+        self.n_total = 0
+        self.n_cleared = 0
+
+    def clear(self):
+        self._ids = np.empty(0, dtype=np.int64)
+        self._x_first = np.empty(0)
+        self._x_last = np.empty(0)
+        self._y_min = np.empty((0, self.N_channels))
+        self._y_max = np.empty((0, self.N_channels))
+
+    def append(self, x, table_y):
+        if len(x) == 0:
+            return
+
+        ids = np.floor(x / self.bucket_width).astype(np.int64)
+        i_start = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+        i_end = np.append(i_start[1:], len(x))
+
+        ids = ids[i_start]
+        x_first = x[i_start]
+        x_last = x[i_end - 1]
+        y_min = np.fmin.reduceat(table_y, i_start, axis=0)
+        y_max = np.fmax.reduceat(table_y, i_start, axis=0)
+
+        if len(self._ids) > 0 and ids[0] == self._ids[-1]:
+            # Merge the first new bucket into the last existing one
+            self._x_last[-1] = x_last[0]
+            self._y_min[-1] = np.fmin(self._y_min[-1], y_min[0])
+            self._y_max[-1] = np.fmax(self._y_max[-1], y_max[0])
+            [ids, x_first, x_last, y_min, y_max] = [
+                ids[1:], x_first[1:], x_last[1:], y_min[1:], y_max[1:]]
+
+        self._ids = np.concatenate((self._ids, ids))
+        self._x_first = np.concatenate((self._x_first, x_first))
+        self._x_last = np.concatenate((self._x_last, x_last))
+        self._y_min = np.concatenate((self._y_min, y_min))
+        self._y_max = np.concatenate((self._y_max, y_max))
+
+    def trim(self, x_lo):
+        i = np.searchsorted(self._x_last, x_lo)
+        if i > 0:
+            self._ids = self._ids[i:]
+            self._x_first = self._x_first[i:]
+            self._x_last = self._x_last[i:]
+            self._y_min = self._y_min[i:]
+            self._y_max = self._y_max[i:]
+
+    def curve_data(self):
+        x = np.empty(2 * len(self._ids))
+        x[0::2] = self._x_first
+        x[1::2] = self._x_last
+        table_y = np.empty((2 * len(self._ids), self.N_channels))
+        table_y[0::2] = self._y_min
+        table_y[1::2] = self._y_max
+
+        return (x, table_y)
+
+# ------------------------------------------------------------------------------
+#   _AggregateTier
+# ------------------------------------------------------------------------------
+
+class _AggregateTier(object):
+    """Stores the minimum, mean and maximum per channel of the readings falling
+    inside buckets of fixed width `bucket_width` along the x-axis, aligned to
+    multiples of `bucket_width`. Completed buckets are pushed into a circular
+    buffer of `N_buckets` buckets. The bucket still being filled is kept as
+    running totals. The x-value of a bucket is its center.
+    """
+    def __init__(self, bucket_width, N_buckets, N_channels):
+        self.bucket_width = bucket_width
+        self.N_buckets = N_buckets
+        self.N_channels = N_channels
+        self.mutex = QtCore.QMutex()
+
+        # Completed buckets. Columns: min, mean and max of every channel
+        self._history = MultiChartHistory(N_buckets,
+                                          N_channels=3 * N_channels)
+        self.clear()
+
+    def clear(self):
+        locker = QtCore.QMutexLocker(self.mutex)
+        self._history.clear()
+        self._open_id = None
+        self._open_n = np.zeros(self.N_channels)
+        self._open_sum = np.zeros(self.N_channels)
+        self._open_min = np.full(self.N_channels, np.nan)
+        self._open_max = np.full(self.N_channels, np.nan)
+        locker.unlock()
+
+    def add(self, x, table_y):
+        """Add new readings, ordered from oldest to newest, where `table_y`
+        has one row per reading and one column per channel.
+        """
+        ids = np.floor(x / self.bucket_width).astype(np.int64)
+        i_start = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+        is_valid = ~np.isnan(table_y)
+
+        ids = ids[i_start]
+        n = np.add.reduceat(is_valid, i_start, axis=0).astype(np.float64)
+        sums = np.add.reduceat(np.where(is_valid, table_y, 0), i_start, axis=0)
+        mins = np.fmin.reduceat(table_y, i_start, axis=0)
+        maxs = np.fmax.reduceat(table_y, i_start, axis=0)
+
+        locker = QtCore.QMutexLocker(self.mutex)
+        if self._open_id == ids[0]:
+            # Merge into the bucket still being filled
+            n[0] += self._open_n
+            sums[0] += self._open_sum
+            mins[0] = np.fmin(mins[0], self._open_min)
+            maxs[0] = np.fmax(maxs[0], self._open_max)
+        elif self._open_id is not None:
+            # The bucket still being filled is completed
+            [ids, n, sums, mins, maxs] = [
+                np.concatenate(([self._open_id], ids)),
+                np.vstack((self._open_n, n)),
+                np.vstack((self._open_sum, sums)),
+                np.vstack((self._open_min, mins)),
+                np.vstack((self._open_max, maxs))]
+
+        # All but the last bucket are completed
+        if len(ids) > 1:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = sums[:-1] / n[:-1]
+            self._history.add_new_readings(
+                (ids[:-1] + 0.5) * self.bucket_width,
+                np.hstack((mins[:-1], means, maxs[:-1])))
+
+        self._open_id = ids[-1]
+        self._open_n = n[-1]
+        self._open_sum = sums[-1]
+        self._open_min = mins[-1]
+        self._open_max = maxs[-1]
+        locker.unlock()
+
+    def add_reading(self, x, row_y, row_n, row_sum):
+        """Add a single reading `row_y`, a float64 array with one value per
+        channel. `row_n` and `row_sum` are `row_y` with each value replaced by
+        1 and by itself respectively, and each NaN by 0. They are shared by
+        all tiers, hence computed by the caller. Updates the running totals of
+        the bucket still being filled in place, instead of taking the
+        vectorized path of `add()`.
+        """
+        bucket_id = math.floor(x / self.bucket_width)
+
+        locker = QtCore.QMutexLocker(self.mutex)
+        if bucket_id == self._open_id:
+            self._open_n += row_n
+            self._open_sum += row_sum
+            np.fmin(self._open_min, row_y, out=self._open_min)
+            np.fmax(self._open_max, row_y, out=self._open_max)
+        else:
+            if self._open_id is not None:
+                # The bucket still being filled is completed
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    mean = self._open_sum / self._open_n
+                self._history.add_new_reading(
+                    (self._open_id + 0.5) * self.bucket_width,
+                    np.concatenate((self._open_min, mean, self._open_max)))
+
+            self._open_id = bucket_id
+            self._open_n = row_n.copy()
+            self._open_sum = row_sum.copy()
+            self._open_min = row_y.copy()
+            self._open_max = row_y.copy()
+        locker.unlock()
+
+    def covers(self, x_lo):
+        """Returns True when this tier holds all data from `x_lo` onwards, or
+        all data ever added since the last clear.
+        """
+        history = self._history
+        locker = QtCore.QMutexLocker(history.mutex)
+        if history._count < history.chart_history_length:
+            covers = True
+        else:
+            i_oldest = history._idx + history.chart_history_length - \
+                       history._count
+            covers = (history._x[i_oldest] - self.bucket_width / 2) <= x_lo
+        locker.unlock()
+
+        return covers
+
+    def snapshot(self):
+        """Returns a copy of the aggregated data as a tuple (x, table_min,
+        table_mean, table_max), ordered from oldest to newest bucket, including
+        the bucket still being filled.
+        """
+        locker = QtCore.QMutexLocker(self.mutex)
+        [x, table] = self._history.snapshot()
+        if self._open_id is not None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = self._open_sum / self._open_n
+            x = np.append(x, (self._open_id + 0.5) * self.bucket_width)
+            table = np.vstack((table, np.concatenate((self._open_min, mean,
+                                                      self._open_max))))
+        locker.unlock()
+
+        N = self.N_channels
+        return (x, table[:, :N], table[:, N:2 * N], table[:, 2 * N:])
+
+# ------------------------------------------------------------------------------
+#   MultiChartHistory
+# ------------------------------------------------------------------------------
+
+class MultiChartHistory(object):
     def __init__(self,
                  chart_history_length,
-                 plot_data_item: pg.PlotDataItem=None):
+                 plot_data_items: list=None,
+                 N_channels=None,
+                 tiers: list=None):
+        if plot_data_items is None:
+            plot_data_items = [None] * N_channels
+
         self.chart_history_length = chart_history_length
-        self.curve = plot_data_item   # Instance of [pyqtgraph.PlotDataItem]
+        self.N_channels = len(plot_data_items)
+        self.curves = list(plot_data_items)  # Instances of [PlotDataItem]
         self.mutex = QtCore.QMutex()  # For the case of multithreaded access
 
         # If the x-data is time, you can use this divisor value to transform
@@ -67,65 +402,355 @@ class ChartHistory(object):
         self.x_axis_divisor = 1
         self.y_axis_divisor = 1
 
-        self._x = collections.deque(maxlen=chart_history_length)
-        self._y = collections.deque(maxlen=chart_history_length)
-        self._x_snapshot = [0]
-        self._y_snapshot = [0]
+        # Aggregate tiers for long histories, see module docstring
+        if tiers is None:
+            tiers = []
+        self._tiers = [_AggregateTier(bucket_width, N_buckets, self.N_channels)
+                       for (bucket_width, N_buckets) in tiers]
+        self.tier_aggregate = 'minmax'
 
-        # Performance boost: Do not plot data outside of visible range
-        self.curve.clipToView = True
+        # Circular buffers of twice the history length, see module docstring
+        self._x = np.zeros(2 * chart_history_length)
+        self._y = np.zeros((2 * chart_history_length, self.N_channels))
+        self._idx = 0       # Index where the next reading will be written to
+        self._count = 0     # Number of valid readings in the buffers
+        self._x_snapshot = np.array([0.])
+        self._y_snapshot = np.zeros((1, self.N_channels))
 
-        # Default to no downsampling
-        self.curve.setDownsampling(ds=1, auto=False, method='mean')
+        # Total number of readings ever added and number of times the buffers
+        # got cleared, as seen by the last snapshot. Needed to update the
+        # decimation caches incrementally.
+        self._n_total = 0
+        self._n_cleared = 0
+        self._snapshot_n_total = 0
+        self._snapshot_n_cleared = 0
 
-    def apply_downsampling(self, do_apply=True, ds=4):
-        if do_apply:
-            # Speed up plotting, needed for keeping the GUI responsive when
-            # using large datasets
-            self.curve.setDownsampling(ds=ds, auto=False, method='mean')
-        else:
-            self.curve.setDownsampling(ds=1, auto=False, method='mean')
+        # Min/max decimation, see 'apply_downsampling'
+        self._do_decimate = False
+        self._decimation_caches = dict()  # Key: bucket width
+
+        # Data of the last redraw, with the x-axis transformation applied.
+        # Curves that were hidden during that redraw are stale.
+        self._plot_x = None
+        self._plot_table_y = None
+        self._plot_key = None
+        self._stale = [True] * self.N_channels
+
+        for (i_ch, curve) in enumerate(self.curves):
+            if curve is not None:
+                # Performance boost: Do not plot data outside of visible range
+                curve.clipToView = True
+
+                # No downsampling by PyQtGraph, we provide our own
+                curve.setDownsampling(ds=1, auto=False, method='mean')
 
-    def add_new_reading(self, x, y):
+                curve.visibleChanged.connect(
+                        functools.partial(self._draw_if_stale, i_ch))
+
+    def apply_downsampling(self, do_apply=True):
+        """Enable or disable min/max decimation of the buffered data prior to
+        plotting. Speeds up plotting, needed for keeping the GUI responsive
+        when using large datasets. The number of points sent to PyQtGraph is
+        reduced to ~2 per screen pixel of the visible x-range, being the
+        minimum and maximum reading of every pixel. Only kicks in when there
+        are more than 4 readings visible per pixel.
+        """
+        self._do_decimate = do_apply
+        self._decimation_caches = dict()
+
+    def add_new_reading(self, x, row_y):
+        N = self.chart_history_length
         locker = QtCore.QMutexLocker(self.mutex)
-        self._x.append(x)
-        self._y.append(y)
+        i = self._idx
+        self._x[i] = self._x[i + N] = x
+        self._y[i] = self._y[i + N] = row_y
+        self._idx = (i + 1) % N
+        if self._count < N:
+            self._count += 1
+        self._n_total += 1
         locker.unlock()
 
-    def add_new_readings(self, x_list, y_list):
+        if self._tiers:
+            row_y = np.asarray(row_y, dtype=np.float64).reshape(-1)
+            is_valid = row_y == row_y  # False for NaN
+            row_n = is_valid.astype(np.float64)
+            row_sum = np.where(is_valid, row_y, 0)
+            for tier in self._tiers:
+                tier.add_reading(x, row_y, row_n, row_sum)
+
+    def add_new_readings(self, x_list, table_y):
+        N = self.chart_history_length
+        x_all = np.asarray(x_list, dtype=np.float64)
+        table_all = np.asarray(table_y, dtype=np.float64).reshape(
+                len(x_all), self.N_channels)
+        if len(x_all) == 0:
+            return
+
+        # Only the last N readings fit inside the raw buffers
+        x_list = x_all[-N:]
+        table_y = table_all[-N:]
+        n_new = len(x_list)
+
         locker = QtCore.QMutexLocker(self.mutex)
-        self._x.extend(x_list)
-        self._y.extend(y_list)
+        i = self._idx
+        n_head = min(n_new, N - i)  # Readings that fit before wrapping around
+        n_tail = n_new - n_head     # Readings that wrap around to the start
+        for buf, vals in ((self._x, x_list), (self._y, table_y)):
+            buf[i:i + n_head] = vals[:n_head]
+            buf[i + N:i + N + n_head] = vals[:n_head]
+            if n_tail > 0:
+                buf[:n_tail] = vals[n_head:]
+                buf[N:N + n_tail] = vals[n_head:]
+        self._idx = (i + n_new) % N
+        self._count = min(self._count + n_new, N)
+        self._n_total += len(x_all)
         locker.unlock()
 
-    def update_curve(self):
-        """Creates a snapshot of the buffered data, which is a fast operation,
-        followed by updating the data behind the curve and redrawing it, which
-        is a slow operation. Hence, the use of a snapshot creation, which is
-        locked my a mutex, followed by a the mutex unlocked redrawing.
+        for tier in self._tiers:
+            tier.add(x_all, table_all)
+
+    def snapshot(self):
+        """Returns a copy of the buffered data as a tuple of numpy arrays
+        (x, table_y), ordered from oldest to newest reading. `table_y` has one
+        column per channel. The buffered data is always stored contiguously,
+        hence this takes a single memory copy per array while the mutex is
+        locked.
         """
+        return self._take_snapshot()
 
-        # First create a snapshot of the buffered data. Fast.
+    def _take_snapshot(self):
         locker = QtCore.QMutexLocker(self.mutex)
-        self._x_snapshot = np.copy(self._x)
-        self._y_snapshot = np.copy(self._y)
-        #print("numel x: %d, numel y: %d" %
-        #      (self._x_snapshot.size, self._y_snapshot.size))
+        i_end = self._idx + self.chart_history_length
+        i_start = i_end - self._count
+        x = self._x[i_start:i_end].copy()
+        table_y = self._y[i_start:i_end].copy()
+        self._snapshot_n_total = self._n_total
+        self._snapshot_n_cleared = self._n_cleared
         locker.unlock()
 
-        # Now update the data behind the curve and redraw the curve. Slow
-        if self.curve is not None:
-            if ((len(self._x_snapshot) == 0) or
-                (np.alltrue(np.isnan(self._y_snapshot)))):
-                self.curve.setData([0], [0])
+        return (x, table_y)
+
+    def tier_snapshot(self, i_tier):
+        """Returns a copy of the aggregated data of tier `i_tier` as a tuple of
+        numpy arrays (x, table_min, table_mean, table_max), ordered from oldest
+        to newest bucket. The x-values are the bucket centers.
+        """
+        return self._tiers[i_tier].snapshot()
+
+    def _redraw_key(self, n_total, n_cleared):
+        """Returns everything that determines the plotted data. When unchanged
+        since the last redraw, there is no need to redraw.
+        """
+        view = None
+        if self._tiers or self._do_decimate:
+            vb = self._viewbox()
+            if vb is not None:
+                view = (tuple(vb.viewRange()[0]), int(vb.width()))
+
+        return (n_total, n_cleared, self.x_axis_divisor, self.y_axis_divisor,
+                self.tier_aggregate, self._do_decimate, view)
+
+    def update_curves(self):
+        """Creates a snapshot of the buffered data, which is a fast operation,
+        followed by updating the data behind the curves and redrawing them,
+        which is a slow operation. Hence, the use of a snapshot creation, which
+        is locked my a mutex, followed by a the mutex unlocked redrawing.
+
+        Nothing happens when no new readings have arrived and no settings have
+        changed since the previous redraw. Hidden curves are skipped.
+        """
+        if (self._redraw_key(self._n_total, self._n_cleared) ==
+                self._plot_key):
+            return
+
+        # First create a snapshot of the buffered data. Fast.
+        [self._x_snapshot, self._y_snapshot] = self._take_snapshot()
+        self._plot_key = self._redraw_key(self._snapshot_n_total,
+                                          self._snapshot_n_cleared)
+
+        # Now update the data behind the curves and redraw the curves. Slow
+        if len(self._x_snapshot) == 0:
+            self._plot_x = np.zeros(1)
+            self._plot_table_y = np.zeros((1, self.N_channels))
+            self._draw_all()
+            return
+
+        tier = self._select_tier()
+        if tier is not None:
+            [x, table_min, table_mean, table_max] = tier.snapshot()
+            if self.tier_aggregate == 'mean':
+                table_y = table_mean
+            else:
+                # Min/max envelope: Two points per bucket
+                x = np.repeat(x, 2)
+                table_y = np.empty((len(x), self.N_channels))
+                table_y[0::2] = table_min
+                table_y[1::2] = table_max
+        elif self._do_decimate:
+            [x, table_y] = self._decimate_snapshot()
+        else:
+            [x, table_y] = [self._x_snapshot, self._y_snapshot]
+
+        # The x-axis transformation is shared by all curves
+        x = x - self._x_snapshot[-1]
+        if self.x_axis_divisor != 1:
+            x /= float(self.x_axis_divisor)
+
+        self._plot_x = x
+        self._plot_table_y = table_y
+        self._draw_all()
+
+    def _draw_all(self):
+        for (i_ch, curve) in enumerate(self.curves):
+            if curve is None:
+                continue
+            if curve.isVisible():
+                self._draw(i_ch)
             else:
-                self.curve.setData((self._x_snapshot - self._x_snapshot[-1])
-                                   / float(self.x_axis_divisor),
-                                   self._y_snapshot
-                                   / float(self.y_axis_divisor))
+                self._stale[i_ch] = True
+
+    def _draw(self, i_ch):
+        curve = self.curves[i_ch]
+        y = self._plot_table_y[:, i_ch]
+        if np.all(np.isnan(y)):
+            curve.setData([0], [0])
+        elif self.y_axis_divisor == 1:
+            curve.setData(self._plot_x, y)
+        else:
+            curve.setData(self._plot_x, y / float(self.y_axis_divisor))
+        self._stale[i_ch] = False
+
+    def _draw_if_stale(self, i_ch):
+        # Called when the visibility of a curve changes
+        if (self._stale[i_ch] and self._plot_x is not None and
+                self.curves[i_ch].isVisible()):
+            self._draw(i_ch)
+
+    def _viewbox(self):
+        """Returns the ViewBox that the curves live in, or None when there is
+        no such ViewBox or it is not shown.
+        """
+        for curve in self.curves:
+            if curve is not None:
+                vb = curve.getViewBox()
+                if vb is not None and vb.width() >= 1:
+                    return vb
+                return None
+        return None
+
+    def _select_tier(self):
+        """Returns the aggregate tier to plot from, or None when the raw
+        snapshot covers the visible x-range.
+        """
+        if not self._tiers:
+            return None
+
+        vb = self._viewbox()
+        if vb is None:
+            return None
+
+        # Raw buffers not yet full hold all data since the last clear
+        if len(self._x_snapshot) < self.chart_history_length:
+            return None
+
+        x_lo = (self._x_snapshot[-1] +
+                vb.viewRange()[0][0] * self.x_axis_divisor)
+        if self._x_snapshot[0] <= x_lo:
+            return None
+
+        for tier in self._tiers:
+            if tier.covers(x_lo):
+                return tier
+        return self._tiers[-1]
+
+    def _decimate_snapshot(self):
+        """Returns the min/max decimated snapshot as a tuple (x, table_y). The
+        bucket width follows from the visible x-range and the width in pixels
+        of the ViewBox that the curves live in. Returns the full snapshot when
+        decimation would not reduce the number of points significantly.
+        """
+        vb = self._viewbox()
+        if vb is None:
+            return (self._x_snapshot, self._y_snapshot)
+
+        # Visible x-range in units of the buffered data
+        [x_min, x_max] = vb.viewRange()[0]
+        x_lo = self._x_snapshot[-1] + x_min * self.x_axis_divisor
+        x_span = (x_max - x_min) * self.x_axis_divisor
+
+        i_lo = np.searchsorted(self._x_snapshot, x_lo)
+        N_visible = len(self._x_snapshot) - i_lo
+        N_pixels = int(vb.width())
+        if N_visible <= 4 * N_pixels or x_span <= 0:
+            return (self._x_snapshot, self._y_snapshot)
+
+        # One bucket per pixel. The width is rounded to the nearest power of 2
+        # so that small changes of the view, e.g. resizing the window, map onto
+        # the same cache. Hence, 1.4 to 2.8 points per pixel.
+        bucket_width = 2.0 ** np.round(np.log2(x_span / N_pixels))
+
+        cache = self._decimation_caches.pop(bucket_width, None)
+        if cache is None:
+            if len(self._decimation_caches) >= MAX_DECIMATION_CACHES:
+                # Evict the least recently used cache
+                del self._decimation_caches[next(iter(
+                    self._decimation_caches))]
+            cache = MinMaxDecimation(bucket_width, self.N_channels)
+        self._decimation_caches[bucket_width] = cache  # Most recently used
+
+        N_new = self._snapshot_n_total - cache.n_total
+        if (cache.n_cleared != self._snapshot_n_cleared or
+                N_new > N_visible or x_lo < cache.x_lo):
+            # Cache is out of date or does not cover the visible range
+            cache.clear()
+            cache.append(self._x_snapshot[i_lo:], self._y_snapshot[i_lo:])
+        elif N_new > 0:
+            cache.append(self._x_snapshot[-N_new:], self._y_snapshot[-N_new:])
+
+        cache.trim(x_lo)
+        cache.x_lo = x_lo
+        cache.n_total = self._snapshot_n_total
+        cache.n_cleared = self._snapshot_n_cleared
+
+        return cache.curve_data()
 
     def clear(self):
         locker = QtCore.QMutexLocker(self.mutex)
-        self._x.clear()
-        self._y.clear()
+        self._idx = 0
+        self._count = 0
+        self._n_cleared += 1
         locker.unlock()
+
+        for tier in self._tiers:
+            tier.clear()
+
+# ------------------------------------------------------------------------------
+#   ChartHistory
+# ------------------------------------------------------------------------------
+
+class ChartHistory(MultiChartHistory):
+    def __init__(self,
+                 chart_history_length,
+                 plot_data_item: pg.PlotDataItem=None,
+                 tiers: list=None):
+        super().__init__(chart_history_length, [plot_data_item], tiers=tiers)
+
+    @property
+    def curve(self):
+        # Instance of [pyqtgraph.PlotDataItem]
+        return self.curves[0]
+
+    def snapshot(self):
+        """Returns a copy of the buffered data as a tuple of numpy arrays
+        (x, y), ordered from oldest to newest reading.
+        """
+        [x, table_y] = self._take_snapshot()
+        return (x, table_y[:, 0])
+
+    def update_curve(self):
+        """Creates a snapshot of the buffered data, which is a fast operation,
+        followed by updating the data behind the curve and redrawing it, which
+        is a slow operation. Hence, the use of a snapshot creation, which is
+        locked my a mutex, followed by a the mutex unlocked redrawing.
+        """
+        self.update_curves()
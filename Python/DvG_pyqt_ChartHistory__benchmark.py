@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark of the snapshot cost of `DvG_pyqt_ChartHistory.ChartHistory`.
+
+Compares the preallocated circular buffer of ChartHistory against the former
+implementation, where the history was kept in two `collections.deque`s that
+had to be converted element by element into numpy arrays on every call to
+`update_curve`. Both buffers are filled completely and have wrapped around
+before timing, i.e. the worst case for the circular buffer.
+
+Also compares N_CHANNELS separate ChartHistory instances against a single
+MultiChartHistory for adding one reading per channel and taking the snapshot
+of all channels, as done for e.g. the 12 heater thermocouples.
+
+Lastly, times the min/max decimation of a full history down to ~2 points per
+screen pixel, once rebuilt from scratch and once updated incrementally with
+the readings of a single chart refresh, and checks that a single-sample spike
+survives the decimation.
+
+Finally, times a chart refresh of N_CHANNELS curves after N_NEW_PER_REFRESH
+new readings, with all curves shown, with all but 3 curves hidden, and without
+any new readings since the previous refresh.
+
+Dennis van Gils
+17-10-2026
+"""
+
+import collections
+import timeit
+
+import numpy as np
+from PyQt5 import QtCore
+import pyqtgraph as pg
+
+from DvG_pyqt_ChartHistory import (ChartHistory, MultiChartHistory,
+                                   MinMaxDecimation)
+
+HISTORY_LENGTHS = [1800, 18000, int(1e6)]
+N_CHANNELS = 12
+N_PIXELS = 1000          # Width of the chart in pixels
+N_NEW_PER_REFRESH = 10   # Readings arriving between two chart refreshes
+
+class Deque_ChartHistory(object):
+    """Stripped-down copy of the former deque based ChartHistory, including
+    the mutex locking, used as reference only.
+    """
+    def __init__(self, chart_history_length):
+        self.mutex = QtCore.QMutex()
+        self._x = collections.deque(maxlen=chart_history_length)
+        self._y = collections.deque(maxlen=chart_history_length)
+
+    def add_new_readings(self, x_list, y_list):
+        locker = QtCore.QMutexLocker(self.mutex)
+        self._x.extend(x_list)
+        self._y.extend(y_list)
+        locker.unlock()
+
+    def snapshot(self):
+        locker = QtCore.QMutexLocker(self.mutex)
+        x = np.copy(self._x)
+        y = np.copy(self._y)
+        locker.unlock()
+
+        return (x, y)
+
+def time_it(fun, N_repeat):
+    """Returns the best time out of 5 runs in [ms] of a single call to `fun`.
+    """
+    timer = timeit.Timer(fun)
+    return min(timer.repeat(repeat=5, number=N_repeat)) / N_repeat * 1e3
+
+# ------------------------------------------------------------------------------
+#   Main
+# ------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    print("Snapshot cost per history buffer pair (x, y)\n")
+    print("%10s  %14s  %14s  %8s" %
+          ("samples", "deque [ms]", "ring [ms]", "speed-up"))
+
+    for N in HISTORY_LENGTHS:
+        # Fill more than the history length to force the buffers to wrap
+        x = np.arange(N + N // 3, dtype=np.float64) * 100
+        y = np.sin(x / 1e4)
+
+        CH_deque = Deque_ChartHistory(N)
+        CH_deque.add_new_readings(x, y)
+
+        CH_ring = ChartHistory(N)
+        CH_ring.add_new_readings(x[:N // 2], y[:N // 2])
+        CH_ring.add_new_readings(x[N // 2:], y[N // 2:])
+
+        # Sanity check: Both must hold the exact same history
+        x_deque, y_deque = CH_deque.snapshot()
+        x_ring, y_ring = CH_ring.snapshot()
+        assert np.array_equal(x_deque, x_ring)
+        assert np.array_equal(y_deque, y_ring)
+
+        N_repeat = max(int(2e6 // N), 1)
+        t_deque = time_it(CH_deque.snapshot, N_repeat)
+        t_ring = time_it(CH_ring.snapshot, N_repeat)
+
+        print("%10i  %14.4f  %14.4f  %7.0fx" %
+              (N, t_deque, t_ring, t_deque / t_ring))
+
+    print("\n%i channels sharing one time axis\n" % N_CHANNELS)
+    print("%10s  %14s  %14s  %14s  %14s" %
+          ("samples", "add single", "add multi", "snap single",
+           "snap multi"))
+
+    row = np.arange(N_CHANNELS, dtype=np.float64)
+    for N in HISTORY_LENGTHS:
+        CHs = [ChartHistory(N) for i in range(N_CHANNELS)]
+        CH_multi = MultiChartHistory(N, N_channels=N_CHANNELS)
+        for i in range(N + N // 3):
+            CH_multi.add_new_reading(i, row)
+        for CH in CHs:
+            CH.add_new_readings(np.arange(N + N // 3), np.zeros(N + N // 3))
+
+        def add_single():
+            for i in range(N_CHANNELS):
+                CHs[i].add_new_reading(1., row[i])
+
+        def snap_single():
+            for CH in CHs:
+                CH.snapshot()
+
+        N_repeat = max(int(2e6 // N // N_CHANNELS), 1)
+        print("%10i  %11.4f ms  %11.4f ms  %11.4f ms  %11.4f ms" %
+              (N,
+               time_it(add_single, 1000),
+               time_it(lambda: CH_multi.add_new_reading(1., row), 1000),
+               time_it(snap_single, N_repeat),
+               time_it(CH_multi.snapshot, N_repeat)))
+
+    print("\nMin/max decimation of %i channels down to %i pixels\n" %
+          (N_CHANNELS, N_PIXELS))
+    print("%10s  %14s  %14s  %10s" %
+          ("samples", "rebuild [ms]", "incr. [ms]", "points"))
+
+    for N in HISTORY_LENGTHS:
+        x = np.arange(N, dtype=np.float64) * 100
+        table_y = np.random.randn(N, N_CHANNELS)
+        table_y[N // 2, 0] = 1e3  # Single-sample spike
+        bucket_width = 2.0 ** np.round(np.log2((x[-1] - x[0]) / N_PIXELS))
+
+        def rebuild():
+            dec = MinMaxDecimation(bucket_width, N_CHANNELS)
+            dec.append(x, table_y)
+            return dec.curve_data()
+
+        x_new = x[-1] + np.arange(1, N_NEW_PER_REFRESH + 1) * 100
+        y_new = np.random.randn(N_NEW_PER_REFRESH, N_CHANNELS)
+        dec = MinMaxDecimation(bucket_width, N_CHANNELS)
+        dec.append(x, table_y)
+
+        def incremental():
+            dec.append(x_new, y_new)
+            dec.trim(x_new[-1] - (x[-1] - x[0]))
+            return dec.curve_data()
+
+        [x_dec, y_dec] = rebuild()
+        assert y_dec[:, 0].max() == 1e3
+
+        print("%10i  %14.4f  %14.4f  %10i" %
+              (N, time_it(rebuild, 10), time_it(incremental, 100), len(x_dec)))
+
+    print("\nChart refresh of %i curves with %i new readings\n" %
+          (N_CHANNELS, N_NEW_PER_REFRESH))
+    print("%10s  %14s  %14s  %14s" %
+          ("samples", "all shown", "3 shown", "no new"))
+
+    app = pg.mkQApp()
+    x_new = np.arange(N_NEW_PER_REFRESH, dtype=np.float64)
+    y_new = np.random.randn(N_NEW_PER_REFRESH, N_CHANNELS)
+    for N in HISTORY_LENGTHS[:2]:
+        curves = [pg.PlotDataItem() for i in range(N_CHANNELS)]
+        CH_multi = MultiChartHistory(N, curves)
+        CH_multi.add_new_readings(np.arange(N, dtype=np.float64),
+                                  np.random.randn(N, N_CHANNELS))
+
+        def refresh():
+            x_new[:] += N_NEW_PER_REFRESH
+            CH_multi.add_new_readings(x_new, y_new)
+            CH_multi.update_curves()
+
+        t_all = time_it(refresh, 20)
+        for curve in curves[3:]:
+            curve.setVisible(False)
+        t_3 = time_it(refresh, 20)
+        t_no_new = time_it(CH_multi.update_curves, 1000)
+
+        print("%10i  %11.4f ms  %11.4f ms  %11.4f ms" %
+              (N, t_all, t_3, t_no_new))
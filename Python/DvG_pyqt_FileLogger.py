@@ -4,7 +4,7 @@
 multithreaded programs, where one thread is writing data to the log (the logging
 thread) and the other thread (the main thread/GUI) handles starting and stopping
 of the logging by user interaction (i.e. a button).
-    
+
 The boolean members 'starting' and 'stopping' should be directly written to from
 the main/GUI thread. (These are boolean atomic operations so no mutex lock is
 necessary here.)
@@ -14,24 +14,83 @@ following example:
     if file_logger.starting:
         if file_logger.create_log(my_current_time, my_path):
             file_logger.write("Time\tValue\n")  # Header
-        
+
     if file_logger.stopping:
         file_logger.close_log()
-        
+
     if file_logger.is_recording:
         elapsed_time = my_current_time - file_logger.start_time
         file_logger.write("%.3f\t%.3f\n" % (elapsed_time, my_value))
 
+Buffered mode:
+    When the logging thread is time critical, construct the FileLogger with
+    `buffered=True` and a `row_format`. Calls to `write` and `write_row` then
+    only append the data to a queue, which is a lock-free operation, and a
+    dedicated writer thread formats the rows and writes them to disk in
+    blocks. The logging thread hence never stalls on disk I/O, nor on the
+    string formatting of the rows. Opening the log file is still done by
+    `create_log` in the calling thread, to be able to report failure.
+
+        file_logger = FileLogger(buffered=True, row_format="%.3f\t%.3f\n")
+        ...
+        if file_logger.is_recording:
+            elapsed_time = my_current_time - file_logger.start_time
+            file_logger.write_row((elapsed_time, my_value))
+
+Binary log:
+    Optionally, the rows passed to `write_row` are also appended as fixed-size
+    records to a binary log file next to the text log, with the same name but
+    extension `BINARY_LOG_SUFFIX`. Construct the FileLogger with the NumPy
+    structured `binary_dtype` of a row to enable this. The binary log can be
+    memory-mapped when reading it back in, instead of having to parse text.
+    Its layout is:
+        BINARY_LOG_MAGIC   (8 bytes)
+        header length      (uint32, little endian)
+        header             (JSON, utf-8, padded with spaces to let the
+                            records start at a multiple of 64 bytes)
+        records            (`binary_dtype`, back to back)
+    The JSON header holds the keys 'dtype', a list of [field name, dtype
+    string] pairs, and 'metadata', a dict passed to `create_log`. Appending
+    to an existing binary log is refused when its stored dtype differs from
+    `binary_dtype`, e.g. after a change of the logged columns.
+
 Class:
-    FileLogger():   
+    FileLogger(buffered, row_format, flush_interval, flush_size, fsync,
+               binary_dtype):
+        Args:
+            buffered (optional, default=False):
+                Write through a background writer thread, see above.
+            row_format (optional):
+                %-format string applied to each row passed to `write_row`,
+                including the trailing newline.
+            flush_interval (optional, default=1.0):
+                [s] Maximum time that queued data is kept in memory in
+                buffered mode.
+            flush_size (optional, default=100):
+                Number of queued rows that triggers an early flush in
+                buffered mode.
+            fsync (optional, default='close'):
+                When to force the data onto the physical disk using
+                `os.fsync`, in buffered mode:
+                'never': Leave it to the operating system.
+                'flush': After every block written.
+                'close': Only when closing the log.
+            binary_dtype (optional):
+                NumPy structured dtype of a row passed to `write_row`. Enables
+                writing the binary log, see above.
+
         Methods:
             create_log(...):
                 Open new log file and keep file handle open.
             write(...):
                 Write data to the open log file.
+            write_row(...):
+                Write a row of values, e.g. a tuple or a NumPy record, to the
+                open log file using `row_format`, and to the binary log.
             close_log():
-                Close the log file.
-                
+                Close the log file. In buffered mode the remaining queued data
+                is written out by the writer thread, without waiting for it.
+
         Important members:
             starting (bool):
             stopping (bool):
@@ -46,36 +105,198 @@ Class:
 __author__      = "Dennis van Gils"
 __authoremail__ = "vangils.dennis@gmail.com"
 __url__         = "https://github.com/Dennis-van-Gils/DvG_PyQt_misc"
-__date__        = "23-08-2018"
-__version__     = "1.0.0"
+__date__        = "17-10-2026"
+__version__     = "1.2.3"
 
+import os
+import json
+import struct
+import collections
+import threading
 from pathlib import Path
 
+import numpy as np
 from PyQt5 import QtCore
 
 from DvG_debug_functions import print_fancy_traceback as pft
 
+BINARY_LOG_SUFFIX = ".bin"
+BINARY_LOG_MAGIC = b"DvGLOG\x01\n"   # Last but one byte: format version
+BINARY_LOG_ALIGN = 64
+
+def write_binary_log_header(f, dtype, metadata=None):
+    """Write the header of a binary log to the file handle `f`, see the module
+    docstring.
+    """
+    header = json.dumps({'dtype': [[name, dtype.fields[name][0].str]
+                                   for name in dtype.names],
+                         'metadata': metadata or {}})
+    header = header.encode('utf-8')
+    n_pad = (-(len(BINARY_LOG_MAGIC) + 4 + len(header))) % BINARY_LOG_ALIGN
+    header += b" " * n_pad
+    f.write(BINARY_LOG_MAGIC + struct.pack("<I", len(header)) + header)
+
+def read_binary_log_header(f):
+    """Read the header of a binary log from the file handle `f`, see the module
+    docstring.
+
+    Returns: tuple (dtype, metadata, offset of the first record).
+    """
+    if f.read(len(BINARY_LOG_MAGIC)) != BINARY_LOG_MAGIC:
+        raise ValueError("Not a binary log or an unsupported version.")
+    [header_len] = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(header_len).decode('utf-8'))
+    dtype = np.dtype([tuple(field) for field in header['dtype']])
+
+    return (dtype, header['metadata'], len(BINARY_LOG_MAGIC) + 4 + header_len)
+
+def _format_row(row_format, row):
+    """Format the tuple `row` using `row_format`. Byte strings, e.g. the
+    fields of dtype 'S12' of a NumPy record, are written as text instead of
+    as b'...'.
+    """
+    return row_format % tuple(x.decode('utf-8') if isinstance(x, bytes)
+                              else x for x in row)
+
+# ------------------------------------------------------------------------------
+#   _LogWriter
+# ------------------------------------------------------------------------------
+
+class _LogWriter(threading.Thread):
+    """Background thread that drains the queue of a buffered FileLogger into
+    an open log file. Each log file gets its own writer, so closing one log
+    and directly creating the next does not have to wait for the last block
+    of the former to hit the disk.
+
+    The queue is a `collections.deque`, of which `append` and `popleft` are
+    atomic and hence need no locking. Items are either strings, written as
+    is, or rows, formatted using `row_format`.
+    """
+    def __init__(self, f_log, row_format, flush_interval, flush_size, fsync,
+                 f_bin=None, binary_dtype=None):
+        super().__init__(name="FileLogger writer")
+        self.f_log = f_log
+        self.f_bin = f_bin
+        self.binary_dtype = binary_dtype
+        self.row_format = row_format
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.fsync = fsync
+
+        self.queue = collections.deque()
+        self.wake_up = threading.Event()
+        self.closing = False
+
+    def put(self, item):
+        self.queue.append(item)
+        if len(self.queue) >= self.flush_size:
+            self.wake_up.set()
+
+    def close(self):
+        self.closing = True
+        self.wake_up.set()
+
+    def run(self):
+        while True:
+            self.wake_up.wait(self.flush_interval)
+            self.wake_up.clear()
+            closing = self.closing  # Read before draining to not lose data
+            self.flush()
+            if closing:
+                break
+
+        for f in (self.f_log, self.f_bin):
+            if f is None:
+                continue
+            try:
+                if self.fsync != 'never':
+                    f.flush()
+                    os.fsync(f.fileno())
+                f.close()
+            except Exception as err:
+                pft(err, 3)
+
+    def flush(self):
+        block = []
+        rows = []
+        while True:
+            try:
+                item = self.queue.popleft()
+            except IndexError:
+                break   # Queue is drained
+
+            try:
+                if isinstance(item, str):
+                    block.append(item)
+                else:
+                    row = tuple(item)
+                    block.append(_format_row(self.row_format, row))
+                    rows.append(row)
+            except Exception as err:
+                # Only drop the row that failed to format, e.g. holding None
+                pft(err, 3)
+
+        if block:
+            try:
+                self.f_log.write(''.join(block))
+                self.f_log.flush()
+                if self.fsync == 'flush':
+                    os.fsync(self.f_log.fileno())
+            except Exception as err:
+                pft(err, 3)
+
+        if rows and self.f_bin is not None:
+            try:
+                self.f_bin.write(
+                    np.array(rows, dtype=self.binary_dtype).tobytes())
+                self.f_bin.flush()
+                if self.fsync == 'flush':
+                    os.fsync(self.f_bin.fileno())
+            except Exception as err:
+                pft(err, 3)
+
+# ------------------------------------------------------------------------------
+#   FileLogger
+# ------------------------------------------------------------------------------
+
 class FileLogger(QtCore.QObject):
     signal_set_recording_text = QtCore.pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, buffered=False, row_format=None, flush_interval=1.0,
+                 flush_size=100, fsync='close', binary_dtype=None):
         super().__init__(None)
 
         self.path_log = None        # pathlib.Path instance to the log
         self.f_log = None           # File handle to log
-        
+        self.path_bin = None        # pathlib.Path instance to the binary log
+        self.f_bin = None           # File handle to the binary log
+
         self.start_time = None      # To keep track of elapsed time since start
         self.starting = False
         self.stopping = False
         self.is_recording = False
-        
+
+        # Buffered mode, see module docstring
+        self.buffered = buffered
+        self.row_format = row_format
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.fsync = fsync
+        self._writer = None
+
+        # Binary log, see module docstring
+        self.binary_dtype = (None if binary_dtype is None else
+                             np.dtype(binary_dtype))
+
         # Placeholder for a future mutex instance needed for proper
         # multithreading (e.g. instance of QtCore.Qmutex())
         self.mutex = None
-        
-    def create_log(self, start_time, path_log: Path, mode='a'):
-        """Open new log file and keep file handle open.
-        
+
+    def create_log(self, start_time, path_log: Path, mode='a',
+                   binary_metadata=None):
+        """Open new log file and keep file handle open. Also opens the binary
+        log when `binary_dtype` was given.
+
         Args:
             start_time:
                 Timestamp of the start of recording, usefull to keep track of
@@ -88,28 +309,71 @@ class FileLogger(QtCore.QObject):
                 'w': Open for writing, truncating the file first
                 'a': Open for writing, appending to the end of the file if it
                      exists
-        
+            binary_metadata (dict, optional):
+                JSON-serializable info to store in the header of the binary
+                log, e.g. physical constants of the set-up.
+
         Returns: True if successful, False otherwise.
         """
         self.path_log = path_log
         self.start_time = start_time
         self.starting = False
         self.stopping = False
-        
+        self.f_log = None
+        self.f_bin = None
+
         try:
             self.f_log = open(path_log, mode)
+            if self.binary_dtype is not None:
+                self.path_bin = Path(path_log).with_suffix(BINARY_LOG_SUFFIX)
+                is_appending = (mode[0] == 'a' and self.path_bin.is_file() and
+                                self.path_bin.stat().st_size > 0)
+                if is_appending:
+                    with open(self.path_bin, 'rb') as f:
+                        [dtype, _, offset] = read_binary_log_header(f)
+                    if dtype != self.binary_dtype:
+                        raise ValueError(
+                            "Refusing to append to binary log '%s', as its "
+                            "records have a different dtype." % self.path_bin)
+
+                    # Drop a partially written last record, e.g. when the
+                    # logging program got killed
+                    size = self.path_bin.stat().st_size
+                    os.truncate(self.path_bin,
+                                size - (size - offset) % dtype.itemsize)
+                self.f_bin = open(self.path_bin, mode[0] + 'b')
+                if not is_appending:
+                    write_binary_log_header(self.f_bin, self.binary_dtype,
+                                            binary_metadata)
         except Exception as err:
             pft(err, 3)
+            for f in (self.f_log, self.f_bin):
+                if f is not None:
+                    f.close()
+            self.f_log = None
+            self.f_bin = None
             self.is_recording = False
             return False
-        else:            
+        else:
+            if self.buffered:
+                self._writer = _LogWriter(self.f_log, self.row_format,
+                                          self.flush_interval, self.flush_size,
+                                          self.fsync, self.f_bin,
+                                          self.binary_dtype)
+                self._writer.start()
             self.is_recording = True
             return True
-    
+
     def write(self, data):
         """
         Returns: True if successful, False otherwise.
         """
+        if self.buffered:
+            if self._writer is None:
+                return False
+            self._writer.put(data)
+            return True
+
         try:
             self.f_log.write(data)
         except Exception as err:
@@ -117,10 +381,42 @@ class FileLogger(QtCore.QObject):
             return False
         else:
             return True
-        
+
+    def write_row(self, row):
+        """Write a row of values, e.g. a tuple or a NumPy record, formatted
+        using `row_format`. In buffered mode the formatting is deferred to the
+        writer thread.
+
+        Returns: True if successful, False otherwise.
+        """
+        if self.buffered:
+            if self._writer is None:
+                return False
+            self._writer.put(row)
+            return True
+
+        try:
+            row = tuple(row)
+            data = _format_row(self.row_format, row)
+            if self.f_bin is not None:
+                self.f_bin.write(
+                    np.array([row], dtype=self.binary_dtype).tobytes())
+        except Exception as err:
+            pft(err, 3)
+            return False
+
+        return self.write(data)
+
     def close_log(self):
         if self.is_recording:
-            self.f_log.close()
+            if self.buffered:
+                self._writer.close()
+                self._writer = None
+            else:
+                self.f_log.close()
+                if self.f_bin is not None:
+                    self.f_bin.close()
+        self.f_bin = None
         self.starting = False
         self.stopping = False
         self.is_recording = False
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Class TimingStatsPanel is a small PyQt5 table showing the timing statistics
+of the DAQ updates, device I/O calls and jobs of one or more devices, as
+collected by the always-on profiler of 'DvG_dev_Base__pyqt_lib.Dev_Base_pyqt'.
+Each device gets its rows refreshed on arrival of its 'signal_timing_stats',
+i.e. every second. That way one can see which device is eating the time budget
+of its DAQ updates during a run.
+
+    panel = TimingStatsPanel()
+    panel.add_device(psu_pyqt)
+    panel.add_device(mux_pyqt, sections=("lock_wait", "DAQ_function"))
+
+The columns are the number of timed calls, and the mean, 50th, 95th and 99th
+percentile and maximum duration in milliseconds. The percentiles are resolved
+to within 12 %, see 'DvG_dev_Base__pyqt_lib.Timing_histogram'.
+
+Class:
+    TimingStatsPanel(title="Timing [ms]", parent=None):
+        Methods:
+            add_device(dev_pyqt, sections=None):
+                Show the statistics of 'dev_pyqt', an instance with a 'dev'
+                member and the signal 'signal_timing_stats', e.g. a
+                Dev_Base_pyqt. Only the sections listed in 'sections' are shown,
+                default all.
+            reset():
+                Reset the profilers of all added devices.
+"""
+__author__      = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__         = ""
+__date__        = "17-10-2026"
+__version__     = "1.0.0"
+
+from PyQt5 import QtCore, QtGui
+from PyQt5 import QtWidgets as QtWid
+
+COLUMNS = ("device", "section", "N", "mean", "p50", "p95", "p99", "max")
+
+class TimingStatsPanel(QtWid.QGroupBox):
+    def __init__(self, title="Timing [ms]", parent=None):
+        super().__init__(title, parent=parent)
+
+        self.table = QtWid.QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWid.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QtWid.QAbstractItemView.NoSelection)
+        self.table.setFont(QtGui.QFontDatabase.systemFont(
+                QtGui.QFontDatabase.FixedFont))
+        self.table.horizontalHeader().setSectionResizeMode(
+                QtWid.QHeaderView.ResizeToContents)
+
+        self.pbtn_reset = QtWid.QPushButton("Reset")
+        self.pbtn_reset.clicked.connect(self.reset)
+
+        vbox = QtWid.QVBoxLayout()
+        vbox.addWidget(self.table)
+        vbox.addWidget(self.pbtn_reset, alignment=QtCore.Qt.AlignRight)
+        self.setLayout(vbox)
+
+        self._devices = []
+        self._rows = dict()     # Table row by (device name, section)
+
+    def add_device(self, dev_pyqt, sections=None):
+        self._devices.append(dev_pyqt)
+        dev_pyqt.signal_timing_stats.connect(
+                lambda stats: self._update(dev_pyqt.dev.name, stats, sections))
+
+    @QtCore.pyqtSlot()
+    def reset(self):
+        for dev_pyqt in self._devices:
+            dev_pyqt.profiler.reset()
+
+    def _row(self, key):
+        row = self._rows.get(key)
+        if row is None:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            for col in range(len(COLUMNS)):
+                item = QtWid.QTableWidgetItem()
+                if col > 1:
+                    item.setTextAlignment(QtCore.Qt.AlignRight |
+                                          QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+            self.table.item(row, 0).setText(key[0])
+            self.table.item(row, 1).setText(key[1])
+            self._rows[key] = row
+        return row
+
+    def _update(self, name, stats, sections):
+        for (section, section_stats) in stats.items():
+            if sections is not None and section not in sections:
+                continue
+
+            row = self._row((name, section))
+            self.table.item(row, 2).setText("%i" % section_stats.N)
+            for (col, value) in enumerate(section_stats[1:], start=3):
+                self.table.item(row, col).setText("%.2f" % value)
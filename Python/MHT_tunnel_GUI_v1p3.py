@@ -29,7 +29,8 @@ from DvG_pyqt_controls import (create_LED_indicator,
                                SS_GROUP,
                                SS_TEXTBOX_READ_ONLY,
                                SS_TITLE)
-from DvG_pyqt_ChartHistory import ChartHistory
+from DvG_pyqt_ChartHistory import ChartHistory, MultiChartHistory
+from DvG_pyqt_TimingStats import TimingStatsPanel
 
 
 # Fonts
@@ -276,13 +277,15 @@ class MainWindow(QtWid.QWidget):
         legend.setFixedWidth(75)
         legend.setScale(1)
 
-        # Create Chart Histories and PlotDataItems and link them together
+        # Create Chart History and PlotDataItems and link them together
         # Also add legend entries
-        self.CHs_heater_TC = [None] * C.N_HEATER_TC
+        self.CH_heater_TC = MultiChartHistory(
+                C.CH_SAMPLES_HEATER_TC,
+                [self.pi_heater_TC.plot(pen=PENS[i])
+                 for i in range(C.N_HEATER_TC)],
+                tiers=C.CH_TIERS)
         for i in range(C.N_HEATER_TC):
-            self.CHs_heater_TC[i] = ChartHistory(
-                    C.CH_SAMPLES_HEATER_TC, self.pi_heater_TC.plot(pen=PENS[i]))
-            legend.addItem(self.CHs_heater_TC[i].curve, name=('#%02i' % (i+1)))
+            legend.addItem(self.CH_heater_TC.curves[i], name=('#%02i' % (i+1)))
 
         def bubble_injection(): pass # Spyder IDE outline item
         # ----------------------------------------------------------------------
@@ -507,24 +510,28 @@ class MainWindow(QtWid.QWidget):
         legend.setFixedWidth(75)
         legend.setScale(1)
 
-        # Create Chart Histories and PlotDataItems and link them together
-        self.CH_tunnel_outlet = ChartHistory(
-                C.CH_SAMPLES_PT104, self.pi_tunnel_temp.plot(pen=PENS[5]))
-        self.CH_tunnel_inlet = ChartHistory(
-                C.CH_SAMPLES_PT104, self.pi_tunnel_temp.plot(pen=PENS[1]))
-        self.CH_ambient = ChartHistory(
-                C.CH_SAMPLES_PT104, self.pi_tunnel_temp.plot(pen=PEN_WHITE))
-        self.CH_chiller_temp = ChartHistory(
-                C.CH_SAMPLES_CHILLER, self.pi_tunnel_temp.plot(pen=PENS[2]))
-        self.CH_chiller_setpoint = ChartHistory(
-                C.CH_SAMPLES_CHILLER, self.pi_tunnel_temp.plot(pen=PENS[4]))
+        # Create Chart Histories and PlotDataItems and link them together.
+        # Channels sharing the same device, and thus the same time stamps,
+        # share a single Chart History.
+        # PT-104 channels: [outlet, inlet, ambient]
+        self.CH_tunnel_temp = MultiChartHistory(
+                C.CH_SAMPLES_PT104,
+                [self.pi_tunnel_temp.plot(pen=PENS[5]),
+                 self.pi_tunnel_temp.plot(pen=PENS[1]),
+                 self.pi_tunnel_temp.plot(pen=PEN_WHITE)])
+        # Chiller channels: [temperature, setpoint]
+        self.CH_chiller = MultiChartHistory(
+                C.CH_SAMPLES_CHILLER,
+                [self.pi_tunnel_temp.plot(pen=PENS[2]),
+                 self.pi_tunnel_temp.plot(pen=PENS[4])],
+                tiers=C.CH_TIERS)
 
         # Add legend entries
-        legend.addItem(self.CH_tunnel_outlet.curve   , name="outlet")
-        legend.addItem(self.CH_tunnel_inlet.curve    , name="inlet")
-        legend.addItem(self.CH_ambient.curve         , name="ambient")
-        legend.addItem(self.CH_chiller_temp.curve    , name="chiller")
-        legend.addItem(self.CH_chiller_setpoint.curve, name="chill sp")
+        legend.addItem(self.CH_tunnel_temp.curves[0], name="outlet")
+        legend.addItem(self.CH_tunnel_temp.curves[1], name="inlet")
+        legend.addItem(self.CH_tunnel_temp.curves[2], name="ambient")
+        legend.addItem(self.CH_chiller.curves[0]    , name="chiller")
+        legend.addItem(self.CH_chiller.curves[1]    , name="chill sp")
 
         def tunnel_flow(): pass # Spyder IDE outline item
         # ----------------------------------------------------------------------
@@ -638,7 +645,8 @@ class MainWindow(QtWid.QWidget):
 
         # Create Chart History and PlotDataItem and link them together
         self.CH_flow_speed = ChartHistory(C.CH_SAMPLES_FLOW_SPEED,
-                                          self.pi_flow_speed.plot(pen=PENS[5]))
+                                          self.pi_flow_speed.plot(pen=PENS[5]),
+                                          tiers=C.CH_TIERS)
 
         # Create a second y-axis on the right side
         # We do so by creating a new ViewBox and AxisItem and adding these to
@@ -665,7 +673,8 @@ class MainWindow(QtWid.QWidget):
         self.plot_set_pump_speed = pg.PlotDataItem(pen=PENS[1])
         self.vb_set_pump_speed.addItem(self.plot_set_pump_speed)
         self.CH_set_pump_speed = ChartHistory(C.CH_SAMPLES_FLOW_SPEED,
-                                              self.plot_set_pump_speed)
+                                              self.plot_set_pump_speed,
+                                              tiers=C.CH_TIERS)
 
         def chart_history(): pass # Spyder IDE outline item
         # ----------------------------------------------------------------------
@@ -685,6 +694,8 @@ class MainWindow(QtWid.QWidget):
         self.pbtn_history_4 = QtWid.QPushButton("05:00")
         self.pbtn_history_5 = QtWid.QPushButton("10:00")
         self.pbtn_history_6 = QtWid.QPushButton("30:00")
+        self.pbtn_history_7 = QtWid.QPushButton("02:00:00")
+        self.pbtn_history_8 = QtWid.QPushButton("24:00:00")
 
         self.pbtn_history_clear = QtWid.QPushButton("clear")
         self.pbtn_history_clear.clicked.connect(self.clear_all_charts)
@@ -697,7 +708,9 @@ class MainWindow(QtWid.QWidget):
         grid.addWidget(self.pbtn_history_4, 3, 0)
         grid.addWidget(self.pbtn_history_5, 4, 0)
         grid.addWidget(self.pbtn_history_6, 5, 0)
-        grid.addWidget(self.pbtn_history_clear, 6, 0)
+        grid.addWidget(self.pbtn_history_7, 6, 0)
+        grid.addWidget(self.pbtn_history_8, 7, 0)
+        grid.addWidget(self.pbtn_history_clear, 8, 0)
 
         grp_history.setLayout(grid)
 
@@ -795,13 +808,16 @@ class MainWindow(QtWid.QWidget):
         # Create Chart History and PlotDataItem and link them together
         self.CH_power_PSU_1 = ChartHistory(
                 C.CH_SAMPLES_HEATER_POWER,
-                self.pi_heater_power.plot(pen=PENS[6]))  # 5
+                self.pi_heater_power.plot(pen=PENS[6]),  # 5
+                tiers=C.CH_TIERS)
         self.CH_power_PSU_2 = ChartHistory(
                 C.CH_SAMPLES_HEATER_POWER,
-                self.pi_heater_power.plot(pen=PENS[8]))  # 3
+                self.pi_heater_power.plot(pen=PENS[8]),  # 3
+                tiers=C.CH_TIERS)
         self.CH_power_PSU_3 = ChartHistory(
                 C.CH_SAMPLES_HEATER_POWER,
-                self.pi_heater_power.plot(pen=PENS[10])) # 1
+                self.pi_heater_power.plot(pen=PENS[10]), # 1
+                tiers=C.CH_TIERS)
 
         # Add legend entries
         legend.addItem(self.CH_power_PSU_1.curve, name="#1")
@@ -916,7 +932,8 @@ class MainWindow(QtWid.QWidget):
 
         # Create Chart History and PlotDataItem and link them together
         self.CH_DAQ_rate = ChartHistory(C.CH_SAMPLES_DAQ_RATE,
-                                        self.pi_DAQ_rate.plot(pen=PENS[0]))
+                                        self.pi_DAQ_rate.plot(pen=PENS[0]),
+                                        tiers=C.CH_TIERS)
         self.CH_DAQ_rate.x_axis_divisor = 60e3   # From [ms] to [min]
 
         def debug(): pass # Spyder IDE outline item
@@ -950,10 +967,19 @@ class MainWindow(QtWid.QWidget):
 
         grp_debug.setLayout(grid)
 
+        # Timing statistics of the devices, see DvG_pyqt_TimingStats. The
+        # devices get added by the control program.
+        self.timing_stats = TimingStatsPanel("Timing of the devices [ms]")
+        self.timing_stats.setStyleSheet(SS_GROUP)
+
         # Round up tab page
         # -------------------
+        vbox_timing = QtWid.QVBoxLayout()
+        vbox_timing.addWidget(self.gw_DAQ_rate)
+        vbox_timing.addWidget(self.timing_stats)
+
         hbox1 = QtWid.QHBoxLayout()
-        hbox1.addWidget(self.gw_DAQ_rate)
+        hbox1.addLayout(vbox_timing)
         hbox1.addWidget(grp_debug)
         hbox1.addStretch(1)
         hbox1.setAlignment(grp_debug, QtCore.Qt.AlignTop)
@@ -1271,13 +1297,10 @@ class MainWindow(QtWid.QWidget):
                                           QtWid.QMessageBox.No)
 
         if reply == QtWid.QMessageBox.Yes:
-            [CH.clear() for CH in self.CHs_heater_TC]
+            self.CH_heater_TC.clear()
             self.CH_flow_speed.clear()
-            self.CH_chiller_setpoint.clear()
-            self.CH_chiller_temp.clear()
-            self.CH_tunnel_inlet.clear()
-            self.CH_tunnel_outlet.clear()
-            self.CH_ambient.clear()
+            self.CH_chiller.clear()
+            self.CH_tunnel_temp.clear()
             self.CH_set_pump_speed.clear()
             self.CH_power_PSU_1.clear()
             self.CH_power_PSU_2.clear()
@@ -21,6 +21,20 @@ UPDATE_INTERVAL_CHILLER  = 1000     # 1000 [ms]
 UPDATE_INTERVAL_PSUs     = 1000     # 1000 [ms]
 UPDATE_INTERVAL_TRAVs    = 250      # 250  [ms]
 
+# Let the Arduinos push their state every UPDATE_INTERVAL_ARDUINOS by themselves
+# instead of polling them. Requires firmware supporting binary state frames,
+# otherwise polling is used regardless.
+STREAM_ARDUINOS = False
+
+# Unread filling system messages of Arduino 2 are fetched in one batch. Up to
+# this many are fetched inside the DAQ update, larger backlogs are deferred to
+# the send thread to keep the DAQ update short.
+FS_MSGS_INLINE_MAX = 3
+
+# Maximum number of GUI refreshes per second by the Arduino DAQ updates. The
+# DAQ rate itself is not affected.
+GUI_REFRESH_RATE_ARDUINOS = 4       # 4 [Hz]
+
 # Stripchart update intervals in [ms]
 UPDATE_INTERVAL_CHARTS   = 1000     # 1000 [ms]
 
@@ -39,6 +53,13 @@ CH_SAMPLES_MUX2         = 1800      # @ UPDATE_INTERVAL_CHILLER  --> 30 min
 CH_SAMPLES_DAQ_RATE     = 1800      # @ UPDATE_INTERVAL_DAQ_RATE &
                                     # CALC_DAQ_RATE_EVERY_N_ITER --> 30 min
 
+# Chart history aggregate tiers for displaying longer histories than the
+# buffers above can hold. Each tier stores the min, mean and max per bucket.
+# List of (bucket width in [ms], number of buckets).
+CH_TIERS = [(1e3 , 7200),           # 1 s   buckets --> 2 h
+            (10e3, 8640),           # 10 s  buckets --> 24 h
+            (60e3, 10080)]          # 1 min buckets --> 7 days
+
 # Total number of heaters with embedded thermocouples
 N_HEATER_TC = 12
 
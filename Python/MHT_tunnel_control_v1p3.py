@@ -7,6 +7,7 @@ Dennis van Gils
 
 import os
 import sys
+import argparse
 import psutil
 import visa
 import pylab
@@ -22,8 +23,11 @@ import MHT_tunnel_GUI_v1p3  as MHT_tunnel_GUI
 
 from DvG_debug_functions import ANSI, dprint, print_fancy_traceback as pft
 from DvG_pyqt_FileLogger import FileLogger
-from DvG_pyqt_ChartHistory import ChartHistory
-from DvG_dev_Base__pyqt_lib import DAQ_trigger
+from DvG_StateBuffer import StateBuffer, DirtyFields
+from DvG_StateSchema import StateSchema
+from DvG_pyqt_ChartHistory import MultiChartHistory
+from DvG_dev_Base__pyqt_lib import DAQ_trigger, Job_priority
+from DvG_IO_tracer import IO_tracer
 
 import DvG_dev_Arduino__fun_serial            as Arduino_functions
 import DvG_dev_Arduino__pyqt_lib__MHT_version as Arduino_pyqt_lib
@@ -51,86 +55,123 @@ str_cur_time  = cur_date_time.toString("HH:mm:ss")
 fn_log = ""
 fn_log_mux2 = ""
 
+# Columns of the log: name, dtype, unit. Yields both the headers of the text
+# log and the record layout of the binary log, which is written alongside the
+# text log. Full precision, no text parsing needed when reading. The units are
+# stored in the metadata of the binary log for the log reader.
+LOG_SCHEMA = StateSchema(
+        [('time'         , '<f8', 's'),
+         ('wall_time'    , 'S12', 'HH:mm:ss'),
+         ('Q_tunnel_setp', '<f8', 'm3/h'),
+         ('Q_tunnel'     , '<f8', 'm3/h'),
+         ('S_pump_setp'  , '<f8', 'pct'),
+         ('Q_bubbles'    , '<f8', 'ln/min'),
+         ('Pdiff_GVF'    , '<f8', 'mbar')] +
+        [('T_TC_%02i' % i, '<f8', 'deg_C') for i in range(1, 13)] +
+        [('T_ambient'    , '<f8', 'deg_C'),
+         ('T_inlet'      , '<f8', 'deg_C'),
+         ('T_outlet'     , '<f8', 'deg_C'),
+         ('T_chill_setp' , '<f8', 'deg_C'),
+         ('T_chill'      , '<f8', 'deg_C'),
+         ('P_PSU_1'      , '<f8', 'W'),
+         ('P_PSU_2'      , '<f8', 'W'),
+         ('P_PSU_3'      , '<f8', 'W')],
+        name="LogRow")
+LOG_DTYPE = LOG_SCHEMA.dtype
+
+# Format of a single data row of the text log, see my_Arduino_DAQ_update()
+LOG_ROW_FORMAT = ("%.3f\t%s\t"                   # time, wall_time
+                  "%.3f\t%.3f\t%.3f\t"           # Q_tunnel_setp .. S_pump_setp
+                  "%.2f\t%.2f\t" +               # Q_bubbles, Pdiff_GVF
+                  "%.2f\t" * 12 +                # T_TC_01 .. T_TC_12
+                  "%.3f\t%.3f\t%.3f\t"           # T_ambient, T_inlet, T_outlet
+                  "%.1f\t%.1f\t"                 # T_chill_setp, T_chill
+                  "%.2f\t%.2f\t%.2f\n")          # P_PSU_1 .. P_PSU_3
+
+# Binary state frames of the Arduinos, see DvG_ArduinoState on the Arduino side.
+# Fields in the same order as the ASCII state reply to '?'.
+ARD_STATE_FRAME_VERSION = 1
+ARD1_STATE_DTYPE = np.dtype(
+        [('free_RAM', '<u4'), ('ENA_OTP', '?')] +
+        [('relay_%02i' % i, '?') for i in range(1, 10)] +
+        [('read_GVF_P_diff_bitV', '<f4'), ('read_GVF_P_diff_mA'  , '<f4'),
+         ('read_GVF_P_diff_mbar', '<f4'), ('set_pump_speed_mA'   , '<f4'),
+         ('read_flow_rate_bitV' , '<f4'), ('read_flow_rate_mA'   , '<f4'),
+         ('ENA_PID_pump'        , '?')  , ('setpoint_flow_rate_m3h', '<f4')])
+ARD2_STATE_DTYPE = np.dtype(
+        [('free_RAM', '<u4')] +
+        [('relay_%02i' % i, '?') for i in range(1, 9)] +
+        [('prox_switch_%i' % i, '?') for i in range(1, 5)] +
+        [('floater_switch', '?'), ('FSM_FS_exec', 'u1'),
+         ('FS_unread_msgs_count', 'u1')])
+
 # Show debug info in terminal? Warning: slow! Do not leave on unintentionally.
 DEBUG = False
 
+# Run on the simulated devices of MHT_tunnel_simulated_devices instead of the
+# hardware? And for how long [s] to run without showing the GUI, after which the
+# obtained DAQ rate and GUI latency get reported, None to show the GUI. Set by
+# the command line arguments '--simulate' and '--headless SECONDS'.
+SIMULATE = False
+HEADLESS_DURATION = None
+headless_probe = None   # Instance of GUI_latency_probe when headless
+
+# Record all device I/O transactions into this ring file? Set by the command
+# line argument '--trace-io PATH'. Summarize by 'Tools/MHT_IO_trace_summary.py'.
+TRACE_IO_PATH = None
+io_tracer = None        # Instance of IO_tracer when tracing
+
 # ------------------------------------------------------------------------------
 #   Arduino state management
 # ------------------------------------------------------------------------------
 
-class State(object):
+# State variables that are reported by the Arduinos at run-time, followed by
+# the derived variables: name, dtype, unit. The relays and switches are
+# floats, being NaN until the first state has been read.
+STATE_SCHEMA = StateSchema(
+        [('time'              , '<f8', 'ms'),     # Since epoch
+         ('Arduino_1_free_RAM', '<f8', 'bytes'),
+         ('Arduino_2_free_RAM', '<f8', 'bytes')] +
+        [('heater_TC_%02i_degC' % i, '<f8', 'deg_C') for i in range(1, 13)] +
+        [('ENA_OTP'           , '<f8', '')] +
+        [('relay_%i_%i' % (i, j), '<f8', '') for i in range(1, 4)
+                                             for j in range(1, 9)] +
+        [('read_GVF_P_diff_bitV'    , '<f8', 'bitV'),
+         ('read_GVF_P_diff_mA'      , '<f8', 'mA'),
+         ('read_GVF_P_diff_mbar'    , '<f8', 'mbar'),
+         ('set_pump_speed_mA'       , '<f8', 'mA'),
+         ('read_flow_rate_bitV'     , '<f8', 'bitV'),
+         ('read_flow_rate_mA'       , '<f8', 'mA'),
+         ('ENA_PID_tunnel_flow_rate', '<f8', ''),
+         ('setpoint_flow_rate_m3h'  , '<f8', 'm3/h')] +
+        [('prox_switch_%i' % i, '<f8', '') for i in range(1, 5)] +
+        [('floater_switch'      , '<f8', ''),
+         ('FSM_FS_EXEC'         , '<f8', ''),
+         ('FS_unread_msgs_count', '<u2', '', 0),
+
+         # -- Derived variables
+         ('read_flow_rate_m3h', '<f8', 'm3/h'),
+         ('set_pump_speed_pct', '<f8', 'pct'),
+
+         # -- Cross-sectional area of the current measurement section
+         ('area_meas_section' , '<f8', 'm2'),
+
+         # -- Gas volume fraction (GVF)
+         ('GVF_density_liquid', '<f8', 'kg/m3'),
+         ('GVF_pct'           , '<f8', 'pct')])
+
+class State(STATE_SCHEMA.State):
     """Reflects the actual hardware state and readings of both Arduinos.
     There should only be one instance of the State class.
     """
+    # Not part of the state record
+    __slots__ = ("FS_new_msgs", "FS_msgs_fetch_pending", "mutex",
+                 "starting_up")
+
     def __init__(self):
-        # State variables that are reported by the Arduinos at run-time
-        self.time = np.nan
-        self.Arduino_1_free_RAM = np.nan
-        self.Arduino_2_free_RAM = np.nan
-        self.heater_TC_01_degC = np.nan
-        self.heater_TC_02_degC = np.nan
-        self.heater_TC_03_degC = np.nan
-        self.heater_TC_04_degC = np.nan
-        self.heater_TC_05_degC = np.nan
-        self.heater_TC_06_degC = np.nan
-        self.heater_TC_07_degC = np.nan
-        self.heater_TC_08_degC = np.nan
-        self.heater_TC_09_degC = np.nan
-        self.heater_TC_10_degC = np.nan
-        self.heater_TC_11_degC = np.nan
-        self.heater_TC_12_degC = np.nan
-        self.ENA_OTP   = np.nan
-        self.relay_1_1 = np.nan
-        self.relay_1_2 = np.nan
-        self.relay_1_3 = np.nan
-        self.relay_1_4 = np.nan
-        self.relay_1_5 = np.nan
-        self.relay_1_6 = np.nan
-        self.relay_1_7 = np.nan
-        self.relay_1_8 = np.nan
-        self.relay_2_1 = np.nan
-        self.relay_2_2 = np.nan
-        self.relay_2_3 = np.nan
-        self.relay_2_4 = np.nan
-        self.relay_2_5 = np.nan
-        self.relay_2_6 = np.nan
-        self.relay_2_7 = np.nan
-        self.relay_2_8 = np.nan
-        self.relay_3_1 = np.nan
-        self.relay_3_2 = np.nan
-        self.relay_3_3 = np.nan
-        self.relay_3_4 = np.nan
-        self.relay_3_5 = np.nan
-        self.relay_3_6 = np.nan
-        self.relay_3_7 = np.nan
-        self.relay_3_8 = np.nan
-        self.read_GVF_P_diff_bitV = np.nan
-        self.read_GVF_P_diff_mA   = np.nan
-        self.read_GVF_P_diff_mbar = np.nan
-        self.set_pump_speed_mA    = np.nan
-        self.read_flow_rate_bitV  = np.nan
-        self.read_flow_rate_mA    = np.nan
-        self.ENA_PID_tunnel_flow_rate = np.nan
-        self.setpoint_flow_rate_m3h   = np.nan
-        self.prox_switch_1  = np.nan
-        self.prox_switch_2  = np.nan
-        self.prox_switch_3  = np.nan
-        self.prox_switch_4  = np.nan
-        self.floater_switch = np.nan
-        self.FSM_FS_EXEC    = np.nan
-        self.FS_unread_msgs_count = 0
+        super().__init__()
         self.FS_new_msgs = []
-
-        # -- Derived variables
-        self.read_flow_rate_m3h = np.nan
-        self.set_pump_speed_pct = np.nan
-
-        # -- Cross-sectional area of the current measurement section [m2]
-        self.area_meas_section = np.nan
-
-        # -- Gas volume fraction (GVF)
-        self.GVF_density_liquid = np.nan
-        self.GVF_pct = np.nan
+        self.FS_msgs_fetch_pending = False  # Deferred to the send thread?
 
         # Mutex for proper multithreading
         self.mutex = QtCore.QMutex()
@@ -140,6 +181,41 @@ class State(object):
 # There should only be one instance!
 state = State()
 
+# Self-consistent snapshots of 'state', published by the Arduino DAQ thread
+# after each update. To be read by the main/GUI thread without locking.
+state_buffer = StateBuffer(state, exclude=("starting_up", "FS_new_msgs",
+                                           "FS_msgs_fetch_pending"))
+
+# Fields of the snapshot that changed since the previous GUI refresh
+GUI_dirty_fields = DirtyFields()
+
+# Relays shown as a checkable button having the same name in the GUI. Relay 2_8
+# is the pump.
+RELAY_FIELDS_GUI = (["relay_1_%i" % j for j in range(1, 9)] +
+                    ["relay_3_%i" % j for j in range(1, 9)])
+
+# ------------------------------------------------------------------------------
+#   fetch_FS_msgs
+# ------------------------------------------------------------------------------
+
+def fetch_FS_msgs():
+    """Fetch all unread filling system messages from Arduino 2 in a single
+    framed reply and append them to 'state.FS_new_msgs'. Runs either inside
+    the DAQ update, or deferred inside the send thread. Either way, the mutex
+    of Arduino 2 is locked by the caller.
+
+    Returns True when successful, False otherwise.
+    """
+    [success, msgs] = ard2.query_multiline("FS_msgs?", "FS_msgs_end")
+    if success:
+        state.FS_new_msgs.extend(msgs)
+    else:
+        dprint("'%s' reports IOError @ %s %s" %
+               (ard2.name, str_cur_date, str_cur_time))
+
+    state.FS_msgs_fetch_pending = False
+    return success
+
 # ------------------------------------------------------------------------------
 #   my_Arduino_DAQ_update
 # ------------------------------------------------------------------------------
@@ -148,7 +224,8 @@ def my_Arduino_DAQ_update():
     """Read the current state of both Arduinos in a dedicated thread and do this
     at a fixed sampling rate. Basically, it updates the global State instance
     'state' which reflects the hardware state and readings of both Arduinos.
-    This thread runs continuously on its own internal timer.
+    This thread runs continuously on its own internal timer, or is woken up by
+    each state frame pushed by Arduino 1 in streaming mode.
 
     Every new state acquisition will also subsequently:
         - add these new data points to the history strip charts
@@ -169,11 +246,19 @@ def my_Arduino_DAQ_update():
     success1 = False
     success2 = False
 
+    # Send out the state query to both Arduinos before reading back either
+    # reply. Both Arduinos process their query concurrently, so this tick lasts
+    # as long as the slowest round-trip instead of the sum of both. Both
+    # states share the single time stamp 'cur_date_time' taken above.
+    requested1 = ard1.request_state("?")
+    requested2 = ard2.request_state("?")
+
     # ---------------------------------------
-    #   Query Arduino 1 for its state
+    #   Read the state of Arduino 1
     # ---------------------------------------
 
-    [success, tmp_state] = ard1.query_ascii_values("?", separator='\t')
+    [success, tmp_state] = (ard1.read_state(separator='\t') if requested1
+                            else [False, []])
     if not(success):
         dprint("'%s' reports IOError @ %s %s" %
                (ard1.name, str_cur_date, str_cur_time))
@@ -207,10 +292,11 @@ def my_Arduino_DAQ_update():
             success1 = True
 
     # ---------------------------------------
-    #   Query Arduino 2 for its state
+    #   Read the state of Arduino 2
     # ---------------------------------------
 
-    [success, tmp_state] = ard2.query_ascii_values("?", separator='\t')
+    [success, tmp_state] = (ard2.read_state(separator='\t') if requested2
+                            else [False, []])
     if not(success):
         dprint("'%s' reports IOError @ %s %s" %
                (ard2.name, str_cur_date, str_cur_time))
@@ -240,16 +326,16 @@ def my_Arduino_DAQ_update():
         else:
             success2 = True
 
-    while (state.FS_unread_msgs_count > 0):
-        [success, ans_str] = ard2.query("FS_msg?")
-        if success:
-            state.FS_new_msgs.append(ans_str)
-            state.FS_unread_msgs_count -= 1
+    # Fetch the unread filling system messages in one batch. Only a small
+    # number is fetched right here, a larger backlog is left to the send thread
+    # to not stall this time critical DAQ update.
+    if (success2 and state.FS_unread_msgs_count > 0 and
+        not state.FS_msgs_fetch_pending):
+        if state.FS_unread_msgs_count <= C.FS_MSGS_INLINE_MAX:
+            success2 = fetch_FS_msgs()
         else:
-            dprint("'%s' reports IOError @ %s %s" %
-                   (ard2.name, str_cur_date, str_cur_time))
-            success2 = False
-            break
+            state.FS_msgs_fetch_pending = True
+            ards_pyqt.send_function(ard2, fetch_FS_msgs)
 
     # ---------------------------------------
     #   Success check
@@ -262,6 +348,20 @@ def my_Arduino_DAQ_update():
     #   Happy
     # ---------------------------------------
 
+    wall_date_time = cur_date_time      # Actual time of acquisition
+    if ard1.is_streaming:
+        # Time stamp by the arrival of the state frame of Arduino 1, which
+        # triggered this update, instead of by the host clock at wake-up
+        cur_date_time = QDateTime.fromMSecsSinceEpoch(
+                round(ard1.state_time * 1e3))
+        wall_date_time = cur_date_time
+    else:
+        # Time stamp by the deadline this update was scheduled at, so that the
+        # samples are uniformly spaced in time, see DAQ_trigger.DEADLINE_TIMER.
+        # The actual time of acquisition gets logged as 'wall_time'.
+        cur_date_time = QDateTime.fromMSecsSinceEpoch(
+                round(ards_pyqt.DAQ_scheduled_time_ms))
+
     state.time = cur_date_time.toMSecsSinceEpoch()
 
     # Transform read_flow_rate_mA to m3/h
@@ -277,6 +377,9 @@ def my_Arduino_DAQ_update():
                      C.GVF_PORTHOLE_DISTANCE / state.GVF_density_liquid *
                      100)
 
+    # The state of this update is complete: publish it to the GUI
+    state_buffer.publish()
+
     # ---------------------------------------
     #   Add readings to strip chart histories
     # ---------------------------------------
@@ -293,7 +396,14 @@ def my_Arduino_DAQ_update():
 
     if file_logger.starting:
         #fn_log = ("d:/data/" + cur_date_time.toString("yyMMdd_HHmmss") + ".txt")
-        if file_logger.create_log(state.time, fn_log, mode='w'):
+        if file_logger.create_log(
+                state.time, fn_log, mode='w',
+                binary_metadata={
+                    'gravity': C.GRAVITY,
+                    'area_meas_section': state.area_meas_section,
+                    'GVF_porthole_distance': C.GVF_PORTHOLE_DISTANCE,
+                    'density_liquid': state.GVF_density_liquid,
+                    'units': LOG_SCHEMA.units}):
             file_logger.signal_set_recording_text.emit(
                 "Recording to file: " + fn_log)
 
@@ -307,20 +417,8 @@ def my_Arduino_DAQ_update():
             file_logger.write("Density liquid [kg/m3]:\t%.0f\n" %
                              state.GVF_density_liquid)
             file_logger.write("[DATA]\n")
-            file_logger.write("[s]\t[HH:mm:ss]\t"
-                             "[m3/h]\t[m3/h]\t[pct]\t"
-                             "[ln/min]\t[mbar]\t" +
-                             ("[deg_C]\t") * 17 +
-                             "[W]\t[W]\t[W]\n")
-            file_logger.write("time\twall_time\t"
-                             "Q_tunnel_setp\tQ_tunnel\tS_pump_setp\t"
-                             "Q_bubbles\tPdiff_GVF\t"
-                             "T_TC_01\tT_TC_02\tT_TC_03\tT_TC_04\t"
-                             "T_TC_05\tT_TC_06\tT_TC_07\tT_TC_08\t"
-                             "T_TC_09\tT_TC_10\tT_TC_11\tT_TC_12\t"
-                             "T_ambient\tT_inlet\tT_outlet\t"
-                             "T_chill_setp\tT_chill\t"
-                             "P_PSU_1\tP_PSU_2\tP_PSU_3\n")
+            file_logger.write(LOG_SCHEMA.units_header() + "\n")
+            file_logger.write(LOG_SCHEMA.names_header() + "\n")
 
     if file_logger.stopping:
         file_logger.signal_set_recording_text.emit(
@@ -330,28 +428,38 @@ def my_Arduino_DAQ_update():
     if file_logger.is_recording:
         log_elapsed_time = (state.time - file_logger.start_time)/1e3  # [sec]
 
-        # Add new data to the log
-        file_logger.write("%.3f\t" % log_elapsed_time)
-        file_logger.write("%s\t" % cur_date_time.toString("HH:mm:ss.zzz"))
-        file_logger.write("%.3f\t" % state.setpoint_flow_rate_m3h)
-        file_logger.write("%.3f\t" % state.read_flow_rate_m3h)
-        file_logger.write("%.3f\t" % state.set_pump_speed_pct)
-        file_logger.write("%.2f\t" % mfc.state.flow_rate)
-        file_logger.write("%.2f\t" % state.read_GVF_P_diff_mbar)
-        file_logger.write(("%.2f\t" * 12) % (
-                state.heater_TC_01_degC, state.heater_TC_02_degC,
-                state.heater_TC_03_degC, state.heater_TC_04_degC,
-                state.heater_TC_05_degC, state.heater_TC_06_degC,
-                state.heater_TC_07_degC, state.heater_TC_08_degC,
-                state.heater_TC_09_degC, state.heater_TC_10_degC,
-                state.heater_TC_11_degC, state.heater_TC_12_degC))
-        file_logger.write("%.3f\t%.3f\t%.3f\t" % (
-                pt104.state.ch3_T, pt104.state.ch1_T, pt104.state.ch2_T))
-        file_logger.write("%.1f\t%.1f\t" % (
-                chiller.state.setpoint, chiller.state.temp))
-        file_logger.write("%.2f\t" % psus[0].state.P_meas)
-        file_logger.write("%.2f\t" % psus[1].state.P_meas)
-        file_logger.write("%.2f\n" % psus[2].state.P_meas)
+        # The peripheral devices are read via their snapshots, as their
+        # states are being written to by their own DAQ threads
+        mfc_state = mfc_pyqt.state_buffer.snapshot()
+        pt104_state = pt104_pyqt.state_buffer.snapshot()
+        chiller_state = chiller_pyqt.state_buffer.snapshot()
+        psus_state = [psu_pyqt.state_buffer.snapshot()
+                      for psu_pyqt in psus_pyqt]
+
+        # Add new data to the log, filled in by field name of LOG_SCHEMA and
+        # copied in one go into a single record. Formatting and writing to
+        # disk is taken care of by the writer thread of the logger, see
+        # LOG_ROW_FORMAT.
+        row = LOG_SCHEMA.State()
+        row.time          = log_elapsed_time
+        row.wall_time     = wall_date_time.toString("HH:mm:ss.zzz")
+        row.Q_tunnel_setp = state.setpoint_flow_rate_m3h
+        row.Q_tunnel      = state.read_flow_rate_m3h
+        row.S_pump_setp   = state.set_pump_speed_pct
+        row.Q_bubbles     = mfc_state.flow_rate
+        row.Pdiff_GVF     = state.read_GVF_P_diff_mbar
+        for i in range(1, 13):
+            setattr(row, "T_TC_%02i" % i,
+                    getattr(state, "heater_TC_%02i_degC" % i))
+        row.T_ambient     = pt104_state.ch3_T
+        row.T_inlet       = pt104_state.ch1_T
+        row.T_outlet      = pt104_state.ch2_T
+        row.T_chill_setp  = chiller_state.setpoint
+        row.T_chill       = chiller_state.temp
+        row.P_PSU_1       = psus_state[0].P_meas
+        row.P_PSU_2       = psus_state[1].P_meas
+        row.P_PSU_3       = psus_state[2].P_meas
+        file_logger.write_row(row.to_record())
 
     return [True, True]
 
@@ -362,14 +470,20 @@ def my_Arduino_DAQ_update():
 @QtCore.pyqtSlot()
 def update_GUI():
     """NOTE: 'state.mutex' is not being locked, because we are only reading
-    'state' for displaying purposes. We can do this because most 'state' members
-    are written and read atomicly. The few members (e.g. 'read_flow_rate_pct')
-    that are written non-atomicly might be displayed wrongly, but this bears no
-    consequences. This is because no actuator actions based on the read 'state'
-    values are done here. Otherwise we must lock 'state.mutex'. Not locking
-    'state.mutex' here potentially speeds up the Arduino read/write threads.
+    the latest snapshot of 'state' as published by the Arduino DAQ thread. A
+    snapshot is immutable and self-consistent, i.e. all its members belong to
+    the same DAQ update, see DvG_StateBuffer. Only 'state.starting_up' and
+    'state.FS_new_msgs' are accessed directly.
+
+    Called at most C.GUI_REFRESH_RATE_ARDUINOS times per second, see
+    'ards_pyqt.signal_GUI_refresh'. Only the widgets of the fields that changed
+    since the previous call get redrawn, see 'GUI_dirty_fields'.
     """
+    snap = state_buffer.snapshot()
+    dirty = GUI_dirty_fields.update(snap)
     if DEBUG: dprint("Updating GUI")
+    if headless_probe is not None:
+        headless_probe.add(snap.time)
     window.str_cur_date_time.setText(str_cur_date + "    " + str_cur_time)
     window.update_counter.setText("%i" %
                                   ards_pyqt.DAQ_update_counter)
@@ -377,145 +491,117 @@ def update_GUI():
                                 ards_pyqt.obtained_DAQ_rate_Hz)
 
     # Show free memory
-    if ard1.is_alive:
-        window.Ard_1_label.setText("Arduino #1: %i%% free " %
-                                   round(state.Arduino_1_free_RAM/32768*100))
-    else:
+    if not ard1.is_alive:
         window.Ard_1_label.setText("Arduino #1: OFFLINE")
-    if ard2.is_alive:
-        window.Ard_2_label.setText("Arduino #2: %i%% free " %
-                                   round(state.Arduino_2_free_RAM/32768*100))
-    else:
+    elif "Arduino_1_free_RAM" in dirty:
+        window.Ard_1_label.setText("Arduino #1: %i%% free " %
+                                   round(snap.Arduino_1_free_RAM/32768*100))
+    if not ard2.is_alive:
         window.Ard_2_label.setText("Arduino #2: OFFLINE")
+    elif "Arduino_2_free_RAM" in dirty:
+        window.Ard_2_label.setText("Arduino #2: %i%% free " %
+                                   round(snap.Arduino_2_free_RAM/32768*100))
+
+    for i in range(1, 13):
+        name = "heater_TC_%02i_degC" % i
+        if name in dirty:
+            getattr(window, name).setText("%.1f" % getattr(snap, name))
+
+    for name in RELAY_FIELDS_GUI:
+        if name in dirty:
+            value = getattr(snap, name)
+            getattr(window, name).setChecked(value)
+            getattr(window, name).setText("%i" % value)
+
+    if "relay_2_8" in dirty:
+        window.enable_pump.setChecked(snap.relay_2_8)
+        if window.enable_pump.isChecked():
+            window.enable_pump.setText("Pump ON")
+        else:
+            window.enable_pump.setText("Pump OFF")
 
-    window.heater_TC_01_degC.setText("%.1f" % state.heater_TC_01_degC)
-    window.heater_TC_02_degC.setText("%.1f" % state.heater_TC_02_degC)
-    window.heater_TC_03_degC.setText("%.1f" % state.heater_TC_03_degC)
-    window.heater_TC_04_degC.setText("%.1f" % state.heater_TC_04_degC)
-    window.heater_TC_05_degC.setText("%.1f" % state.heater_TC_05_degC)
-    window.heater_TC_06_degC.setText("%.1f" % state.heater_TC_06_degC)
-    window.heater_TC_07_degC.setText("%.1f" % state.heater_TC_07_degC)
-    window.heater_TC_08_degC.setText("%.1f" % state.heater_TC_08_degC)
-    window.heater_TC_09_degC.setText("%.1f" % state.heater_TC_09_degC)
-    window.heater_TC_10_degC.setText("%.1f" % state.heater_TC_10_degC)
-    window.heater_TC_11_degC.setText("%.1f" % state.heater_TC_11_degC)
-    window.heater_TC_12_degC.setText("%.1f" % state.heater_TC_12_degC)
-
-    window.relay_1_1.setChecked(state.relay_1_1)
-    window.relay_1_2.setChecked(state.relay_1_2)
-    window.relay_1_3.setChecked(state.relay_1_3)
-    window.relay_1_4.setChecked(state.relay_1_4)
-    window.relay_1_5.setChecked(state.relay_1_5)
-    window.relay_1_6.setChecked(state.relay_1_6)
-    window.relay_1_7.setChecked(state.relay_1_7)
-    window.relay_1_8.setChecked(state.relay_1_8)
-
-    window.relay_1_1.setText("%i" % state.relay_1_1)
-    window.relay_1_2.setText("%i" % state.relay_1_2)
-    window.relay_1_3.setText("%i" % state.relay_1_3)
-    window.relay_1_4.setText("%i" % state.relay_1_4)
-    window.relay_1_5.setText("%i" % state.relay_1_5)
-    window.relay_1_6.setText("%i" % state.relay_1_6)
-    window.relay_1_7.setText("%i" % state.relay_1_7)
-    window.relay_1_8.setText("%i" % state.relay_1_8)
-
-    window.enable_pump.setChecked(state.relay_2_8)
-    if window.enable_pump.isChecked():
-        window.enable_pump.setText("Pump ON")
-    else:
-        window.enable_pump.setText("Pump OFF")
-
-    window.enable_pump_PID.setChecked(state.ENA_PID_tunnel_flow_rate)
-    if state.ENA_PID_tunnel_flow_rate:
-        window.enable_pump_PID.setText("PID feedback ON")
+    if not dirty.isdisjoint(("ENA_PID_tunnel_flow_rate", "set_pump_speed_mA")):
+        window.enable_pump_PID.setChecked(snap.ENA_PID_tunnel_flow_rate)
+        if snap.ENA_PID_tunnel_flow_rate:
+            window.enable_pump_PID.setText("PID feedback ON")
 
-        window.set_pump_speed_pct.setText("%.1f" %
-            ((state.set_pump_speed_mA - 4)/16*100))
-        window.set_pump_speed_mA.setText("%.2f" % state.set_pump_speed_mA)
+            window.set_pump_speed_pct.setText("%.1f" %
+                ((snap.set_pump_speed_mA - 4)/16*100))
+            window.set_pump_speed_mA.setText("%.2f" % snap.set_pump_speed_mA)
 
-        window.set_pump_speed_pct.setReadOnly(True)
-        window.set_pump_speed_mA.setReadOnly(True)
-    else:
-        window.enable_pump_PID.setText("PID feedback OFF")
-        window.set_pump_speed_pct.setReadOnly(False)
-        window.set_pump_speed_mA.setReadOnly(False)
+            window.set_pump_speed_pct.setReadOnly(True)
+            window.set_pump_speed_mA.setReadOnly(True)
+        else:
+            window.enable_pump_PID.setText("PID feedback OFF")
+            window.set_pump_speed_pct.setReadOnly(False)
+            window.set_pump_speed_mA.setReadOnly(False)
 
     if state.starting_up:
         # Insert the last setpoints known to the Arduinos into textboxes only at
         # the start of the application
-        window.set_pump_speed_mA.setText("%.2f" % state.set_pump_speed_mA)
+        window.set_pump_speed_mA.setText("%.2f" % snap.set_pump_speed_mA)
         window.set_pump_speed_pct.setText("%.1f" %
-            ((state.set_pump_speed_mA - 4)/16*100))
+            ((snap.set_pump_speed_mA - 4)/16*100))
 
         window.set_flow_speed_cms.setText("%.2f" %
-            (state.setpoint_flow_rate_m3h / state.area_meas_section / 36.0))
-        window.set_flow_rate_m3h.setText("%.2f" % state.setpoint_flow_rate_m3h)
+            (snap.setpoint_flow_rate_m3h / snap.area_meas_section / 36.0))
+        window.set_flow_rate_m3h.setText("%.2f" % snap.setpoint_flow_rate_m3h)
 
         state.starting_up = False
 
-    window.read_flow_rate_m3h.setText("%.2f" % state.read_flow_rate_m3h)
-    window.read_flow_rate_mA.setText("%.2f" % state.read_flow_rate_mA)
-    window.read_flow_rate_bitV.setText("%i" % state.read_flow_rate_bitV)
+    if "read_flow_rate_m3h" in dirty:
+        window.read_flow_rate_m3h.setText("%.2f" % snap.read_flow_rate_m3h)
+    if "read_flow_rate_mA" in dirty:
+        window.read_flow_rate_mA.setText("%.2f" % snap.read_flow_rate_mA)
+    if "read_flow_rate_bitV" in dirty:
+        window.read_flow_rate_bitV.setText("%i" % snap.read_flow_rate_bitV)
 
     # Transform flow rate [m3/h] to flow speed [cm/s]
-    window.read_flow_speed_cms.setText("%.2f" %
-        (state.read_flow_rate_m3h / state.area_meas_section / 36.0))
+    if not dirty.isdisjoint(("read_flow_rate_m3h", "area_meas_section")):
+        window.read_flow_speed_cms.setText("%.2f" %
+            (snap.read_flow_rate_m3h / snap.area_meas_section / 36.0))
 
     # Gas volume fraction
-    window.read_GVF_P_diff_mbar.setText("%.1f" % state.read_GVF_P_diff_mbar)
-    window.read_GVF_P_diff_mA.setText("%.2f" % state.read_GVF_P_diff_mA)
-    window.read_GVF_P_diff_bitV.setText("%i" % state.read_GVF_P_diff_bitV)
-    window.GVF_pct.setText("%.1f" % state.GVF_pct)
-
-    window.prox_switch_1.setChecked(state.prox_switch_1)
-    window.prox_switch_2.setChecked(state.prox_switch_2)
-    window.prox_switch_3.setChecked(not(state.prox_switch_3))
-    window.prox_switch_4.setChecked(not(state.prox_switch_4))
-    window.floater_switch.setChecked(state.floater_switch)
-
-    window.prox_switch_1.setText("%i" % state.prox_switch_1)
-    window.prox_switch_2.setText("%i" % state.prox_switch_2)
-    window.prox_switch_3.setText("%i" % (not(state.prox_switch_3)))
-    window.prox_switch_4.setText("%i" % (not(state.prox_switch_4)))
-    window.floater_switch.setText("%i" % (state.floater_switch))
-
-    window.relay_3_1.setChecked(state.relay_3_1)
-    window.relay_3_2.setChecked(state.relay_3_2)
-    window.relay_3_3.setChecked(state.relay_3_3)
-    window.relay_3_4.setChecked(state.relay_3_4)
-    window.relay_3_5.setChecked(state.relay_3_5)
-    window.relay_3_6.setChecked(state.relay_3_6)
-    window.relay_3_7.setChecked(state.relay_3_7)
-    window.relay_3_8.setChecked(state.relay_3_8)
-
-    window.relay_3_1.setText("%i" % state.relay_3_1)
-    window.relay_3_2.setText("%i" % state.relay_3_2)
-    window.relay_3_3.setText("%i" % state.relay_3_3)
-    window.relay_3_4.setText("%i" % state.relay_3_4)
-    window.relay_3_5.setText("%i" % state.relay_3_5)
-    window.relay_3_6.setText("%i" % state.relay_3_6)
-    window.relay_3_7.setText("%i" % state.relay_3_7)
-    window.relay_3_8.setText("%i" % state.relay_3_8)
+    if "read_GVF_P_diff_mbar" in dirty:
+        window.read_GVF_P_diff_mbar.setText("%.1f" % snap.read_GVF_P_diff_mbar)
+    if "read_GVF_P_diff_mA" in dirty:
+        window.read_GVF_P_diff_mA.setText("%.2f" % snap.read_GVF_P_diff_mA)
+    if "read_GVF_P_diff_bitV" in dirty:
+        window.read_GVF_P_diff_bitV.setText("%i" % snap.read_GVF_P_diff_bitV)
+    if "GVF_pct" in dirty:
+        window.GVF_pct.setText("%.1f" % snap.GVF_pct)
+
+    # Switches 3 and 4 are shown inverted
+    for (name, invert) in (("prox_switch_1", False), ("prox_switch_2", False),
+                           ("prox_switch_3", True), ("prox_switch_4", True),
+                           ("floater_switch", False)):
+        if name in dirty:
+            value = getattr(snap, name)
+            if invert: value = not(value)
+            getattr(window, name).setChecked(value)
+            getattr(window, name).setText("%i" % value)
 
     # Heater temperature control
-    window.pbtn_ENA_OTP.setChecked(state.ENA_OTP)
-    if window.pbtn_ENA_OTP.isChecked():
-        window.pbtn_ENA_OTP.setText("Protection enabled")
-        window.relay_1_1.setEnabled(False)
-        window.relay_1_2.setEnabled(False)
-        window.relay_1_3.setEnabled(False)
-    else:
-        window.pbtn_ENA_OTP.setText("WARNING:\nPROTECTION DISABLED")
-        window.relay_1_1.setEnabled(True)
-        window.relay_1_2.setEnabled(True)
-        window.relay_1_3.setEnabled(True)
+    if "ENA_OTP" in dirty:
+        window.pbtn_ENA_OTP.setChecked(snap.ENA_OTP)
+        if window.pbtn_ENA_OTP.isChecked():
+            window.pbtn_ENA_OTP.setText("Protection enabled")
+            window.relay_1_1.setEnabled(False)
+            window.relay_1_2.setEnabled(False)
+            window.relay_1_3.setEnabled(False)
+        else:
+            window.pbtn_ENA_OTP.setText("WARNING:\nPROTECTION DISABLED")
+            window.relay_1_1.setEnabled(True)
+            window.relay_1_2.setEnabled(True)
+            window.relay_1_3.setEnabled(True)
 
     # Redraw the state of the filling system (FS) program buttons
-    for iFSM_FS_EXEC in range(8):
-        if (iFSM_FS_EXEC == state.FSM_FS_EXEC):
-            window.FS_exec_button_list[iFSM_FS_EXEC].setChecked(True)
-        else:
-            window.FS_exec_button_list[iFSM_FS_EXEC].setChecked(False)
+    if "FSM_FS_EXEC" in dirty:
+        for iFSM_FS_EXEC in range(8):
+            if (iFSM_FS_EXEC == snap.FSM_FS_EXEC):
+                window.FS_exec_button_list[iFSM_FS_EXEC].setChecked(True)
+            else:
+                window.FS_exec_button_list[iFSM_FS_EXEC].setChecked(False)
 
     # Check for filling system messages and display when available
     while len(state.FS_new_msgs) > 0:
@@ -584,41 +670,31 @@ def update_charts():
                                        ards_pyqt.obtained_DAQ_rate_Hz)
     window.CH_DAQ_rate.update_curve()
 
-    # Update curves TC heaters
-    [CH.update_curve() for CH in window.CHs_heater_TC]
-
-    # Show or hide curve depending on checkbox
+    # Show or hide curve depending on checkbox. Hidden curves are not redrawn,
+    # hence set the visibility before updating the curves.
     for i in range(C.N_HEATER_TC):
-        window.CHs_heater_TC[i].curve.setVisible(
+        window.CH_heater_TC.curves[i].setVisible(
                 window.chkbs_heater_TC[i].isChecked())
+    for i in range(3):
+        window.CH_tunnel_temp.curves[i].setVisible(
+                window.chkbs_tunnel_temp[i].isChecked())
+    for i in range(2):
+        window.CH_chiller.curves[i].setVisible(
+                window.chkbs_tunnel_temp[i + 3].isChecked())
+    for i in range(mux2_N_channels):
+        window.CH_mux2.curves[i].setVisible(
+                window.chkbs_show_curves_mux2[i].isChecked())
+
+    # Update curves TC heaters
+    window.CH_heater_TC.update_curves()
 
     # Updates 'tunnel temperatures' strip chart sourced by the chiller and the
     # PT-104
-    window.CH_tunnel_outlet.update_curve()
-    window.CH_tunnel_inlet.update_curve()
-    window.CH_ambient.update_curve()
-    window.CH_chiller_temp.update_curve()
-    window.CH_chiller_setpoint.update_curve()
-
-    # Show or hide curve depending on checkbox
-    window.CH_tunnel_outlet.curve.setVisible(
-            window.chkbs_tunnel_temp[0].isChecked())
-    window.CH_tunnel_inlet.curve.setVisible(
-            window.chkbs_tunnel_temp[1].isChecked())
-    window.CH_ambient.curve.setVisible(
-            window.chkbs_tunnel_temp[2].isChecked())
-    window.CH_chiller_temp.curve.setVisible(
-            window.chkbs_tunnel_temp[3].isChecked())
-    window.CH_chiller_setpoint.curve.setVisible(
-            window.chkbs_tunnel_temp[4].isChecked())
+    window.CH_tunnel_temp.update_curves()
+    window.CH_chiller.update_curves()
 
     # Update 'thermistors' mux2 strip chart
-    [CH.update_curve() for CH in window.CHs_mux2]
-
-    # Show or hide curve depending on checkbox
-    for i in range(mux2_N_channels):
-        window.CHs_mux2[i].curve.setVisible(
-                window.chkbs_show_curves_mux2[i].isChecked())
+    window.CH_mux2.update_curves()
 
     # Update curves heater power
     if not psus[0].is_alive:
@@ -689,6 +765,20 @@ def process_pbtn_history_6():
                         time_axis_label=
                         '<span style="font-size:12pt">history (min)</span>')
 
+@QtCore.pyqtSlot()
+def process_pbtn_history_7():
+    change_history_axes(time_axis_factor=3600e3,   # transform [msec] to [hour]
+                        time_axis_range=-2,        # [hour]
+                        time_axis_label=
+                        '<span style="font-size:12pt">history (hour)</span>')
+
+@QtCore.pyqtSlot()
+def process_pbtn_history_8():
+    change_history_axes(time_axis_factor=3600e3,   # transform [msec] to [hour]
+                        time_axis_range=-24,       # [hour]
+                        time_axis_label=
+                        '<span style="font-size:12pt">history (hour)</span>')
+
 def change_history_axes(time_axis_factor, time_axis_range, time_axis_label):
     window.pi_heater_TC.setXRange(time_axis_range, 0)
     window.pi_heater_TC.setLabel('bottom', time_axis_label)
@@ -709,19 +799,12 @@ def change_history_axes(time_axis_factor, time_axis_range, time_axis_label):
     window.pi_DAQ_rate.setXRange(time_axis_range, 0)
     window.pi_DAQ_rate.setLabel('bottom', time_axis_label)
 
-    for CH in window.CHs_heater_TC:
-        CH.x_axis_divisor = time_axis_factor
+    window.CH_heater_TC.x_axis_divisor        = time_axis_factor
     window.CH_flow_speed.x_axis_divisor       = time_axis_factor
     window.CH_set_pump_speed.x_axis_divisor   = time_axis_factor
-    window.CH_tunnel_outlet.x_axis_divisor    = time_axis_factor
-    window.CH_tunnel_inlet.x_axis_divisor     = time_axis_factor
-    window.CH_ambient.x_axis_divisor          = time_axis_factor
-    window.CH_chiller_temp.x_axis_divisor     = time_axis_factor
-    window.CH_chiller_setpoint.x_axis_divisor = time_axis_factor
-
-    for i in range(mux2_N_channels):
-        window.CHs_mux2[i].x_axis_divisor = time_axis_factor
-
+    window.CH_tunnel_temp.x_axis_divisor      = time_axis_factor
+    window.CH_chiller.x_axis_divisor          = time_axis_factor
+    window.CH_mux2.x_axis_divisor             = time_axis_factor
     window.CH_power_PSU_1.x_axis_divisor      = time_axis_factor
     window.CH_power_PSU_2.x_axis_divisor      = time_axis_factor
     window.CH_power_PSU_3.x_axis_divisor      = time_axis_factor
@@ -877,7 +960,7 @@ def set_pump_speed_from_pct_textbox():
     mA_value  = pct_value/100*16 + 4
     window.set_pump_speed_pct.setText("%.1f" % pct_value)
     window.set_pump_speed_mA.setText("%.2f" % mA_value)
-    ards_pyqt.send(ard1, "sps%.2f" % mA_value)
+    ards_pyqt.send(ard1, "sps%.2f" % mA_value, coalesce_key="sps")
 
     # Automatically set ENA_TUNNEL_PUMP to False when 0 has been entered
     # EDIT: don't. This will immediately switch off the pump without slow wind
@@ -896,7 +979,7 @@ def set_pump_speed_from_mA_textbox():
     pct_value = (mA_value - 4)/16*100
     window.set_pump_speed_pct.setText("%.1f" % pct_value)
     window.set_pump_speed_mA.setText("%.2f" % mA_value)
-    ards_pyqt.send(ard1, "sps%.2f" % mA_value)
+    ards_pyqt.send(ard1, "sps%.2f" % mA_value, coalesce_key="sps")
 
     # Automatically set ENA_TUNNEL_PUMP to False when 0 has been entered
     #if pct_value == 0:
@@ -950,7 +1033,7 @@ def set_tunnel_flow_speed_cms_from_textbox():
 
     window.set_flow_speed_cms.setText("%.2f" % value_cms)
     window.set_flow_rate_m3h.setText("%.2f" % value_m3h)
-    ards_pyqt.send(ard1, "sfr%.3f" % value_m3h)
+    ards_pyqt.send(ard1, "sfr%.3f" % value_m3h, coalesce_key="sfr")
 
 # ------------------------------------------------------------------------------
 #   Heater temperature control
@@ -1078,6 +1161,10 @@ def notify_connection_lost():
         "\n   Arduino_#2 was alive: " + str(ard2.is_alive) +
         "\n\nExiting...")
     print("\nCRITICAL ERROR: " + str_msg)
+    if HEADLESS_DURATION is not None:
+        finish_headless_run()
+        return
+
     reply = QtGui.QMessageBox.warning(window, "CRITICAL ERROR", str_msg,
                                       QtGui.QMessageBox.Ok)
 
@@ -1115,7 +1202,7 @@ def about_to_quit():
         if trav.is_alive:
             travs_are_powerless &= trav.status_word_1.powerless
 
-    if not travs_are_powerless:
+    if not travs_are_powerless and HEADLESS_DURATION is None:
         str_msg = ("The traverse is still powered.\n\n"
                    "Remove power to save energy?")
         reply = QtWid.QMessageBox.question(None,
@@ -1159,8 +1246,18 @@ def about_to_quit():
         except: pass
     try: rm.close()
     except: pass
+
+    if io_tracer is not None:
+        io_tracer.close()
+        print("I/O trace written to: %s" % TRACE_IO_PATH)
     print("")
 
+@QtCore.pyqtSlot()
+def finish_headless_run():
+    headless_probe.report([ards_pyqt, chiller_pyqt, mfc_pyqt, mux1_pyqt,
+                           mux2_pyqt, pt104_pyqt] + psus_pyqt + travs_pyqt)
+    app.quit()
+
 def _(): pass # Spyder IDE outline divider
 
 # ------------------------------------------------------------------------------
@@ -1250,10 +1347,13 @@ def DAQ_postprocess_MUX1_scan_function():
                 (readings[i] == np.nan)):
                 all_temps_okay = False
 
+        # Shared coalesce key: the latest verdict replaces a pending one in
+        # place, so that a stale 'otp_okay' can never run after a trip
         if all_temps_okay:
-            ards_pyqt.send(ard1, "otp_okay")
+            ards_pyqt.send(ard1, "otp_okay", coalesce_key="otp")
         else:
-            ards_pyqt.send(ard1, "otp_trip")
+            ards_pyqt.send(ard1, "otp_trip", Job_priority.SAFETY,
+                           coalesce_key="otp")
     else:
         # Multiplexer is not scanning. No readings available
         readings = [np.nan] * 12
@@ -1273,8 +1373,8 @@ def DAQ_postprocess_MUX1_scan_function():
 
     # Add readings to charts
     elapsed_time = QDateTime.currentDateTime().toMSecsSinceEpoch()
-    for i in range(C.N_HEATER_TC):
-        window.CHs_heater_TC[i].add_new_reading(elapsed_time, readings[i])
+    window.CH_heater_TC.add_new_reading(elapsed_time,
+                                        readings[:C.N_HEATER_TC])
 
 def DAQ_postprocess_MUX2_scan_function():
 
@@ -1289,8 +1389,7 @@ def DAQ_postprocess_MUX2_scan_function():
 
     # Add readings to charts
     elapsed_time = QDateTime.currentDateTime().toMSecsSinceEpoch()
-    for i in range(mux2_N_channels):
-        window.CHs_mux2[i].add_new_reading(elapsed_time, readings[i])
+    window.CH_mux2.add_new_reading(elapsed_time, readings[:mux2_N_channels])
 
     # ----------------------------------------------------------------------
     #   Logging to file
@@ -1332,15 +1431,17 @@ def DAQ_postprocess_MUX2_scan_function():
 @QtCore.pyqtSlot()
 def update_GUI_PT104():
     # Add readings to charts
+    snap = pt104_pyqt.state_buffer.snapshot()
     elapsed_time = QDateTime.currentDateTime().toMSecsSinceEpoch()
-    window.CH_tunnel_inlet.add_new_reading(elapsed_time, pt104.state.ch1_T)
-    window.CH_tunnel_outlet.add_new_reading(elapsed_time, pt104.state.ch2_T)
-    window.CH_ambient.add_new_reading(elapsed_time, pt104.state.ch3_T)
+    window.CH_tunnel_temp.add_new_reading(elapsed_time,
+                                          (snap.ch2_T,    # outlet
+                                           snap.ch1_T,    # inlet
+                                           snap.ch3_T))   # ambient
 
     # GUI
-    window.tunnel_inlet_temp.setText("%.3f" % pt104.state.ch1_T)
-    window.tunnel_outlet_temp.setText("%.3f" % pt104.state.ch2_T)
-    window.ambient_temp.setText("%.3f" % pt104.state.ch3_T)
+    window.tunnel_inlet_temp.setText("%.3f" % snap.ch1_T)
+    window.tunnel_outlet_temp.setText("%.3f" % snap.ch2_T)
+    window.ambient_temp.setText("%.3f" % snap.ch3_T)
     if not pt104.is_alive:
         window.pt104_offline.setVisible(True)
 
@@ -1351,15 +1452,15 @@ def update_GUI_PT104():
 @QtCore.pyqtSlot()
 def update_GUI_chiller_extras():
     # Add readings to charts
+    snap = chiller_pyqt.state_buffer.snapshot()
     elapsed_time = QDateTime.currentDateTime().toMSecsSinceEpoch()
-    window.CH_chiller_setpoint.add_new_reading(elapsed_time,
-                                               chiller.state.setpoint)
-    window.CH_chiller_temp.add_new_reading(elapsed_time,
-                                           chiller.state.temp)
+    window.CH_chiller.add_new_reading(elapsed_time,
+                                      (snap.temp,
+                                       snap.setpoint))
 
     # GUI
-    window.chiller_read_setpoint.setText("%.1f" % chiller.state.setpoint)
-    window.chiller_read_temp.setText("%.1f" % chiller.state.temp)
+    window.chiller_read_setpoint.setText("%.1f" % snap.setpoint)
+    window.chiller_read_temp.setText("%.1f" % snap.temp)
 
 # ------------------------------------------------------------------------------
 #   Compax3 traverse routines
@@ -1390,17 +1491,16 @@ def act_upon_signal_step_right(new_pos: float):
 # ------------------------------------------------------------------------------
 
 def fill_TC_chart_with_random_data():
-    #last_time_stamp = self.CHs_heater_TC[0]._time[-1]
     last_time_stamp = QDateTime.currentDateTime().toMSecsSinceEpoch()
+    time_ms = (last_time_stamp -
+               np.arange(C.CH_SAMPLES_HEATER_TC, -1, -1) *
+               C.MUX_1_SCANNING_INTERVAL)
 
-    for i in range(C.N_HEATER_TC):
-        window.CHs_heater_TC[i].clear()
-        time_ms = (last_time_stamp -
-                   np.arange(C.CH_SAMPLES_HEATER_TC, -1, -1) *
-                   C.MUX_1_SCANNING_INTERVAL)
-        window.CHs_heater_TC[i].add_new_readings(
-                time_ms,
-                20.0 + np.sin(2*np.pi/230000*(time_ms - i*1e4)))
+    window.CH_heater_TC.clear()
+    window.CH_heater_TC.add_new_readings(
+            time_ms,
+            20.0 + np.sin(2*np.pi/230000*(time_ms[:, None] -
+                                          np.arange(C.N_HEATER_TC)*1e4)))
 
 def _(): pass # Spyder IDE outline divider
 # ------------------------------------------------------------------------------
@@ -1408,6 +1508,40 @@ def _(): pass # Spyder IDE outline divider
 # ------------------------------------------------------------------------------
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MHT tunnel control")
+    parser.add_argument("--simulate", action="store_true",
+                        help="run on simulated devices instead of the hardware")
+    parser.add_argument("--headless", type=float, metavar="SECONDS",
+                        help=("run on simulated devices for SECONDS without "
+                              "showing the GUI, then report the obtained DAQ "
+                              "rate and GUI latency"))
+    parser.add_argument("--trace-io", metavar="PATH",
+                        help=("record all device I/O transactions into the "
+                              "binary ring file PATH"))
+    [args, qt_args] = parser.parse_known_args()
+    HEADLESS_DURATION = args.headless
+    TRACE_IO_PATH = args.trace_io
+    SIMULATE = args.simulate or (HEADLESS_DURATION is not None)
+
+    if HEADLESS_DURATION is not None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    # Device classes, the simulated ones are subclasses offering the same
+    # interface. The simulated devices are POSIX only, hence the late import.
+    Arduino            = Arduino_functions.Arduino
+    ThermoFlex_chiller = chiller_functions.ThermoFlex_chiller
+    Bronkhorst_MFC     = mfc_functions.Bronkhorst_MFC
+    Compax3_traverse   = compax3_functions.Compax3_traverse
+    PT104              = pt104_functions.PT104
+    if SIMULATE:
+        import MHT_tunnel_simulated_devices as sim
+        Arduino            = sim.Simulated_Arduino
+        ThermoFlex_chiller = sim.Simulated_ThermoFlex_chiller
+        Bronkhorst_MFC     = sim.Simulated_Bronkhorst_MFC
+        Compax3_traverse   = sim.Simulated_Compax3_traverse
+        PT104              = sim.Simulated_PT104
+        print("Running on SIMULATED devices\n")
+
     # Set priority of this process to maximum in the operating system
     print("PID: %s\n" % os.getpid())
     try:
@@ -1423,7 +1557,7 @@ if __name__ == '__main__':
     QtCore.QThread.currentThread().setObjectName('MAIN')    # For DEBUG info
 
     app = 0    # Work-around for kernel crash when using Spyder IDE
-    app = QtGui.QApplication(sys.argv)
+    app = QtGui.QApplication(sys.argv[:1] + qt_args)
     app.setFont(MHT_tunnel_GUI.FONT_DEFAULT)
     app.aboutToQuit.connect(about_to_quit)
 
@@ -1431,7 +1565,7 @@ if __name__ == '__main__':
     #   Connect to Arduinos
     # --------------------------------------------------------------------------
 
-    ard1 = Arduino_functions.Arduino(name="Ard 1", baudrate=115200)
+    ard1 = Arduino(name="Ard 1", baudrate=115200)
     ard1.auto_connect(path_config=C.PATH_CONFIG_ARD1,
                       match_identity="Arduino_#1")
 
@@ -1440,7 +1574,7 @@ if __name__ == '__main__':
         print("Exiting...\n")
         sys.exit(0)
 
-    ard2 = Arduino_functions.Arduino(name="Ard 2", baudrate=115200)
+    ard2 = Arduino(name="Ard 2", baudrate=115200)
     ard2.auto_connect(path_config=C.PATH_CONFIG_ARD2,
                       match_identity="Arduino_#2")
 
@@ -1449,27 +1583,39 @@ if __name__ == '__main__':
         print("Exiting...\n")
         sys.exit(0)
 
-    ards_pyqt = Arduino_pyqt_lib.Arduino_pyqt(ard1,
-                                              ard2,
-                                              C.UPDATE_INTERVAL_ARDUINOS,
-                                              my_Arduino_DAQ_update)
-    ards_pyqt.signal_DAQ_updated.connect(update_GUI)
+    # Use the binary state frames when the firmware supports them
+    ard_stream = (
+        ard1.negotiate_binary_state(ARD1_STATE_DTYPE, ARD_STATE_FRAME_VERSION)
+        & ard2.negotiate_binary_state(ARD2_STATE_DTYPE, ARD_STATE_FRAME_VERSION)
+        & C.STREAM_ARDUINOS)
+
+    ards_pyqt = Arduino_pyqt_lib.Arduino_pyqt(
+            ard1,
+            ard2,
+            C.UPDATE_INTERVAL_ARDUINOS,
+            my_Arduino_DAQ_update,
+            DAQ_trigger_by=(DAQ_trigger.EXTERNAL_WAKE_UP_CALL if ard_stream
+                            else DAQ_trigger.DEADLINE_TIMER))
+    ards_pyqt.GUI_throttle.max_rate_Hz = C.GUI_REFRESH_RATE_ARDUINOS
+    ards_pyqt.signal_GUI_refresh.connect(update_GUI)
     ards_pyqt.signal_connection_lost.connect(notify_connection_lost)
 
     # --------------------------------------------------------------------------
     #   Connect to peripheral devices
     # --------------------------------------------------------------------------
 
-    rm = visa.ResourceManager()    # Open VISA resource manager
+    if SIMULATE:
+        rm = sim.Simulated_resource_manager()
+    else:
+        rm = visa.ResourceManager()    # Open VISA resource manager
 
     # -----------------------------------
     #   ThermoFlex chiller
     # -----------------------------------
 
-    chiller = chiller_functions.ThermoFlex_chiller(
-                                    min_setpoint_degC=C.CHILLER_MIN_TEMP_DEG_C,
-                                    max_setpoint_degC=C.CHILLER_MAX_TEMP_DEG_C,
-                                    name="chiller")
+    chiller = ThermoFlex_chiller(min_setpoint_degC=C.CHILLER_MIN_TEMP_DEG_C,
+                                 max_setpoint_degC=C.CHILLER_MAX_TEMP_DEG_C,
+                                 name="chiller")
     if chiller.auto_connect(path_config=C.PATH_CONFIG_CHILLER):
         chiller.begin()
 
@@ -1482,7 +1628,7 @@ if __name__ == '__main__':
     #   Bronkhorst mass flow controller
     # -----------------------------------
 
-    mfc = mfc_functions.Bronkhorst_MFC(name="MFC")
+    mfc = Bronkhorst_MFC(name="MFC")
     if mfc.auto_connect(path_config=C.PATH_CONFIG_MFC_1,
                         match_serial_str=C.SERIAL_MFC_1):
         mfc.begin()
@@ -1534,8 +1680,8 @@ if __name__ == '__main__':
     #   Compax3 traverse controllers
     # -----------------------------------
 
-    trav_horz = compax3_functions.Compax3_traverse(name="TRAV HORZ")
-    trav_vert = compax3_functions.Compax3_traverse(name="TRAV VERT")
+    trav_horz = Compax3_traverse(name="TRAV HORZ")
+    trav_vert = Compax3_traverse(name="TRAV VERT")
     travs = [trav_horz, trav_vert]
 
     if trav_horz.auto_connect(path_config=C.PATH_CONFIG_TRAV_HORZ,
@@ -1585,7 +1731,7 @@ if __name__ == '__main__':
     # 'keep alive' signal. The next 'keep alive' will be send when the
     # worker_DAQ thread is started.
 
-    pt104 = pt104_functions.PT104(name="PT104")
+    pt104 = PT104(name="PT104")
     if pt104.connect(C.PT104_IP_ADDRESS, C.PT104_PORT):
         pt104.begin()
         pt104.start_conversion(C.PT104_ENA_CHANNELS, C.PT104_GAIN_CHANNELS)
@@ -1617,6 +1763,16 @@ if __name__ == '__main__':
                     DAQ_postprocess_MUX_scan_function=
                     DAQ_postprocess_MUX2_scan_function)
 
+    # -----------------------------------
+    #   Trace device I/O
+    # -----------------------------------
+
+    if TRACE_IO_PATH is not None:
+        io_tracer = IO_tracer(TRACE_IO_PATH)
+        for dev in [ard1, ard2, chiller, mfc, mux1, mux2, pt104] + psus + travs:
+            io_tracer.attach(dev)
+        print("Tracing device I/O to: %s\n" % TRACE_IO_PATH)
+
     # --------------------------------------------------------------------------
     #   Create main window
     # --------------------------------------------------------------------------
@@ -1707,14 +1863,15 @@ if __name__ == '__main__':
         color = np.array(color) * 255
         PENS[i] = pg.mkPen(color=color, **params)
 
-    # Create Chart Histories (CH) and PlotDataItems and link them together
+    # Create Chart History (CH) and PlotDataItems and link them together
     # Also add legend entries
-    window.CHs_mux2 = [None] * mux2_N_channels
+    window.CH_mux2 = MultiChartHistory(C.CH_SAMPLES_MUX2,
+                                       [window.pi_mux2.plot(pen=PENS[i])
+                                        for i in range(mux2_N_channels)],
+                                       tiers=C.CH_TIERS)
     window.chkbs_show_curves_mux2 = [None] * mux2_N_channels
     for i in range(mux2_N_channels):
-        window.CHs_mux2[i] = ChartHistory(C.CH_SAMPLES_MUX2,
-                                          window.pi_mux2.plot(pen=PENS[i]))
-        window.legend_mux2.addItem(window.CHs_mux2[i].curve,
+        window.legend_mux2.addItem(window.CH_mux2.curves[i],
                                    name=mux2.state.all_scan_list_channels[i])
 
         # Add checkboxes for showing the curves
@@ -1749,7 +1906,14 @@ if __name__ == '__main__':
     #   File logger
     # --------------------------------------------------------------------------
 
-    file_logger = FileLogger()
+    # The Arduino DAQ thread runs at time critical priority. Hand over the
+    # formatting and writing to disk to a background writer thread.
+    file_logger = FileLogger(buffered=True,
+                             row_format=LOG_ROW_FORMAT,
+                             flush_interval=1.0,
+                             flush_size=100,
+                             fsync='close',
+                             binary_dtype=LOG_DTYPE)
     file_logger.signal_set_recording_text.connect(window.set_text_qpbt_record)
 
     file_logger_mux2 = FileLogger()
@@ -1762,6 +1926,14 @@ if __name__ == '__main__':
     ards_pyqt.start_thread_worker_DAQ(QtCore.QThread.TimeCriticalPriority)
     ards_pyqt.start_thread_worker_send()
 
+    if ard_stream:
+        # Each state frame pushed by Arduino 1 triggers a DAQ update, which
+        # picks up the latest frame of Arduino 2 as well
+        ard2.start_streaming(C.UPDATE_INTERVAL_ARDUINOS)
+        ard1.start_streaming(C.UPDATE_INTERVAL_ARDUINOS,
+                             on_frame=lambda t, record:
+                             ards_pyqt.worker_DAQ.wake_up())
+
     # Picotech PT-104
     if not pt104_pyqt.start_thread_worker_DAQ():
         update_GUI_PT104()  # Update GUI once to reflect offline device
@@ -1841,6 +2013,14 @@ if __name__ == '__main__':
     window.set_flow_speed_cms.editingFinished.connect(
             set_tunnel_flow_speed_cms_from_textbox)
 
+    # A click toggles a button before the Arduinos have acted upon it. Redraw
+    # all widgets at the next GUI refresh, so that the buttons reflect the
+    # actual state again, even when it did not change.
+    for button in ([getattr(window, name) for name in RELAY_FIELDS_GUI] +
+                   [window.enable_pump, window.enable_pump_PID,
+                    window.pbtn_ENA_OTP] + list(window.FS_exec_button_list)):
+        button.clicked.connect(lambda *args: GUI_dirty_fields.reset())
+
     window.pbtn_reset.clicked.connect(soft_reset)
     window.pbtn_record.clicked.connect(process_pbtn_record_to_file)
 
@@ -1850,6 +2030,8 @@ if __name__ == '__main__':
     window.pbtn_history_4.clicked.connect(process_pbtn_history_4)
     window.pbtn_history_5.clicked.connect(process_pbtn_history_5)
     window.pbtn_history_6.clicked.connect(process_pbtn_history_6)
+    window.pbtn_history_7.clicked.connect(process_pbtn_history_7)
+    window.pbtn_history_8.clicked.connect(process_pbtn_history_8)
 
     window.pbtn_ENA_OTP.clicked.connect(process_pbtn_ENA_OTP)
 
@@ -1879,14 +2061,22 @@ if __name__ == '__main__':
     window.chkbs_heater_TC[10].setChecked(False)
     window.chkbs_heater_TC[11].setChecked(False)
 
-    # Stripchart downsampling
-    #window.pi_heater_TC.setDownsampling(ds=10, auto=False, mode='mean')
-    #window.pi_flow_speed.setDownsampling(ds=10, auto=False, mode='mean')
-    #window.plot_set_pump_speed.setDownsampling(ds=10, auto=False, method='mean')
+    # Stripchart downsampling: Peak-preserving min/max decimation
+    for CH in (window.CH_heater_TC, window.CH_flow_speed,
+               window.CH_set_pump_speed, window.CH_tunnel_temp,
+               window.CH_chiller, window.CH_mux2, window.CH_power_PSU_1,
+               window.CH_power_PSU_2, window.CH_power_PSU_3,
+               window.CH_DAQ_rate):
+        CH.apply_downsampling(True)
 
     # Init the time axis of the strip charts
     process_pbtn_history_3()
 
+    # Show the timing statistics of all devices in the debug tab
+    for dev_pyqt in ([ards_pyqt, chiller_pyqt, mfc_pyqt, mux1_pyqt, mux2_pyqt,
+                      pt104_pyqt] + psus_pyqt + travs_pyqt):
+        window.timing_stats.add_device(dev_pyqt)
+
     # Retrieve the last used measurement section from config file on disk
     meas_section_number = 2  # Default when file can not be read or found
     if C.PATH_CONFIG_MEAS_SECTION.is_file():
@@ -1911,9 +2101,9 @@ if __name__ == '__main__':
 
     # Debugging test
     window.pbtn_debug_1.clicked.connect(lambda:
-      window.pi_heater_TC.setDownsampling(ds=10, auto=False, mode='mean'))
+      window.CH_heater_TC.apply_downsampling(True))
     window.pbtn_debug_2.clicked.connect(lambda:
-      window.pi_heater_TC.setDownsampling(ds=1, auto=False, mode='mean'))
+      window.CH_heater_TC.apply_downsampling(False))
 
     # DEBUG
     #window.tabs.setCurrentIndex(1)
@@ -1924,4 +2114,10 @@ if __name__ == '__main__':
 
     window.setGeometry(220, 34, 1310, 1010)
     window.show()
+
+    if HEADLESS_DURATION is not None:
+        headless_probe = sim.GUI_latency_probe()
+        QtCore.QTimer.singleShot(round(HEADLESS_DURATION * 1e3),
+                                 finish_headless_run)
+
     sys.exit(app.exec_())
\ No newline at end of file
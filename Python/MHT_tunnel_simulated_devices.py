@@ -0,0 +1,1170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Simulated stand-ins for all devices of the MHT tunnel set-up, to run and
+benchmark MHT_tunnel_control_v1p3 on any Linux box, without the hardware.
+
+Each simulated device is a subclass of its device class, e.g.
+Simulated_Arduino of DvG_dev_Arduino__fun_serial.Arduino, hence offers the very
+same interface. Only the connection is redirected to an emulator of the device,
+while the device library itself runs unaltered down to the actual serial, UDP
+and VISA I/O:
+
+    - Arduinos, Bronkhorst MFC, ThermoFlex chiller and Compax3 traverses:
+      A pseudo-terminal (pty) pair stands in for the serial port. The device
+      library opens the slave end as a regular serial port, while the emulator
+      answers at the master end.
+    - Picotech PT-104:
+      A local UDP server emulates the PT-104, including its continuous stream
+      of conversion packets.
+    - Keysight N8700 PSUs and 3497xA multiplexers:
+      Simulated_resource_manager stands in for 'visa.ResourceManager' and opens
+      emulated SCPI instruments. The PSU and K3497xA classes are used as is,
+      by passing it to 'PSU.connect(rm)' and 'K3497xA.connect(rm)'.
+
+The emulators answer after a configurable latency and jitter, and can be made
+to lose replies, i.e. let the device library time out, and to drop out
+completely for a while, see class Timing.
+
+    timing = Timing(latency_ms=4, jitter_ms=1, timeout_rate=1e-3)
+    ard1 = Simulated_Arduino(name="Ard 1", baudrate=115200, timing=timing)
+    ard1.auto_connect(path_config, match_identity="Arduino_#1")
+
+POSIX only, because of the pseudo-terminals.
+
+Classes:
+    Timing(latency_ms=5, jitter_ms=1, timeout_rate=0, dropout_rate=0,
+           dropout_ms=3000):
+        Args:
+            latency_ms (float): Mean reply latency [ms].
+            jitter_ms (float): Standard deviation of the reply latency [ms].
+            timeout_rate (float): Chance per request to lose the reply.
+            dropout_rate (float): Chance per request for the device to drop
+                out, i.e. to not reply at all during 'dropout_ms'.
+            dropout_ms (float): Duration of a drop-out [ms].
+
+        Methods:
+            reply_delay():
+                Decide the fate of a single request.
+
+        Important members:
+            N_replies (int):
+            N_lost (int): Number of lost replies, including drop-outs.
+            N_dropouts (int):
+
+    Simulated_Arduino(name="Ard", baudrate=9600, timing=None, **kwargs)
+    Simulated_Bronkhorst_MFC(name="MFC", timing=None)
+    Simulated_ThermoFlex_chiller(..., timing=None)
+    Simulated_Compax3_traverse(name="trav", timing=None)
+    Simulated_PT104(name="PT104", timing=None)
+        Simulated devices, see their device classes. The emulator of the device
+        is created when connecting and is stopped by 'close()'. The port config
+        files are left untouched.
+
+    Simulated_resource_manager(instruments=None, timing=None):
+        Stand-in for 'visa.ResourceManager'. By default, it opens the PSUs and
+        multiplexers at the VISA addresses of MHT_tunnel_constants.
+
+    GUI_latency_probe():
+        Keeps track of the obtained DAQ rate of the Arduinos and the latency
+        of the GUI updates, for headless runs of MHT_tunnel_control_v1p3.
+"""
+__author__      = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__         = ""
+__date__        = "17-10-2026"
+__version__     = "1.1.1"
+
+import os
+import pty
+import tty
+import math
+import time
+import socket
+import random
+import select
+import struct
+import threading
+
+import numpy as np
+import visa
+
+import MHT_tunnel_constants as C
+
+import DvG_dev_Arduino__fun_serial           as Arduino_functions
+import DvG_dev_Bronkhorst_MFC__fun_RS232     as mfc_functions
+import DvG_dev_ThermoFlex_chiller__fun_RS232 as chiller_functions
+import DvG_dev_Compax3_traverse__fun_RS232   as compax3_functions
+import DvG_dev_Picotech_PT104__fun_UDP       as pt104_functions
+
+# Default timing per device type, see class Timing
+TIMING_ARDUINO = dict(latency_ms=4 , jitter_ms=1)
+TIMING_MFC     = dict(latency_ms=8 , jitter_ms=2)
+TIMING_CHILLER = dict(latency_ms=15, jitter_ms=3)  # < RS232_SLEEP of 50 ms
+TIMING_COMPAX3 = dict(latency_ms=4 , jitter_ms=1)
+TIMING_PT104   = dict(latency_ms=2 , jitter_ms=1)
+TIMING_PSU     = dict(latency_ms=8 , jitter_ms=2)
+TIMING_MUX     = dict(latency_ms=10, jitter_ms=2)
+
+# ------------------------------------------------------------------------------
+#   Timing
+# ------------------------------------------------------------------------------
+
+class Timing():
+    def __init__(self, latency_ms=5, jitter_ms=1, timeout_rate=0,
+                 dropout_rate=0, dropout_ms=3000):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.timeout_rate = timeout_rate
+        self.dropout_rate = dropout_rate
+        self.dropout_ms = dropout_ms
+
+        self.N_replies = 0
+        self.N_lost = 0
+        self.N_dropouts = 0
+        self._t_dropout_end = 0
+
+    def reply_delay(self):
+        """Decide the fate of a single request.
+
+        Returns: The delay [s] after which to reply, or None when the reply
+        gets lost.
+        """
+        now = time.perf_counter()
+        if now < self._t_dropout_end:
+            self.N_lost += 1
+            return None
+
+        if random.random() < self.dropout_rate:
+            self._t_dropout_end = now + self.dropout_ms / 1e3
+            self.N_dropouts += 1
+            self.N_lost += 1
+            return None
+
+        if random.random() < self.timeout_rate:
+            self.N_lost += 1
+            return None
+
+        self.N_replies += 1
+        return max(0, random.gauss(self.latency_ms, self.jitter_ms)) / 1e3
+
+def _get_timing(timing, defaults):
+    return timing if timing is not None else Timing(**defaults)
+
+# ------------------------------------------------------------------------------
+#   Pty_serial_stand_in
+# ------------------------------------------------------------------------------
+
+class Pty_serial_stand_in(threading.Thread):
+    """Pseudo-terminal pair standing in for a serial port. The device library
+    opens 'port', the slave end. This thread reads the requests arriving at the
+    master end, splits them on 'terminator' and answers each one after the
+    delay decided by 'timing'. Subclasses implement the device in 'reply()'.
+    """
+    def __init__(self, name, timing, terminator=b"\n"):
+        super().__init__(name="%s stand-in" % name, daemon=True)
+        self.timing = timing
+        self.terminator = terminator
+
+        [self._fd_master, self._fd_slave] = pty.openpty()
+        tty.setraw(self._fd_slave)
+        self.port = os.ttyname(self._fd_slave)
+
+        # Replies and unsolicited data, like streamed frames, must not
+        # interleave
+        self._write_lock = threading.Lock()
+        self.running = True
+
+    def split(self, buf):
+        """Split off all complete requests from 'buf'.
+
+        Returns: (list of requests, remaining incomplete bytes)
+        """
+        *requests, rest = buf.split(self.terminator)
+        return (requests, rest)
+
+    def reply(self, request):
+        """Act upon 'request' and return the reply as bytes, or None when the
+        device does not reply to it.
+        """
+        raise NotImplementedError
+
+    def send(self, data):
+        with self._write_lock:
+            os.write(self._fd_master, data)
+
+    def run(self):
+        buf = b""
+        while self.running:
+            [readable, _, _] = select.select([self._fd_master], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                buf += os.read(self._fd_master, 4096)
+            except OSError:
+                break
+
+            [requests, buf] = self.split(buf)
+            for request in requests:
+                # An unresponsive device does not act upon the request either
+                delay = self.timing.reply_delay()
+                if delay is None:
+                    continue
+                time.sleep(delay)
+                ans = self.reply(request)
+                if ans is not None:
+                    self.send(ans)
+
+    def stop(self):
+        self.running = False
+        self.join(1)
+        for fd in (self._fd_master, self._fd_slave):
+            try: os.close(fd)
+            except OSError: pass
+
+# ------------------------------------------------------------------------------
+#   Arduino emulators
+# ------------------------------------------------------------------------------
+
+class Arduino_emulator(Pty_serial_stand_in):
+    """Emulates the MHT firmware common to both Arduinos: the identity and
+    state queries, the binary state frames and the streaming mode.
+    """
+    identity = ""
+
+    def __init__(self, name, timing):
+        super().__init__(name, timing, terminator=b"\n")
+        self.free_RAM = 24000
+        self.t_prev = time.perf_counter()
+
+        # Binary state frames: the emulated firmware adopts the frame layout
+        # expected by the host, see Simulated_Arduino.negotiate_binary_state()
+        self.state_dtype = None
+        self.frame_version = None
+        self._stream_interval_ms = 0
+        self._streamer = None
+
+    def state_values(self):
+        """Return the state in the order of the ASCII state reply."""
+        raise NotImplementedError
+
+    def command(self, msg):
+        """Act upon a command without reply."""
+        pass
+
+    def _state(self):
+        now = time.perf_counter()
+        self.update(now - self.t_prev)
+        self.t_prev = now
+        return self.state_values()
+
+    def update(self, dt):
+        """Advance the emulated process by 'dt' [s]."""
+        pass
+
+    def _frame(self):
+        payload = np.array(tuple(self._state()), dtype=self.state_dtype)
+        header = Arduino_functions.FRAME_HEADER.pack(self.frame_version,
+                                                     self.state_dtype.itemsize)
+        body = header + payload.tobytes()
+        return (Arduino_functions.FRAME_SYNC + body +
+                Arduino_functions.FRAME_CRC.pack(
+                        Arduino_functions.frame_crc(body)))
+
+    def reply(self, request):
+        msg = request.decode().strip()
+        if msg == "id?":
+            return (self.identity + "\n").encode()
+        elif msg == "proto?":
+            if self.state_dtype is None:
+                return None     # Firmware without binary state frames
+            return ("%i\n" % self.frame_version).encode()
+        elif msg == "?":
+            return ("\t".join("%g" % value for value in self._state()) +
+                    "\n").encode()
+        elif msg == "?b" and self.state_dtype is not None:
+            return self._frame()
+        elif msg.startswith("stream"):
+            self._start_streaming(int(msg[6:]))
+            return None
+
+        self.command(msg)
+        return None
+
+    def _start_streaming(self, interval_ms):
+        self._stream_interval_ms = interval_ms
+        if interval_ms > 0 and self._streamer is None:
+            self._streamer = threading.Thread(target=self._stream,
+                                              name="%s streamer" % self.name,
+                                              daemon=True)
+            self._streamer.start()
+
+    def _stream(self):
+        t_next = time.perf_counter()
+        while self.running and self._stream_interval_ms > 0:
+            t_next += self._stream_interval_ms / 1e3
+            delay = self.timing.reply_delay()
+            if delay is not None:
+                time.sleep(delay)
+                try:
+                    self.send(self._frame())
+                except OSError:
+                    break
+            time.sleep(max(0, t_next - time.perf_counter()))
+        self._streamer = None
+
+class Arduino_1_emulator(Arduino_emulator):
+    """Relays 1 to 8 of the heaters and bubblers, the pump relay 'r9', the
+    pump speed, the flow rate PID control, the over-temperature protection
+    and the differential pressure of the gas volume fraction.
+    """
+    identity = "Arduino_#1"
+
+    def __init__(self, name, timing):
+        super().__init__(name, timing)
+        self.reset()
+
+    def reset(self):
+        self.relays = [False] * 9
+        self.ENA_OTP = True
+        self.ENA_PID_pump = False
+        self.set_pump_speed_mA = 4.0
+        self.setpoint_flow_rate_m3h = 0.0
+        self.read_flow_rate_mA = 4.0
+
+    def update(self, dt):
+        if self.ENA_PID_pump:
+            self.set_pump_speed_mA = 4 + 16 * min(max(
+                    self.setpoint_flow_rate_m3h / C.QMAX_FLOW_METER, 0), 1)
+
+        # First-order response of the flow rate to the pump speed
+        target_mA = self.set_pump_speed_mA if self.relays[8] else 4.0
+        self.read_flow_rate_mA += ((target_mA - self.read_flow_rate_mA) *
+                                   (1 - math.exp(-dt / 2.0)))
+
+    def state_values(self):
+        flow_rate_mA = self.read_flow_rate_mA + random.gauss(0, 0.005)
+        GVF_P_diff_mbar = 0.5 + random.gauss(0, 0.05)
+        GVF_P_diff_mA = 4 + GVF_P_diff_mbar / 100 * 16
+        return ([self.free_RAM, self.ENA_OTP] + self.relays +
+                [round(GVF_P_diff_mA / 20 * 4095), GVF_P_diff_mA,
+                 GVF_P_diff_mbar, self.set_pump_speed_mA,
+                 round(flow_rate_mA / 20 * 4095), flow_rate_mA,
+                 self.ENA_PID_pump, self.setpoint_flow_rate_m3h])
+
+    def command(self, msg):
+        if msg[0] == "r" and msg[1:2].isdigit():
+            self.relays[int(msg[1]) - 1] = msg.endswith("on")
+        elif msg.startswith("sps"):
+            self.set_pump_speed_mA = float(msg[3:])
+        elif msg.startswith("sfr"):
+            self.setpoint_flow_rate_m3h = float(msg[3:])
+        elif msg.startswith("ena_pfr"):
+            self.ENA_PID_pump = msg.endswith("on")
+        elif msg.startswith("ena_otp"):
+            self.ENA_OTP = msg.endswith("on")
+        elif msg == "otp_trip" and self.ENA_OTP:
+            self.relays[0:3] = [False] * 3      # Heaters off
+        elif msg == "soft_reset":
+            self.reset()
+
+class Arduino_2_emulator(Arduino_emulator):
+    """Relays 1 to 8 of the filling system, its proximity and floater switches
+    and its finite state machine, which reports messages.
+    """
+    identity = "Arduino_#2"
+
+    FS_PROGRAMS = ["idle",
+                   "barrel_1_to_tunnel", "barrel_2_to_tunnel",
+                   "tunnel_to_barrel_1", "tunnel_to_barrel_2",
+                   "barrel_1_to_sewer", "barrel_2_to_sewer",
+                   "tunnel_to_sewer"]
+
+    def __init__(self, name, timing):
+        super().__init__(name, timing)
+        self.reset()
+
+    def reset(self):
+        self.relays = [False] * 8
+        self.prox_switches = [True, False, True, False]
+        self.floater_switch = False
+        self.FSM_FS_exec = 0
+        self.FS_msgs = []
+
+    def state_values(self):
+        return ([self.free_RAM] + self.relays + self.prox_switches +
+                [self.floater_switch, self.FSM_FS_exec, len(self.FS_msgs)])
+
+    def reply(self, request):
+        if request.strip() == b"FS_msgs?":
+            [msgs, self.FS_msgs] = [self.FS_msgs, []]
+            return ("\n".join(["%i" % len(msgs)] + msgs + ["FS_msgs_end"]) +
+                    "\n").encode()
+        return super().reply(request)
+
+    def command(self, msg):
+        if msg[0] == "r" and msg[1:2].isdigit():
+            self.relays[int(msg[1]) - 1] = msg.endswith("on")
+        elif msg.startswith("exec_FS_") and msg[8:] in self.FS_PROGRAMS:
+            self.FSM_FS_exec = self.FS_PROGRAMS.index(msg[8:])
+            self.FS_msgs.append("Executing %s" % msg[8:])
+        elif msg == "soft_reset":
+            self.reset()
+
+ARDUINO_EMULATORS = {Arduino_1_emulator.identity: Arduino_1_emulator,
+                     Arduino_2_emulator.identity: Arduino_2_emulator}
+
+# ------------------------------------------------------------------------------
+#   Bronkhorst_MFC_emulator
+# ------------------------------------------------------------------------------
+
+class Bronkhorst_MFC_emulator(Pty_serial_stand_in):
+    """Emulates the ASCII ProPar protocol, as far as used by the Bronkhorst MFC
+    library. The flow rate follows the setpoint with a first-order response.
+    """
+    def __init__(self, name, timing, serial_str, max_flow_rate=1.0):
+        super().__init__(name, timing, terminator=b"\n")
+        self.serial_str = serial_str
+        self.max_flow_rate = max_flow_rate      # [ln/min]
+        self.setpoint = 0                       # [0 - 32000]
+        self.flow_rate = 0.0                    # [0 - 32000]
+        self.t_prev = time.perf_counter()
+
+    @staticmethod
+    def _string_reply(process_param, str_value):
+        """Reply to a string parameter request"""
+        data = process_param + str_value.encode().hex().upper() + "00"
+        return ":%02X%s\r\n" % (len(data) // 2, data)
+
+    def reply(self, request):
+        msg = request.decode().strip().upper()
+        now = time.perf_counter()
+        self.flow_rate += ((self.setpoint - self.flow_rate) *
+                           (1 - math.exp(-(now - self.t_prev) / 0.5)))
+        self.t_prev = now
+
+        if msg == ":0780047163716300":
+            return self._string_reply("8002716300", self.serial_str).encode()
+        elif msg == ":0780047162716200":
+            return self._string_reply("8002716200", "F-201CV-SIM").encode()
+        elif msg == ":078004017101710A":
+            return self._string_reply("800201710A", "Air").encode()
+        elif msg == ":068004014D014D":
+            [bits] = struct.unpack(">I", struct.pack(">f", self.max_flow_rate))
+            return (":0780020D4D%08X\r\n" % bits).encode()
+        elif msg == ":06800401210121":
+            return (":0480020121%04X\r\n" % self.setpoint).encode()
+        elif msg == ":06800401210120":
+            flow_rate = min(max(round(self.flow_rate), 0), 32000)
+            return (":0480020120%04X\r\n" % flow_rate).encode()
+        elif msg.startswith(":0680010121"):
+            self.setpoint = min(max(int(msg[11:15], 16), 0), 32000)
+            return b":0480000005\r\n"
+
+        return b":0480000004\r\n"   # Status: parameter number unknown
+
+# ------------------------------------------------------------------------------
+#   ThermoFlex_chiller_emulator
+# ------------------------------------------------------------------------------
+
+class ThermoFlex_chiller_emulator(Pty_serial_stand_in):
+    """Emulates the binary NC serial protocol of the ThermoFlex chiller. The
+    temperature follows the setpoint with a first-order response while running.
+    """
+    UOM = chiller_functions.Unit_of_measure
+
+    def __init__(self, name, timing):
+        super().__init__(name, timing)
+        self.is_on = True
+        self.setpoint = 20.0    # ['C]
+        self.temp = 22.0        # ['C]
+        self.t_prev = time.perf_counter()
+
+    def split(self, buf):
+        # Frames: 0xCA, 0x00, 0x01, command, N data bytes, data, checksum
+        requests = []
+        while True:
+            i_start = buf.find(0xCA)
+            if i_start < 0:
+                return (requests, b"")
+            buf = buf[i_start:]
+            if len(buf) < 5 or len(buf) < 6 + buf[4]:
+                return (requests, buf)
+            requests.append(buf[:6 + buf[4]])
+            buf = buf[6 + buf[4]:]
+
+    @staticmethod
+    def _frame(command, data):
+        frame = chiller_functions.RS232_START + [command, len(data)] + data
+        frame.append((sum(frame[1:]) % 0x100) ^ 0xFF)
+        return bytes(frame)
+
+    def _value(self, command, value, uom, pom=1):
+        int_value = int(round(value * 10**pom))
+        return self._frame(command, [(pom << 4) + uom] +
+                           list(int_value.to_bytes(2, byteorder='big')))
+
+    def reply(self, request):
+        now = time.perf_counter()
+        target = self.setpoint if self.is_on else 22.0
+        self.temp += ((target - self.temp) *
+                      (1 - math.exp(-(now - self.t_prev) / 30.0)))
+        self.t_prev = now
+
+        command = request[3]
+        if (sum(request[1:-1]) % 0x100) ^ 0xFF != request[-1]:
+            return self._frame(0x0F, [3, command])  # Bad checksum
+
+        if command == 0x00:
+            return self._frame(0x00, [0x00, 0x00])
+        elif command == 0x09:
+            return self._frame(0x09, [int(self.is_on), 0, 0, 0])
+        elif command == 0x81:
+            if request[5] in (0, 1):
+                self.is_on = bool(request[5])
+            return self._frame(0x81, [int(self.is_on)])
+        elif command == 0x07:
+            return self._frame(0x07, list(b"SIMULATED"))
+        elif command in (0x70, 0xF0):
+            if command == 0xF0:
+                self.setpoint = int.from_bytes(request[5:7], 'big') / 10
+            return self._value(command, self.setpoint, self.UOM.deg_C)
+
+        values = {
+            0x20: (self.temp + random.gauss(0, 0.02), self.UOM.deg_C),
+            0x10: (12.0 + random.gauss(0, 0.1), self.UOM.LPM),
+            0x28: (2.5 + random.gauss(0, 0.02), self.UOM.bar),
+            0x29: (0.5 + random.gauss(0, 0.02), self.UOM.bar),
+            0x30: (2.0, self.UOM.LPM),      # Alarm LO flow
+            0x40: (5.0, self.UOM.deg_C),    # Alarm LO temp
+            0x48: (0.1, self.UOM.bar),      # Alarm LO pres
+            0x50: (40.0, self.UOM.LPM),     # Alarm HI flow
+            0x60: (40.0, self.UOM.deg_C),   # Alarm HI temp
+            0x68: (6.0, self.UOM.bar),      # Alarm HI pres
+            0x74: (6.0, self.UOM.no_unit),  # PID P
+            0x75: (0.6, self.UOM.no_unit),  # PID I
+            0x76: (0.0, self.UOM.no_unit)}  # PID D
+        if command in values:
+            return self._value(command, *values[command])
+
+        return self._frame(0x0F, [1, command])      # Bad command
+
+# ------------------------------------------------------------------------------
+#   Compax3_traverse_emulator
+# ------------------------------------------------------------------------------
+
+class Compax3_traverse_emulator(Pty_serial_stand_in):
+    """Emulates the ASCII protocol of the Compax3 servo controller, as far as
+    used by the Compax3 traverse library. The axis moves at constant velocity
+    to the target position of the activated motion profile.
+    """
+    def __init__(self, name, timing, serial_str):
+        super().__init__(name, timing,
+                         terminator=compax3_functions.TERM_CHAR.encode())
+        self.serial_str = serial_str
+        self.profiles = {}      # {profile_number: {object_index: value}}
+        self.control_word = 0
+        self.pos = 0.0          # [mm]
+        self.target_pos = 0.0   # [mm]
+        self.velocity = 0.0     # [mm/s]
+        self.t_prev = time.perf_counter()
+
+    def _move(self):
+        now = time.perf_counter()
+        step = self.velocity * (now - self.t_prev)
+        self.t_prev = now
+        if self.control_word & 1:   # Powered
+            delta = self.target_pos - self.pos
+            self.pos = (self.target_pos if abs(delta) <= step else
+                        self.pos + math.copysign(step, delta))
+
+    def _status_word_1(self):
+        powered = bool(self.control_word & 1)
+        pos_reached = self.pos == self.target_pos
+        return ((1 << 8) +                                  # No error
+                (pos_reached << 9) +
+                ((not powered) << 10) +
+                ((powered and pos_reached) << 11) +         # Standstill
+                (1 << 12))                                  # Zero pos known
+
+    def _write_control_word(self, CW):
+        start = (CW & (1 << 13)) and not (self.control_word & (1 << 13))
+        self.control_word = CW
+        if not (CW & 1) or (CW & 0b1100):
+            # Powerless or jogging, which is not emulated: stand still
+            self.target_pos = self.pos
+        elif start:
+            profile = self.profiles.get((CW >> 8) & 0b111, {})
+            self.target_pos = profile.get(1901, self.pos)
+            self.velocity = profile.get(1902, 10.0)
+
+    def reply(self, request):
+        msg = request.decode().strip()
+        self._move()
+
+        if msg == "_?":
+            return b"Compax3 simulated\r"
+        elif msg == "o1.4":
+            return ("%s\r" % self.serial_str).encode()
+        elif msg == "o680.5":
+            return ("%.2f\r" % self.pos).encode()
+        elif msg == "o550.1":
+            return b"1\r"
+        elif msg == "o1000.3":
+            return ("%i\r" % self._status_word_1()).encode()
+        elif msg.startswith("o1100.3="):
+            self._write_control_word(int(msg[8:]))
+            return b">\r"
+        elif msg.startswith("o19") and "=" in msg:
+            [obj, value] = msg[1:].split("=")
+            [index, profile_number] = map(int, obj.split("."))
+            if not value.startswith("$"):
+                self.profiles.setdefault(profile_number, {})[index] = (
+                        float(value))
+            return b">\r"
+
+        return b"!0004\r"   # Unknown object
+
+# ------------------------------------------------------------------------------
+#   PT104_emulator
+# ------------------------------------------------------------------------------
+
+class PT104_emulator(threading.Thread):
+    """Local UDP server emulating the PT-104. Once converting, it sends a
+    conversion packet of the next enabled channel every 'conversion_ms' to the
+    host that started the conversion.
+    """
+    CALIB = 1000000     # Calibration constant of all channels
+
+    def __init__(self, name, timing, conversion_ms=720):
+        super().__init__(name="%s emulator" % name, daemon=True)
+        self.timing = timing
+        self.conversion_ms = conversion_ms
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self.address = self._sock.getsockname()
+
+        self.host = None
+        self.ENA_channels = []
+        self.i_channel = 0
+        self.running = True
+
+    def _eeprom(self):
+        eeprom = bytearray(128)
+        eeprom[19:29] = b"SIM0000001"
+        eeprom[29:37] = b"17102026"
+        for ch in range(4):
+            eeprom[37 + 4*ch:41 + 4*ch] = self.CALIB.to_bytes(4, 'little')
+        return b"Eeprom=" + bytes(eeprom)
+
+    def _conversion_packet(self, ch):
+        T = 20 + ch + 0.5 * math.sin(time.time() / 60) + random.gauss(0, 0.002)
+        R_T = pt104_functions.ITS90_degC_to_Ohm(100, T)
+        # R_T = CALIB * (a_3 - a_2) / (a_1 - a_0) / 1e6
+        readings = [0, 1000000, 0, round(R_T * 1e12 / self.CALIB)]
+        packet = bytes([(ch - 1) * 4])
+        for (i, reading) in enumerate(readings):
+            if i > 0:
+                packet += bytes([i])
+            packet += reading.to_bytes(4, byteorder='big')
+        return packet
+
+    def reply(self, msg):
+        if msg == b"lock\r":
+            return b"Lock Success"
+        elif msg[0] == 0x30:
+            return b"Mains Changed"
+        elif msg[0] == 0x34:
+            return b"Alive"
+        elif msg[0] == 0x32:
+            return self._eeprom()
+        elif msg[0] == 0x31:
+            self.ENA_channels = [ch + 1 for ch in range(4)
+                                 if msg[1] & (1 << ch)]
+            return b"Converting"
+        return None
+
+    def run(self):
+        t_next = time.perf_counter() + self.conversion_ms / 1e3
+        while self.running:
+            timeout = max(0, t_next - time.perf_counter())
+            [readable, _, _] = select.select([self._sock], [], [], timeout)
+            if readable:
+                try:
+                    [msg, host] = self._sock.recvfrom(4096)
+                except OSError:
+                    break
+                delay = self.timing.reply_delay()
+                if delay is None or len(msg) == 0:
+                    continue
+                time.sleep(delay)
+                ans = self.reply(msg)
+                if ans is not None:
+                    self.host = host
+                    self._sock.sendto(ans, host)
+                continue
+
+            t_next += self.conversion_ms / 1e3
+            if self.host is not None and self.ENA_channels:
+                self.i_channel = (self.i_channel + 1) % len(self.ENA_channels)
+                self._sock.sendto(self._conversion_packet(
+                        self.ENA_channels[self.i_channel]), self.host)
+
+    def stop(self):
+        self.running = False
+        self.join(1)
+        self._sock.close()
+
+# ------------------------------------------------------------------------------
+#   SCPI instrument emulators
+# ------------------------------------------------------------------------------
+
+class SCPI_emulator():
+    """Splits compound SCPI messages, like 'abor;*rst;*cls', and keeps the
+    error queue. Subclasses implement the device in 'handle()'.
+    """
+    STR_NO_ERROR = ""
+
+    def __init__(self):
+        self.errors = []
+
+    def handle(self, header, arg):
+        """Act upon a single lower-case SCPI 'header' with argument string
+        'arg'. Returns the reply string of a query, None otherwise. Raises
+        KeyError for an unknown header.
+        """
+        raise NotImplementedError
+
+    def message(self, msg_str):
+        """Returns the replies to the queries in 'msg_str' joined by ';', or
+        None when there are none.
+        """
+        replies = []
+        for part in msg_str.split(";"):
+            [header, _, arg] = part.strip().lstrip(":").partition(" ")
+            try:
+                ans = self.handle(header.lower(), arg.strip())
+            except (KeyError, ValueError):
+                self.errors.append('-113,"Undefined header"')
+                continue
+            if ans is not None:
+                replies.append(ans)
+        return ";".join(replies) if replies else None
+
+    def pop_error(self):
+        return self.errors.pop(0) if self.errors else self.STR_NO_ERROR
+
+class N8700_PSU_emulator(SCPI_emulator):
+    """Keysight N8700 series PSU driving a resistive heater of 'load_Ohm'. The
+    output runs in constant voltage, or constant current when the current
+    limit is reached.
+    """
+    STR_NO_ERROR = "ERR 0"
+
+    def __init__(self, serial_str, load_Ohm=20.0):
+        super().__init__()
+        self.idn = "Agilent Technologies,N8741A,%s,D.01.08" % serial_str
+        self.load_Ohm = load_Ohm
+        self.reset()
+
+    def reset(self):
+        self.V_source = 0.0
+        self.I_source = 0.0
+        self.OVP_level = 330.0
+        self.ENA_OCP = False
+        self.ENA_output = False
+
+    def _output(self):
+        """Returns (V, I, constant current mode?) at the output"""
+        if not self.ENA_output:
+            return (0.0, 0.0, False)
+        if self.V_source / self.load_Ohm > self.I_source:
+            return (self.I_source * self.load_Ohm, self.I_source, True)
+        return (self.V_source, self.V_source / self.load_Ohm, False)
+
+    def handle(self, header, arg):
+        if header in ("*opc", "*ese", "*cls", "outp:pon:stat",
+                      "outp:prot:cle"):
+            return None
+        elif header == "*rst":
+            self.reset()
+            return None
+
+        queries = {"*idn?": lambda: self.idn,
+                   "*opc?": lambda: "1",
+                   "*esr?": lambda: "1",
+                   "err?": self.pop_error,
+                   "stat:ques:cond?": lambda: "0",
+                   "stat:oper:cond?": lambda: "%i" % (
+                       (1024 if self._output()[2] else 256)
+                       if self.ENA_output else 0),
+                   "sour:curr:prot:stat?": lambda: "%i" % self.ENA_OCP,
+                   "sour:volt:prot:lev?": lambda: "%.3f" % self.OVP_level,
+                   "outp?": lambda: "%i" % self.ENA_output,
+                   "sour:curr?": lambda: "%.5f" % self.I_source,
+                   "sour:volt?": lambda: "%.5f" % self.V_source,
+                   "meas:curr?": lambda: "%.5f" % (
+                       self._output()[1] * (1 + random.gauss(0, 1e-4))),
+                   "meas:volt?": lambda: "%.5f" % (
+                       self._output()[0] * (1 + random.gauss(0, 1e-4)))}
+        if header in queries:
+            return queries[header]()
+
+        if header == "sour:curr:prot:stat":
+            self.ENA_OCP = (arg.lower() in ("on", "1"))
+        elif header == "sour:volt:prot:lev":
+            self.OVP_level = float(arg)
+        elif header == "outp":
+            self.ENA_output = (arg.lower() in ("on", "1"))
+        elif header == "sour:curr":
+            self.I_source = float(arg)
+        elif header == "sour:volt":
+            self.V_source = float(arg)
+        else:
+            raise KeyError(header)
+        return None
+
+def _parse_channel_list(arg):
+    """'(@301:303,305)' -> [301, 302, 303, 305]"""
+    channels = []
+    arg = arg[arg.find("@") + 1:arg.rfind(")")]
+    for item in filter(None, arg.split(",")):
+        [first, _, last] = item.partition(":")
+        channels.extend(range(int(first), int(last or first) + 1))
+    return channels
+
+class K3497xA_emulator(SCPI_emulator):
+    """Keysight 3497xA data acquisition unit with 34901A multiplexer modules.
+    Thermocouple channels read around room temperature, resistance channels
+    read thermistors of around 10 kOhm. A scan takes 'channel_ms' per channel,
+    during which '*opc?' blocks.
+    """
+    STR_NO_ERROR = '+0,"No error"'
+
+    def __init__(self, idn, channel_ms=20):
+        super().__init__()
+        self.idn = idn
+        self.channel_ms = channel_ms
+        self.reset()
+
+    def reset(self):
+        self.scan_list = []
+        self.functions = {}     # {channel: 'temp' or 'res'}
+        self.readings = []
+        self.t_scan_done = 0
+
+    def _scan(self):
+        self.readings = []
+        for ch in self.scan_list:
+            if self.functions.get(ch) == "temp":
+                self.readings.append(22 + ch % 100 * 0.1 +
+                                     random.gauss(0, 0.05))
+            else:
+                self.readings.append(1e4 * (1 + random.gauss(0, 1e-4)))
+        self.t_scan_done = (time.perf_counter() +
+                            len(self.scan_list) * self.channel_ms / 1e3)
+
+    def handle(self, header, arg):
+        if header == "*opc?":
+            time.sleep(max(0, self.t_scan_done - time.perf_counter()))
+            return "1"
+        elif header == "*rst":
+            self.reset()
+        elif header in ("abor", "*cls", "*opc", "*ese", "rout:open",
+                        "disp:text") or header.startswith(("unit:", "sens:")):
+            pass
+        elif header.startswith("conf:"):
+            for ch in _parse_channel_list(arg):
+                self.functions[ch] = header[5:]
+        elif header == "rout:scan":
+            self.scan_list = _parse_channel_list(arg)
+        elif header == "init":
+            self._scan()
+        else:
+            queries = {"*idn?": lambda: self.idn,
+                       "*esr?": lambda: "+1",
+                       "syst:err?": self.pop_error,
+                       "diag:dmm:cycl?": lambda: "+1234,+567,+89",
+                       "syst:ctyp?": lambda: "HEWLETT-PACKARD,34901A,0,1.0",
+                       "diag:peek:slot:data?": lambda: '"SIM%s"' % arg,
+                       "diag:rel:cycl?": lambda: ",".join(
+                           "+%i" % (1000 + ch) for ch in
+                           _parse_channel_list(arg)),
+                       "rout:scan?": lambda: "(@%s)" % ",".join(
+                           "%i" % ch for ch in self.scan_list),
+                       "fetc?": lambda: ",".join(
+                           "%+.8E" % value for value in self.readings)}
+            return queries[header]()
+        return None
+
+# ------------------------------------------------------------------------------
+#   Simulated_resource_manager
+# ------------------------------------------------------------------------------
+
+class Simulated_instrument():
+    """Stand-in for a message based pyvisa resource, answering by a SCPI
+    emulator after the delay decided by 'timing'. A lost reply raises a
+    timeout VisaIOError, after waiting for the timeout of the resource.
+    """
+    def __init__(self, emulator, timing, timeout=2000):
+        self.emulator = emulator
+        self.timing = timing
+        self.timeout = timeout          # [ms]
+        self.write_termination = "\n"
+        self.read_termination = "\n"
+        self.stb = 0b100000             # Operation complete
+        self._reply = None
+
+    def write(self, msg_str):
+        self._reply = self.emulator.message(msg_str)
+        return len(msg_str)
+
+    def read(self):
+        delay = self.timing.reply_delay()
+        if delay is None or self._reply is None:
+            time.sleep(self.timeout / 1e3)
+            raise visa.VisaIOError(visa.constants.VI_ERROR_TMO)
+
+        time.sleep(delay)
+        [ans, self._reply] = [self._reply, None]
+        return ans + self.read_termination
+
+    def query(self, msg_str):
+        self.write(msg_str)
+        return self.read()
+
+    def query_ascii_values(self, msg_str, separator=","):
+        return [float(value) for value in
+                self.query(msg_str).strip().split(separator)]
+
+    def clear(self):
+        self._reply = None
+
+    def close(self):
+        pass
+
+class Simulated_resource_manager():
+    """Stand-in for 'visa.ResourceManager'. 'instruments' maps VISA addresses
+    to functions returning a new SCPI emulator. Defaults to the PSUs and
+    multiplexers of MHT_tunnel_constants. Opening any other address raises
+    VisaIOError, like a resource that is not found.
+    """
+    def __init__(self, instruments=None, timing=None):
+        if instruments is None:
+            instruments = {
+                C.VISA_ADDRESS_PSU_1: lambda: N8700_PSU_emulator("US15M3727P"),
+                C.VISA_ADDRESS_PSU_2: lambda: N8700_PSU_emulator("US15M3728P"),
+                C.VISA_ADDRESS_PSU_3: lambda: N8700_PSU_emulator("US15M3726P"),
+                C.MUX_1_VISA_ADDRESS: lambda: K3497xA_emulator(
+                        "Agilent Technologies,34972A,MY49018071,1.16"),
+                C.MUX_2_VISA_ADDRESS: lambda: K3497xA_emulator(
+                        "HEWLETT-PACKARD,34970A,0,13-2-2")}
+        self.instruments = instruments
+        self.timing = timing
+        self.resources = []
+
+    def open_resource(self, visa_address, timeout=2000):
+        if visa_address not in self.instruments:
+            raise visa.VisaIOError(visa.constants.VI_ERROR_RSRC_NFOUND)
+
+        emulator = self.instruments[visa_address]()
+        defaults = (TIMING_PSU if isinstance(emulator, N8700_PSU_emulator)
+                    else TIMING_MUX)
+        resource = Simulated_instrument(emulator,
+                                        _get_timing(self.timing, defaults),
+                                        timeout)
+        self.resources.append(resource)
+        return resource
+
+    def close(self):
+        for resource in self.resources:
+            resource.close()
+
+# ------------------------------------------------------------------------------
+#   Simulated devices
+# ------------------------------------------------------------------------------
+
+class Simulated_Arduino(Arduino_functions.Arduino):
+    def __init__(self, name="Ard", baudrate=9600, timing=None, **kwargs):
+        super().__init__(name=name, baudrate=baudrate, **kwargs)
+        self.timing = _get_timing(timing, TIMING_ARDUINO)
+        self.emulator = None
+
+    def auto_connect(self, path_config, match_identity=None):
+        """Connect to a new emulator of the Arduino with identity
+        'match_identity', Arduino #1 by default.
+        """
+        emulator_class = ARDUINO_EMULATORS.get(match_identity,
+                                               Arduino_1_emulator)
+        self.emulator = emulator_class(self.name, self.timing)
+        self.emulator.start()
+        return self.connect_at_port(self.emulator.port, match_identity)
+
+    def negotiate_binary_state(self, dtype, version, negotiate_timeout=0.2):
+        # The emulated firmware adopts the frame layout expected by the host
+        if self.emulator is not None:
+            self.emulator.state_dtype = np.dtype(dtype)
+            self.emulator.frame_version = version
+        return super().negotiate_binary_state(dtype, version,
+                                              negotiate_timeout)
+
+    def close(self):
+        super().close()
+        if self.emulator is not None:
+            self.emulator.stop()
+            self.emulator = None
+
+class Simulated_Bronkhorst_MFC(mfc_functions.Bronkhorst_MFC):
+    def __init__(self, name="MFC", timing=None):
+        super().__init__(name=name)
+        self.timing = _get_timing(timing, TIMING_MFC)
+        self.emulator = None
+
+    def auto_connect(self, path_config, match_serial_str=None):
+        self.emulator = Bronkhorst_MFC_emulator(
+                self.name, self.timing, match_serial_str or "M00000000A")
+        self.emulator.start()
+        return self.connect_at_port(self.emulator.port, match_serial_str)
+
+    def close(self):
+        super().close()
+        if self.emulator is not None:
+            self.emulator.stop()
+            self.emulator = None
+
+class Simulated_ThermoFlex_chiller(chiller_functions.ThermoFlex_chiller):
+    def __init__(self, min_setpoint_degC=10, max_setpoint_degC=40,
+                 name="chiller", timing=None):
+        super().__init__(min_setpoint_degC=min_setpoint_degC,
+                         max_setpoint_degC=max_setpoint_degC, name=name)
+        self.timing = _get_timing(timing, TIMING_CHILLER)
+        self.emulator = None
+
+    def auto_connect(self, path_config):
+        self.emulator = ThermoFlex_chiller_emulator(self.name, self.timing)
+        self.emulator.start()
+        return self.connect_at_port(self.emulator.port)
+
+    def close(self):
+        super().close()
+        if self.emulator is not None:
+            self.emulator.stop()
+            self.emulator = None
+
+class Simulated_Compax3_traverse(compax3_functions.Compax3_traverse):
+    def __init__(self, name="trav", timing=None):
+        super().__init__(name=name)
+        self.timing = _get_timing(timing, TIMING_COMPAX3)
+        self.emulator = None
+
+    def auto_connect(self, path_config, match_serial_str=None):
+        self.emulator = Compax3_traverse_emulator(
+                self.name, self.timing, match_serial_str or "0000000001")
+        self.emulator.start()
+        return self.connect_at_port(self.emulator.port, match_serial_str)
+
+    def close(self):
+        super().close()
+        if self.emulator is not None:
+            self.emulator.stop()
+            self.emulator = None
+
+class Simulated_PT104(pt104_functions.PT104):
+    def __init__(self, name="PT104", timing=None):
+        super().__init__(name=name)
+        self.timing = _get_timing(timing, TIMING_PT104)
+        self.emulator = None
+
+    def connect(self, ip_address="10.10.100.2", port=1234):
+        """Connect to a new local emulator of the PT-104 instead"""
+        self.emulator = PT104_emulator(self.name, self.timing)
+        self.emulator.start()
+        return super().connect(*self.emulator.address)
+
+    def close(self):
+        super().close()
+        if self.emulator is not None:
+            self.emulator.stop()
+            self.emulator = None
+
+# ------------------------------------------------------------------------------
+#   GUI_latency_probe
+# ------------------------------------------------------------------------------
+
+class GUI_latency_probe():
+    """To be called from within the GUI update of the Arduinos by 'add()',
+    passing the time stamp of the DAQ update being shown. Collects the
+    intervals between the DAQ updates reaching the GUI and their latency, i.e.
+    the time between the DAQ update and the GUI update. To be created in the
+    main/GUI thread, whose CPU time gets reported as well.
+    """
+    def __init__(self):
+        self.t_start = time.perf_counter()
+        self.t_start_CPU = time.thread_time()
+        self.t_DAQ_ms = []
+        self.latencies_ms = []
+
+    def add(self, t_DAQ_ms):
+        if self.t_DAQ_ms and t_DAQ_ms == self.t_DAQ_ms[-1]:
+            return      # Same DAQ update shown again
+        self.t_DAQ_ms.append(t_DAQ_ms)
+        self.latencies_ms.append(time.time() * 1e3 - t_DAQ_ms)
+
+    def report(self, devices_pyqt=()):
+        """Print the GUI refresh rate and the GUI latency of the Arduinos.
+        Also print the mean DAQ rate since the creation of this probe, the
+        number of lost replies, the duration of the DAQ updates and the missed
+        deadlines, if any, of each device in the list 'devices_pyqt' of
+        Dev_Base_pyqt instances.
+        """
+        def percentiles(values):
+            return ("p50 %7.1f   p95 %7.1f   p99 %7.1f   max %7.1f" %
+                    tuple(np.percentile(values, [50, 95, 99, 100])))
+
+        duration = time.perf_counter() - self.t_start
+        print("\nHeadless run report, %.1f s" % duration)
+        print("  GUI thread CPU: %.1f %%" %
+              ((time.thread_time() - self.t_start_CPU) / duration * 100))
+        if len(self.t_DAQ_ms) > 1:
+            intervals_ms = np.diff(self.t_DAQ_ms)
+            print("  Arduinos: %i GUI refreshes, %.2f Hz" %
+                  (len(self.t_DAQ_ms),
+                   1e3 / np.mean(intervals_ms)))
+            print("  Refresh interval [ms]: " + percentiles(intervals_ms))
+            print("  GUI latency  [ms]: " + percentiles(self.latencies_ms))
+        else:
+            print("  Arduinos: no DAQ updates reached the GUI")
+
+        for dev_pyqt in devices_pyqt:
+            timing = getattr(dev_pyqt.dev, "timing", None)
+            if timing is None:
+                timing = getattr(getattr(dev_pyqt.dev, "device", None),
+                                 "timing", None)
+            print("  %-10s: %6i DAQ updates, %6.2f Hz, %4i lost replies" %
+                  (dev_pyqt.dev.name, dev_pyqt.DAQ_update_counter,
+                   dev_pyqt.DAQ_update_counter / duration,
+                   timing.N_lost if timing is not None else 0))
+
+            # Duration of the DAQ updates, see DvG_dev_Base__pyqt_lib
+            update = dev_pyqt.profiler.stats().get("update")
+            if update is not None and update.N > 0:
+                print("  %-10s  DAQ update [ms]: p50 %7.1f   p99 %7.1f   "
+                      "max %7.1f" %
+                      ("", update.p50_ms, update.p99_ms, update.max_ms))
+
+            # Deadline misses, see DvG_dev_Base__pyqt_lib.Deadline_scheduler
+            deadline = getattr(dev_pyqt.worker_DAQ, "deadline", None)
+            if deadline is not None:
+                print("  %-10s  deadlines: %i overruns, %i skipped, max "
+                      "lateness %.1f ms" %
+                      ("", deadline.N_overruns, deadline.N_skipped,
+                       deadline.max_lateness_ms))
+
+            # Streamed state frames that were never read, see
+            # DvG_dev_Arduino__fun_serial
+            for ard in (getattr(dev_pyqt, "ard1", None),
+                        getattr(dev_pyqt, "ard2", None)):
+                if ard is not None and ard.is_streaming:
+                    print("  %-10s  %s: %i frames superseded" %
+                          ("", ard.name, ard.N_frames_superseded))
+        print("")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MHT_IO_trace_summary.py
+
+Summarize the latency distribution per device command of an I/O trace file as
+recorded by 'DvG_IO_tracer', e.g. by running
+    MHT_tunnel_control_v1p3.py --trace-io IO_trace.bin
+
+Per device, method and command are reported: the number of transactions, the
+number of failed ones, and the mean, 50th, 95th, 99th percentile and maximum
+latency. The table is sorted on the summed latency, so the commands eating
+most of the time budget come first.
+
+Reads like 'read_state' and 'read_reply' are listed under the command they
+read the reply of, e.g. 'read_state ?b' next to 'write ?b'. Their latency is
+the wait for the reply, i.e. where the serial round-trip shows up.
+
+Setpoints are grouped together by replacing numbers following a space, '=' or
+',' by '#', e.g. 'sour:volt 12.00' becomes 'sour:volt #'. Commands of the
+Bronkhorst ASCII protocol, starting with ':', are hex digits throughout and are
+left as is. Binary commands are grouped on their first 4 bytes.
+
+    usage: MHT_IO_trace_summary.py file [-d DEVICE] [-s N] [--raw]
+        file          : I/O trace file
+        -d, --device  : only show the transactions of this device
+        -s, --slowest : also list the N slowest transactions
+        --raw         : do not group the commands
+
+Dennis van Gils
+17-10-2026
+"""
+
+import re
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from DvG_IO_tracer import read_trace
+
+OUTCOMES = ("OK", "FAILED", "EXCEPTION")
+
+RE_SETPOINT = re.compile(r"(?<=[ =,])[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?")
+
+def group_command(command):
+    if command.startswith("0x"):
+        return command[:10] + ("..." if len(command) > 10 else "")
+    if command.startswith(":"):
+        return command
+    return RE_SETPOINT.sub("#", command)
+
+# ------------------------------------------------------------------------------
+#   summarize
+# ------------------------------------------------------------------------------
+
+def summarize(records, raw=False):
+    """Returns a list of rows (device, method, command, N, N_failed, mean, p50,
+    p95, p99, max, sum) with the latencies in ms, sorted on the summed latency.
+    """
+    groups = dict()     # Record indices by (device, method, command)
+    for (i, (rec_dev, rec_method, rec_cmd)) in enumerate(
+            zip(records['device'], records['method'], records['command'])):
+        command = rec_cmd.decode().strip()
+        key = (rec_dev.decode(), rec_method.decode(),
+               command if raw else group_command(command))
+        groups.setdefault(key, []).append(i)
+
+    rows = []
+    for (key, idx) in groups.items():
+        latency = records['latency_ms'][idx].astype(np.float64)
+        [p50, p95, p99] = np.percentile(latency, (50, 95, 99))
+        rows.append((*key, latency.size,
+                     np.count_nonzero(records['outcome'][idx]),
+                     latency.mean(), p50, p95, p99, latency.max(),
+                     latency.sum()))
+
+    rows.sort(key=lambda row: row[-1], reverse=True)
+    return rows
+
+# ------------------------------------------------------------------------------
+#   Main
+# ------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Summarize the latencies of an I/O trace file.")
+    parser.add_argument("file")
+    parser.add_argument("-d", "--device")
+    parser.add_argument("-s", "--slowest", type=int, default=0)
+    parser.add_argument("--raw", action="store_true")
+    args = parser.parse_args()
+
+    records = read_trace(args.file)
+    if args.device is not None:
+        records = records[records['device'] == args.device.encode()]
+    if records.size == 0:
+        print("No transactions found.")
+        sys.exit(0)
+
+    t_span = records['time'][-1] - records['time'][0]
+    print("%i transactions from %s, spanning %.1f s\n" %
+          (records.size, datetime.fromtimestamp(records['time'][0])
+           .strftime("%d-%m-%Y %H:%M:%S"), t_span))
+
+    print("%-12s %-11s %-24s %7s %6s %8s %8s %8s %8s %8s" %
+          ("device", "method", "command", "N", "failed", "mean", "p50", "p95",
+           "p99", "max"))
+    print("%-12s %-11s %-24s %7s %6s %8s %8s %8s %8s %8s" %
+          ("", "", "", "", "", "[ms]", "[ms]", "[ms]", "[ms]", "[ms]"))
+    for row in summarize(records, args.raw):
+        print("%-12s %-11s %-24s %7i %6i %8.2f %8.2f %8.2f %8.2f %8.2f" %
+              row[:-1])
+
+    if args.slowest > 0:
+        print("\nSlowest %i transactions:" % args.slowest)
+        idx = np.argsort(records['latency_ms'])[::-1][:args.slowest]
+        for rec in records[np.sort(idx)]:
+            print("%s  %8.2f ms  %-9s  %-12s %-11s %s" %
+                  (datetime.fromtimestamp(rec['time'])
+                   .strftime("%H:%M:%S.%f")[:-3], rec['latency_ms'],
+                   OUTCOMES[rec['outcome']], rec['device'].decode(),
+                   rec['method'].decode(), rec['command'].decode().strip()))
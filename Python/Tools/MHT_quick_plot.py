@@ -59,7 +59,7 @@ def MHT_quick_plot(mht, filename):
     mpl.rcParams['grid.color'] = "0.25"
 
     fig1 = plt.figure(figsize=(16, 10), dpi=90)
-    fig1.canvas.set_window_title("%s" % mht.filename)
+    fig1.canvas.manager.set_window_title("%s" % mht.filename)
 
     ax1 = fig1.add_subplot(3, 2, 1)
     ax4 = fig1.add_subplot(3, 2, 2, sharex=ax1)
@@ -118,7 +118,7 @@ def MHT_quick_plot(mht, filename):
     #   Chiller temperatures
     # -------------------------------------------------------------
 
-    ax3.plot(t, mht.T_chill_setp, '-', color=cm[4], lineWidth=4,
+    ax3.plot(t, mht.T_chill_setp, '-', color=cm[4], linewidth=4,
              label="setp.")
     ax3.plot(t, mht.T_chill, color=cm[2], label="chiller")
 
@@ -221,8 +221,8 @@ def MHT_quick_plot(mht, filename):
     img_format = "png"
     parts = os.path.splitext(filename)
     fn_save = "%s.%s" % (parts[0], img_format)
-    plt.savefig(fn_save, dpi=90, orientation='portrait', papertype='A4',
-                format=img_format, transparent=False, frameon=False)
+    plt.savefig(fn_save, dpi=90, orientation='portrait',
+                format=img_format, transparent=False)
     print("Saved image: %s" % fn_save)
 
 # ------------------------------------------------------------------------------
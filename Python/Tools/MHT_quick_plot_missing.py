@@ -8,35 +8,124 @@ Plot timeseries of recorded run for quick inspection and saves image to disk.
 Will scan all data textfiles in the current folder and only those that are
 missing a plot figure will be processed.
 
+Batch mode:
+    The files are spread over a pool of worker processes, each plotting with
+    the non-interactive Agg backend, and the time spent per file is reported.
+    Regenerating all plots of a campaign after a plotting tweak hence scales
+    with the number of cores.
+
+    usage: MHT_quick_plot_missing.py [folder] [-r] [-j JOBS] [-a]
+        folder        : folder to scan, defaults to the current folder
+        -r, --recursive: also scan all subfolders
+        -j, --jobs    : number of worker processes, defaults to the number of
+                        cores. 1 processes the files one by one.
+        -a, --all     : also replot files that already have a plot figure
+
 Dennis van Gils
-29-06-2018
+16-10-2026
 """
 
 import os
 import re
+import sys
+import time
+import argparse
+import concurrent.futures
+from pathlib import Path
+
+# Must be selected before pyplot gets imported by MHT_quick_plot
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
 
 import MHT_read_file
 import MHT_quick_plot
 
+# Look for files matching: ######_###### [+any extra chars] .txt
+FILENAME_PATTERN = re.compile(r'\d{6}_\d{6}(.*?)\.(txt|TXT)$')
+
+def find_missing(folder, recursive=False, replot_all=False):
+    """Returns a sorted list of the data textfiles in `folder` that are
+    missing a plot figure, or all of them when `replot_all` is True.
+    """
+    file_list = (Path(folder).rglob("*") if recursive else
+                 Path(folder).iterdir())
+    file_list = [f for f in file_list
+                 if f.is_file() and FILENAME_PATTERN.match(f.name)]
+
+    if not replot_all:
+        # Check if the same filename exists ending with .png
+        file_list = [f for f in file_list
+                     if not f.with_suffix(".png").is_file()]
+
+    return sorted(file_list)
+
+def process_file(filepath):
+    """Reads in and plots a single data file. Runs inside a worker process.
+
+    Returns: tuple (filepath, elapsed time [s], error message or None)
+    """
+    t0 = time.perf_counter()
+    try:
+        # Each log is read once only, a disk cache would just take up space
+        mht = MHT_read_file.MHT_read_file(filepath, cache_dir=None)
+        MHT_quick_plot.MHT_quick_plot(mht, str(filepath))
+    except Exception as err:
+        return (filepath, time.perf_counter() - t0, repr(err))
+    finally:
+        plt.close('all')
+
+    return (filepath, time.perf_counter() - t0, None)
+
 # ------------------------------------------------------------------------------
 #   Main
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    my_path = os.getcwd()
-    file_list = ([f for f in os.listdir(my_path)
-                 if os.path.isfile(os.path.join(my_path, f))])
-
-    for filename in file_list:
-        # Look for files matching: ######_###### [+any extra chars] .txt
-        p = re.compile('\d{6}_\d{6}(.*?)\.(txt|TXT)$')
-        if p.match(filename):
-            # Found a matching file
-            # Now check if the same filename exists ending with .png
-            filename_png = filename[0:-4] + ".png"
-
-            if not os.path.isfile(filename_png):
-                # Figure does not yet exists. Create.
-                print("Reading file: %s" % filename)
-                mht = MHT_read_file.MHT_read_file(filename)
-                MHT_quick_plot.MHT_quick_plot(mht, filename)
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Plot all data files that are missing a plot figure.")
+    parser.add_argument("folder", nargs="?", default=os.getcwd())
+    parser.add_argument("-r", "--recursive", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("-a", "--all", action="store_true")
+    args = parser.parse_args()
+
+    file_list = find_missing(args.folder, args.recursive, args.all)
+    N_files = len(file_list)
+    if N_files == 0:
+        print("No files to process.")
+        sys.exit(0)
+
+    N_jobs = max(1, min(args.jobs, N_files))
+    print("Processing %i files using %i process(es)\n" % (N_files, N_jobs))
+
+    t0 = time.perf_counter()
+    if N_jobs == 1:
+        results = map(process_file, file_list)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=N_jobs)
+        futures = [executor.submit(process_file, f) for f in file_list]
+        results = (future.result() for future in
+                   concurrent.futures.as_completed(futures))
+
+    t_sum = 0
+    failed = []
+    for (i_file, [filepath, t_elapsed, error]) in enumerate(results):
+        t_sum += t_elapsed
+        print("[%*i/%i] %7.2f s  %s" % (len(str(N_files)), i_file + 1,
+                                        N_files, t_elapsed, filepath))
+        if error is not None:
+            print("    FAILED: %s" % error)
+            failed.append(filepath)
+
+    if executor is not None:
+        executor.shutdown()
+
+    t_wall = time.perf_counter() - t0
+    print("\nDone in %.2f s wall time, %.2f s summed over files (%.1fx)" %
+          (t_wall, t_sum, t_sum / t_wall if t_wall > 0 else 1))
+    if failed:
+        print("%i file(s) failed:" % len(failed))
+        for filepath in failed:
+            print("  %s" % filepath)
@@ -5,57 +5,358 @@ MHT_read_file
 Reads in a log file acquired with the Python MHT Tunnel Control program.
 A 2nd order Butterworth low-pass filter with a cut-off frequency of 0.1 Hz and
 zero-phase distortion will be applied to all sensor timeseries. Validated.
+The cut-off frequency and the filtered timeseries can be changed, see
+`MHT_read_file()`. The filter `low_pass_filter()` bridges gaps of NaN.
+
+The timeseries are loaded and filtered on first access only. Optionally, they
+are cached on disk to make reopening the same log instantaneous, see class
+`MHT`. The disk cache is opt-in, as it takes up more space than the log itself
+and is never cleaned up: Pass e.g. `cache_dir=CACHE_DIR`.
+
+Both the tab-separated text log (*.txt) and the binary log (*.bin) that is
+written alongside it can be read. The binary log is memory-mapped instead of
+parsed, which is orders of magnitude faster for long runs. See
+`DvG_pyqt_FileLogger` for its layout. The text log is read in a single pass
+and parsed by `np.loadtxt` with an explicit dtype, see
+`MHT_read_file__benchmark.py`.
+
+The `wall_time` column is returned as seconds since midnight. The names of
+the columns are taken from the log itself, i.e. from the names header of the
+text log or from the stored dtype of the binary log, and are available in
+`mht.names`. The unit of each column, as declared by the log schema of the
+control program, is available in `mht.units`.
 
 Dennis van Gils
 11-10-2018
 """
 
+import os
+import io
+import json
+import struct
+import hashlib
+
 import numpy as np
 from scipy import signal
 from pathlib import Path
 
+# Must match `DvG_pyqt_FileLogger`
+BINARY_LOG_SUFFIX = ".bin"
+BINARY_LOG_MAGIC = b"DvGLOG\x01\n"
+
+# Default low-pass cut-off frequency [Hz]
+F3DB_LP = 0.1
+
+# Timeseries that get low-pass filtered by default. The ones missing from a
+# log, e.g. T_ambient in older logs, are returned as all NaN.
+FILTERED_CHANNELS = (["Q_tunnel", "Q_bubbles", "Pdiff_GVF"] +
+                     ["T_TC_%02i" % i for i in range(1, 13)] +
+                     ["T_ambient", "T_inlet", "T_outlet", "T_chill",
+                      "P_PSU_1", "P_PSU_2", "P_PSU_3"])
+
+# Suggested folder of the opt-in disk cache of parsed and filtered timeseries,
+# see class MHT
+CACHE_DIR = Path.home() / ".cache" / "MHT_read_file"
+CACHE_VERSION = 1
+
 class MHT():
-    def __init__(self):
+    """Data of a recorded run. Only the header info is read in when opening a
+    log file. Each timeseries, e.g. `mht.T_TC_01`, is loaded on first access
+    of its attribute and, when listed in `channels`, low-pass filtered. The
+    unfiltered data stays available via `get_raw()`. The timeseries of a run
+    are the columns listed in `names`, as stored in the log.
+
+    Raw and filtered timeseries are cached in memory separately. When
+    `cache_dir` is given, they are also cached on disk in a subfolder of
+    `cache_dir` keyed by the path, modification time and size of the log and
+    by the filter settings. Reopening the same log hence memory-maps the
+    cached arrays instead of parsing and filtering again. A binary log is
+    memory-mapped as is, so only its filtered timeseries get cached. The disk
+    cache is never evicted, so clear `cache_dir` by hand when it grows.
+    """
+    def __init__(self, filepath=None, f3dB_LP=F3DB_LP,
+                 channels=FILTERED_CHANNELS, use_sos=False,
+                 cache_dir=None):
+        self.names         = ()      # Column names, as stored in the log
         self.filename      = ''
         self.header        = ['']
         self.gravity               = np.nan
         self.area_meas_section     = np.nan
         self.GVF_porthole_distance = np.nan
         self.density_liquid        = np.nan
-        self.time          = np.array([])
-        self.wall_time     = np.array([])
-        self.Q_tunnel_setp = np.array([])
-        self.Q_tunnel      = np.array([])
-        self.S_pump_setp   = np.array([])
-        self.Q_bubbles     = np.array([])
-        self.Pdiff_GVF     = np.array([])
-        self.T_TC_01       = np.array([])
-        self.T_TC_02       = np.array([])
-        self.T_TC_03       = np.array([])
-        self.T_TC_04       = np.array([])
-        self.T_TC_05       = np.array([])
-        self.T_TC_06       = np.array([])
-        self.T_TC_07       = np.array([])
-        self.T_TC_08       = np.array([])
-        self.T_TC_09       = np.array([])
-        self.T_TC_10       = np.array([])
-        self.T_TC_11       = np.array([])
-        self.T_TC_12       = np.array([])
-        self.T_ambient     = np.array([])
-        self.T_inlet       = np.array([])
-        self.T_outlet      = np.array([])
-        self.T_chill_setp  = np.array([])
-        self.T_chill       = np.array([])
-        self.P_PSU_1       = np.array([])
-        self.P_PSU_2       = np.array([])
-        self.P_PSU_3       = np.array([])
-
-def MHT_read_file(filepath=None):
+        self.units                 = dict()  # Unit of each column
+
+        self.f3dB_LP  = f3dB_LP
+        self.channels = list(channels)
+        self.use_sos  = use_sos
+
+        self._filepath = filepath
+        self._binary_table = None   # Memory-mapped binary log
+        self._raw = dict()
+        self._filtered = dict()
+        self._cache_dir = None      # Disk cache of this log file
+
+        if filepath is not None:
+            self._open(cache_dir)
+
+            for name in self.channels:
+                if name not in self.names and name not in FILTERED_CHANNELS:
+                    raise Exception("Unknown channel '%s' to filter." % name)
+
+    def __getattr__(self, name):
+        # Only called when `name` is not an attribute yet: the timeseries
+        if name not in self.names and name not in self.channels:
+            raise AttributeError("'MHT' object has no attribute '%s'" % name)
+        if self._filepath is None:
+            return np.array([])
+        if self.f3dB_LP is not None and name in self.channels:
+            return self.get_filtered([name])[0]
+        return self.get_raw(name)
+
+    def get_raw(self, name):
+        """Returns the unfiltered timeseries `name`, loading it when needed.
+        Timeseries missing from the log, e.g. T_ambient in older logs, are
+        returned as all NaN.
+        """
+        if name in self._raw:
+            return self._raw[name]
+        if self._filepath is None:
+            return np.array([])
+
+        if name not in self.names:
+            self._raw[name] = np.full(len(self.get_raw('time')), np.nan)
+            return self._raw[name]
+
+        if self._binary_table is not None:
+            table = self._binary_table
+            if name == 'wall_time' and table.dtype[name].kind == 'S':
+                self._raw[name] = wall_time_to_seconds(table[name])
+            else:
+                self._raw[name] = np.ascontiguousarray(table[name])
+            return self._raw[name]
+
+        # Text log: Either all timeseries are in the disk cache, or the whole
+        # file has to be parsed
+        arrays = [_load_cached(self._cache_file("raw", ch))
+                  for ch in self.names]
+        if all(array is not None for array in arrays):
+            self._raw.update(zip(self.names, arrays))
+        else:
+            [_, tmp_table] = _read_text_log(self._filepath, MHT())
+            for ch in self.names:
+                self._raw[ch] = np.ascontiguousarray(tmp_table[ch])
+                _save_cached(self._cache_file("raw", ch), self._raw[ch])
+
+        return self._raw[name]
+
+    def get_filtered(self, names=None):
+        """Returns a list of the low-pass filtered timeseries `names`, by
+        default all `channels`. The ones not yet filtered are filtered
+        together in a single call.
+        """
+        if names is None:
+            names = self.channels
+
+        todo = []
+        for name in names:
+            if name in self._filtered:
+                continue
+            array = _load_cached(self._cache_file(self._filter_key(), name))
+            if array is not None:
+                self._filtered[name] = array
+            else:
+                todo.append(name)
+
+        if todo:
+            time = self.get_raw('time')
+            f_s = 1/np.mean(np.diff(time))  # Original sampling frequency [Hz]
+            table = np.empty((len(time), len(todo)), order='F')
+            for (i_col, name) in enumerate(todo):
+                table[:, i_col] = self.get_raw(name)
+
+            table = low_pass_filter(table, f_s, self.f3dB_LP, self.use_sos)
+            for (i_col, name) in enumerate(todo):
+                self._filtered[name] = table[:, i_col]
+                _save_cached(self._cache_file(self._filter_key(), name),
+                             self._filtered[name])
+
+        return [self._filtered[name] for name in names]
+
+    def _open(self, cache_dir):
+        """Reads in the header info and sets up the disk cache."""
+        filepath = self._filepath
+        self.filename = filepath.name[0:-4]
+
+        if filepath.suffix.lower() == BINARY_LOG_SUFFIX:
+            [self._binary_table, metadata] = read_binary_log(filepath)
+            self.names = self._binary_table.dtype.names
+            self.gravity = metadata.get('gravity', np.nan)
+            self.area_meas_section = metadata.get('area_meas_section', np.nan)
+            self.GVF_porthole_distance = metadata.get('GVF_porthole_distance',
+                                                      np.nan)
+            self.density_liquid = metadata.get('density_liquid', np.nan)
+            self.units = metadata.get('units', dict())
+
+            # Same header lines as found in the text log
+            self.header = [
+                "Gravity [m2/s]:\t%.2f" % self.gravity,
+                "Area meas. section [m2]:\t%.4f" % self.area_meas_section,
+                "GVF porthole distance [m]:\t%.3f" % self.GVF_porthole_distance,
+                "Density liquid [kg/m3]:\t%.0f" % self.density_liquid]
+        else:
+            with filepath.open('rb') as f:
+                [self.header, names, units, _] = _read_text_header(
+                        f.read(2**16))
+            self.names = tuple(names)
+            self.units = dict(zip(names, units))
+            _parse_header_info(self, self.header)
+
+        if cache_dir is not None:
+            stat = filepath.stat()
+            key = "%s|%i|%i|%i" % (filepath.resolve(), stat.st_mtime_ns,
+                                   stat.st_size, CACHE_VERSION)
+            self._cache_dir = (Path(cache_dir) /
+                               hashlib.sha1(key.encode()).hexdigest()[:16])
+
+    def _filter_key(self):
+        return "LP_%g_%s" % (self.f3dB_LP, "sos" if self.use_sos else "ba")
+
+    def _cache_file(self, subfolder, name):
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / subfolder / (name + ".npy")
+
+def _load_cached(path):
+    """Memory-maps an array from the disk cache. Returns None when absent."""
+    if path is None or not path.is_file():
+        return None
+    try:
+        return np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+def _save_cached(path, array):
+    """Stores an array in the disk cache. A failure, e.g. a read-only disk,
+    only means there is no caching.
+    """
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path_tmp = path.with_name(path.name + ".tmp")
+        with path_tmp.open('wb') as f:
+            np.save(f, array)
+        os.replace(path_tmp, path)
+    except OSError:
+        pass
+
+def low_pass_filter(table, f_s, f3dB_LP=F3DB_LP, use_sos=False):
+    """Applies a zero-phase 2nd order Butterworth low-pass filter to each
+    column of the 2-D array `table` in a single call.
+
+    Gaps of NaN are linearly interpolated over before filtering and are NaN
+    again in the result. Columns holding only NaN, e.g. a sensor that was
+    not connected, are passed through as is.
+
+    Args:
+        table (numpy.ndarray): 2-D array with a timeseries per column,
+            preferably in Fortran order
+        f_s (float): sampling frequency [Hz]
+        f3dB_LP (float): low-pass cut-off frequency [Hz]
+        use_sos (bool): filter using second-order sections
+
+    Returns: filtered copy of `table`
+    """
+    table = np.array(table, dtype=np.float64, order='F')
+    if table.shape[0] == 0:
+        return table
+
+    is_nan = np.isnan(table)
+    has_nan = is_nan.any(axis=0)
+    all_nan = is_nan.all(axis=0)
+    idx = np.arange(table.shape[0])
+    for i_col in np.flatnonzero(has_nan & ~all_nan):
+        ok = ~is_nan[:, i_col]
+        table[:, i_col] = np.interp(idx, idx[ok], table[ok, i_col])
+
+    cols = np.flatnonzero(~all_nan)
+    if len(cols) == len(all_nan):
+        data = table
+    else:
+        data = np.asfortranarray(table[:, cols])
+
+    # Filter along the time axis. The transpose of the Fortran ordered table
+    # has each timeseries contiguous in memory, which scipy filters fastest.
+    if use_sos:
+        sos = signal.butter(2, f3dB_LP / (f_s/2), 'lowpass', output='sos')
+        data = signal.sosfiltfilt(sos, data.T, axis=-1).T
+    else:
+        filt_b, filt_a = signal.butter(2, f3dB_LP / (f_s/2), 'lowpass')
+        data = signal.filtfilt(filt_b, filt_a, data.T, axis=-1).T
+
+    table[:, cols] = data
+    table[is_nan] = np.nan
+    return table
+
+def wall_time_to_seconds(wall_time):
+    """Converts an array of byte strings 'HH:mm:ss.zzz' into seconds since
+    midnight.
+    """
+    d = (np.ascontiguousarray(wall_time, dtype='S12').view(np.uint8)
+         .reshape(-1, 12).astype(np.float64) - ord('0'))
+    return (((d[:, 0] * 10 + d[:, 1]) * 3600 +
+             (d[:, 3] * 10 + d[:, 4]) * 60) +
+            ((d[:, 6] * 10 + d[:, 7]) * 1000 +
+             d[:, 9] * 100 + d[:, 10] * 10 + d[:, 11]) / 1e3)
+
+def read_binary_log(filepath):
+    """Memory-maps a binary log written by `DvG_pyqt_FileLogger`.
+
+    Args:
+        filepath (pathlib.Path): path to the binary log to open
+
+    Returns: tuple (table, metadata), where `table` is a read-only
+        `numpy.memmap` structured array and `metadata` the dict stored in the
+        header.
+    """
+    with filepath.open('rb') as f:
+        magic = f.read(len(BINARY_LOG_MAGIC))
+        if magic != BINARY_LOG_MAGIC:
+            raise Exception("Incorrect file format. Not a binary log or an "
+                            "unsupported version.")
+        header_len = struct.unpack("<I", f.read(4))[0]
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    dtype = np.dtype([tuple(field) for field in header['dtype']])
+    offset = len(BINARY_LOG_MAGIC) + 4 + header_len
+
+    # Ignore a partially written last record, e.g. when the logging program
+    # got killed
+    N_records = (filepath.stat().st_size - offset) // dtype.itemsize
+    if N_records == 0:
+        table = np.zeros(0, dtype=dtype)
+    else:
+        table = np.memmap(filepath, dtype=dtype, mode='r', offset=offset,
+                          shape=(N_records,))
+
+    return (table, header['metadata'])
+
+def MHT_read_file(filepath=None, f3dB_LP=F3DB_LP, channels=FILTERED_CHANNELS,
+                  use_sos=False, cache_dir=None):
     """ Reads in a log file acquired with the Python MHT Tunnel Control program
     Args:
-        filepath (pathlib.Path, str): path to the data file to open
+        filepath (pathlib.Path, str): path to the data file to open. Either a
+            text log (*.txt) or a binary log (*.bin).
+        f3dB_LP (float, optional): low-pass cut-off frequency [Hz]. Pass None
+            to skip filtering.
+        channels (list of str, optional): names of the timeseries to filter.
+        use_sos (bool, optional): filter using second-order sections instead
+            of transfer function coefficients. Numerically more robust at
+            cut-off frequencies far below the sampling frequency.
+        cache_dir (pathlib.Path, optional): folder of the disk cache, e.g.
+            `CACHE_DIR`. No disk cache by default.
 
-    Returns: instance of MHT class
+    Returns: instance of MHT class, which loads the timeseries on first access
     """
     if isinstance(filepath, str):
         filepath = Path(filepath)
@@ -67,116 +368,137 @@ def MHT_read_file(filepath=None):
     if not filepath.is_file():
         raise Exception("File can not be found\n %s" % filepath._str)
 
-    with filepath.open() as f:
-        mht = MHT()
-
-        # Scan the first lines for the start of the header and data sections
-        MAX_LINES = 100  # Stop scanning after this number of lines
-        str_header = []
-        success = False
-        for i_line in range(MAX_LINES):
-            str_line = f.readline().strip()
-
-            if str_line.upper() == "[HEADER]":
-                # Simply skip
-                pass
-            elif str_line.upper() == "[DATA]":
-                # Found data section. Exit loop.
-                i_line_data = i_line
-                success = True
-                break
+    return MHT(filepath, f3dB_LP, channels, use_sos, cache_dir)
+
+def _read_text_log(filepath, mht):
+    """Parses the header and data sections of a text log in a single pass over
+    the file contents. The header info is stored into `mht`.
+
+    Returns: tuple (str_header, tmp_table), where `tmp_table` is a dict of
+        numpy arrays keyed by column name.
+    """
+    raw = filepath.read_bytes()
+    [str_header, names, _, pos] = _read_text_header(raw)
+    _parse_header_info(mht, str_header)
+
+    # Drop an incomplete last line, e.g. due to a crash of the logging program
+    tmp_table = _parse_numeric_table(raw[pos:raw.rfind(b"\n") + 1], names)
+
+    return (str_header, tmp_table)
+
+def _read_text_header(raw):
+    """Scans the first lines of the raw bytes `raw` of a text log for the
+    header and data sections.
+
+    Returns: tuple (str_header, names, units, pos), where `names` are the
+        column names, `units` their units without brackets and `pos` is the
+        byte position where the data starts.
+    """
+    MAX_LINES = 100  # Stop scanning after this number of lines
+    str_header = []
+    success = False
+    pos = 0
+    for i_line in range(MAX_LINES):
+        i_end = raw.find(b"\n", pos)
+        if i_end == -1:
+            break
+        str_line = raw[pos:i_end].decode().strip()
+        pos = i_end + 1
+
+        if str_line.upper() == "[HEADER]":
+            # Simply skip
+            pass
+        elif str_line.upper() == "[DATA]":
+            # Found data section. Exit loop.
+            success = True
+            break
+        else:
+            # We must be in the header section now
+            str_header.append(str_line)
+
+    if not success:
+        raise Exception("Incorrect file format. Could not find [DATA] "
+                        "section.")
+
+    # Read the line with units followed by the line with column names
+    i_end = raw.find(b"\n", pos)
+    units = [unit.strip("[]")
+             for unit in raw[pos:i_end].decode().strip().split("\t")]
+    pos = i_end + 1
+    i_end = raw.find(b"\n", pos)
+    names = raw[pos:i_end].decode().strip().split("\t")
+
+    return (str_header, names, units, i_end + 1)
+
+def _parse_header_info(mht, str_header):
+    """Parses info out of the header lines into `mht`."""
+    for line in str_header:
+        if line.find("Gravity [m2/s]:") == 0:
+            parts = line.split("\t")
+            mht.gravity = float(parts[1])
+        if line.find("Area meas. section [m2]:") == 0:
+            parts = line.split("\t")
+            mht.area_meas_section = float(parts[1])
+        if line.find("GVF porthole distance [m]:") == 0:
+            parts = line.split("\t")
+            mht.GVF_porthole_distance = float(parts[1])
+        if line.find("Density liquid [kg/m3]:") == 0:
+            parts = line.split("\t")
+            mht.density_liquid = float(parts[1])
+
+def _parse_numeric_table(data, names):
+    """Parses the data section `data` of a text log, i.e. complete lines of
+    tab-separated numbers, using `np.loadtxt` with an explicit dtype. The
+    `wall_time` column 'HH:mm:ss.zzz' is returned as seconds since midnight.
+
+    Returns: dict of numpy arrays keyed by column name.
+    """
+    if not data.strip():
+        return {name: np.zeros(0) for name in names}
+
+    dtype = np.dtype([(name, "S12" if name == "wall_time" else np.float64)
+                      for name in names])
+    try:
+        records = np.loadtxt(io.BytesIO(data), delimiter="\t", dtype=dtype,
+                             ndmin=1)
+    except ValueError:
+        # Malformed lines, e.g. with a missing field
+        return _parse_numeric_table_slow(data, names)
+
+    tmp_table = dict()
+    for name in names:
+        if name == "wall_time":
+            wall_time = np.ascontiguousarray(records[name])
+            d = wall_time.view(np.uint8).reshape(-1, 12)
+            if (np.all(d[:, 2] == ord(":")) and np.all(d[:, 5] == ord(":"))
+                    and np.all(d[:, 8] == ord("."))):
+                tmp_table[name] = wall_time_to_seconds(wall_time)
             else:
-                # We must be in the header section now
-                str_header.append(str_line)
-
-        if not success:
-            raise Exception("Incorrect file format. Could not find [DATA] "
-                            "section.")
-
-        # Read in all data columns including column names
-        tmp_table = np.genfromtxt(filepath._str, delimiter='\t',
-                                  names=True,
-                                  skip_header=i_line_data+2)
-
-        # Parse info out of the header
-        for line in str_header:
-            if line.find("Gravity [m2/s]:") == 0:
-                parts = line.split("\t")
-                mht.gravity = float(parts[1])
-            if line.find("Area meas. section [m2]:") == 0:
-                parts = line.split("\t")
-                mht.area_meas_section = float(parts[1])
-            if line.find("GVF porthole distance [m]:") == 0:
-                parts = line.split("\t")
-                mht.GVF_porthole_distance = float(parts[1])
-            if line.find("Density liquid [kg/m3]:") == 0:
-                parts = line.split("\t")
-                mht.density_liquid = float(parts[1])
-
-        # Rebuild into a Matlab style 'struct'
-        mht.filename      = filepath.name[0:-4]
-        mht.header        = str_header
-        mht.time          = tmp_table['time']
-        mht.wall_time     = tmp_table['wall_time']
-        mht.Q_tunnel_setp = tmp_table['Q_tunnel_setp']
-        mht.Q_tunnel      = tmp_table['Q_tunnel']
-        mht.S_pump_setp   = tmp_table['S_pump_setp']
-        mht.Q_bubbles     = tmp_table['Q_bubbles']
-        mht.Pdiff_GVF     = tmp_table['Pdiff_GVF']
-        mht.T_TC_01       = tmp_table['T_TC_01']
-        mht.T_TC_02       = tmp_table['T_TC_02']
-        mht.T_TC_03       = tmp_table['T_TC_03']
-        mht.T_TC_04       = tmp_table['T_TC_04']
-        mht.T_TC_05       = tmp_table['T_TC_05']
-        mht.T_TC_06       = tmp_table['T_TC_06']
-        mht.T_TC_07       = tmp_table['T_TC_07']
-        mht.T_TC_08       = tmp_table['T_TC_08']
-        mht.T_TC_09       = tmp_table['T_TC_09']
-        mht.T_TC_10       = tmp_table['T_TC_10']
-        mht.T_TC_11       = tmp_table['T_TC_11']
-        mht.T_TC_12       = tmp_table['T_TC_12']
-        try:
-            mht.T_ambient = tmp_table['T_ambient']
-        except ValueError:
-            mht.T_ambient = np.nan * len(mht.time)
-        mht.T_inlet       = tmp_table['T_inlet']
-        mht.T_outlet      = tmp_table['T_outlet']
-        mht.T_chill_setp  = tmp_table['T_chill_setp']
-        mht.T_chill       = tmp_table['T_chill']
-        mht.P_PSU_1       = tmp_table['P_PSU_1']
-        mht.P_PSU_2       = tmp_table['P_PSU_2']
-        mht.P_PSU_3       = tmp_table['P_PSU_3']
-        
-        if 1:
-            # Apply low-pass filtering to specific timeseries
-            f_s = 1/np.mean(np.diff(mht.time))  # Original sampling frequency [Hz]
-            f3dB_LP = 0.1                       # Low-pass cut-off frequency: 0.1 [Hz]
-            filt_b, filt_a = signal.butter(2, f3dB_LP / (f_s/2), 'lowpass');
-            
-            mht.Q_tunnel  = signal.filtfilt(filt_b, filt_a, mht.Q_tunnel)
-            mht.Q_bubbles = signal.filtfilt(filt_b, filt_a, mht.Q_bubbles)
-            mht.Pdiff_GVF = signal.filtfilt(filt_b, filt_a, mht.Pdiff_GVF)
-            mht.T_TC_01   = signal.filtfilt(filt_b, filt_a, mht.T_TC_01)
-            mht.T_TC_02   = signal.filtfilt(filt_b, filt_a, mht.T_TC_02)
-            mht.T_TC_03   = signal.filtfilt(filt_b, filt_a, mht.T_TC_03)
-            mht.T_TC_04   = signal.filtfilt(filt_b, filt_a, mht.T_TC_04)
-            mht.T_TC_05   = signal.filtfilt(filt_b, filt_a, mht.T_TC_05)
-            mht.T_TC_06   = signal.filtfilt(filt_b, filt_a, mht.T_TC_06)
-            mht.T_TC_07   = signal.filtfilt(filt_b, filt_a, mht.T_TC_07)
-            mht.T_TC_08   = signal.filtfilt(filt_b, filt_a, mht.T_TC_08)
-            mht.T_TC_09   = signal.filtfilt(filt_b, filt_a, mht.T_TC_09)
-            mht.T_TC_10   = signal.filtfilt(filt_b, filt_a, mht.T_TC_10)
-            mht.T_TC_11   = signal.filtfilt(filt_b, filt_a, mht.T_TC_11)
-            mht.T_TC_12   = signal.filtfilt(filt_b, filt_a, mht.T_TC_12)
-            try:
-              mht.T_ambient = signal.filtfilt(filt_b, filt_a, mht.T_ambient)
-            except:
-              pass
-            mht.T_inlet   = signal.filtfilt(filt_b, filt_a, mht.T_inlet)
-            mht.T_outlet  = signal.filtfilt(filt_b, filt_a, mht.T_outlet)
-            mht.T_chill   = signal.filtfilt(filt_b, filt_a, mht.T_chill)
-            mht.P_PSU_1   = signal.filtfilt(filt_b, filt_a, mht.P_PSU_1)
-            mht.P_PSU_2   = signal.filtfilt(filt_b, filt_a, mht.P_PSU_2)
-            mht.P_PSU_3   = signal.filtfilt(filt_b, filt_a, mht.P_PSU_3)
-        
-    return mht
\ No newline at end of file
+                tmp_table[name] = np.array([_time_of_day_to_seconds(text)
+                                            for text in wall_time])
+        else:
+            tmp_table[name] = records[name]
+
+    return tmp_table
+
+def _parse_numeric_table_slow(data, names):
+    """Fallback parser for data that `np.loadtxt` can not handle. Skips lines
+    with the wrong number of fields.
+    """
+    converters = {i_col: _time_of_day_to_seconds
+                  for (i_col, name) in enumerate(names)
+                  if name == "wall_time"}
+    table = np.genfromtxt(io.BytesIO(data), delimiter="\t",
+                          converters=converters, invalid_raise=False)
+    table = table.reshape(-1, len(names))
+    return {name: table[:, i_col] for (i_col, name) in enumerate(names)}
+
+def _time_of_day_to_seconds(text):
+    """Converts 'HH:mm:ss.zzz' into seconds since midnight."""
+    try:
+        if isinstance(text, bytes):
+            text = text.decode()
+        [hours, minutes, seconds] = text.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return np.nan
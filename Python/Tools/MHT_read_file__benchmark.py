@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MHT_read_file__benchmark.py
+
+Benchmark of reading in a synthetic log of a 24 hour run at 10 Hz, comparing
+the former `np.genfromtxt` based text reader against the current single-pass
+`np.loadtxt` text reader and the memory-mapped binary log. The low-pass
+filtering is left out, as it is identical for all readers. Also checks that
+the current text reader returns the exact same values as `np.genfromtxt`.
+
+Dennis van Gils
+17-10-2026
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import MHT_read_file as R
+
+# The binary log writer lives with the control program, one folder up
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from DvG_pyqt_FileLogger import write_binary_log_header
+
+DURATION_HOURS = 24
+SAMPLE_RATE = 10            # [Hz]
+CHUNK_ROWS = 100000         # Rows formatted at once when creating the log
+
+NAMES = (["time", "wall_time", "Q_tunnel_setp", "Q_tunnel", "S_pump_setp",
+          "Q_bubbles", "Pdiff_GVF"] +
+         ["T_TC_%02i" % i for i in range(1, 13)] +
+         ["T_ambient", "T_inlet", "T_outlet", "T_chill_setp", "T_chill",
+          "P_PSU_1", "P_PSU_2", "P_PSU_3"])
+
+ROW_FORMAT = ("%.3f\t%02i:%02i:%06.3f\t%.3f\t%.3f\t%.3f\t%.2f\t%.2f\t" +
+              "%.2f\t" * 12 + "%.3f\t%.3f\t%.3f\t%.1f\t%.1f\t%.2f\t%.2f\t%.2f\n")
+
+def create_synthetic_log(path_txt, path_bin, N_rows):
+    """Writes a text log and a binary log holding the same random data."""
+    rng = np.random.default_rng(0)
+    dtype = np.dtype([("time", "<f8"), ("wall_time", "S12")] +
+                     [(name, "<f8") for name in NAMES[2:]])
+
+    with path_txt.open("w") as f_txt, path_bin.open("wb") as f_bin:
+        f_txt.write("[HEADER]\n"
+                    "Gravity [m2/s]:\t9.81\n"
+                    "Area meas. section [m2]:\t0.0180\n"
+                    "GVF porthole distance [m]:\t0.800\n"
+                    "Density liquid [kg/m3]:\t998\n"
+                    "[DATA]\n")
+        f_txt.write("\t".join(["[-]"] * len(NAMES)) + "\n")
+        f_txt.write("\t".join(NAMES) + "\n")
+
+        write_binary_log_header(f_bin, dtype,
+                                {"gravity": 9.81, "area_meas_section": 0.018,
+                                 "GVF_porthole_distance": 0.8,
+                                 "density_liquid": 998})
+
+        for i_start in range(0, N_rows, CHUNK_ROWS):
+            N = min(CHUNK_ROWS, N_rows - i_start)
+            t = (i_start + np.arange(N)) / SAMPLE_RATE
+            wall = (t + 12 * 3600) % 86400
+            values = 20 + rng.standard_normal((N, len(NAMES) - 2))
+            values[rng.random(values.shape) < 1e-3] = np.nan
+
+            lines = [ROW_FORMAT % ((t[i], wall[i] // 3600,
+                                    wall[i] % 3600 // 60, wall[i] % 60) +
+                                   tuple(values[i]))
+                     for i in range(N)]
+            f_txt.write("".join(lines))
+
+            records = np.zeros(N, dtype=dtype)
+            records["time"] = t
+            records["wall_time"] = [line.split("\t")[1] for line in lines]
+            for i_col, name in enumerate(NAMES[2:]):
+                records[name] = values[:, i_col]
+            f_bin.write(records.tobytes())
+
+def genfromtxt_reference(filepath):
+    """The former text reader: Line-by-line header scan followed by
+    `np.genfromtxt`, opening the file twice."""
+    with filepath.open() as f:
+        for i_line in range(100):
+            if f.readline().strip().upper() == "[DATA]":
+                break
+    return np.genfromtxt(str(filepath), delimiter="\t", names=True,
+                         skip_header=i_line + 2)
+
+def time_it(fun, *args):
+    t0 = time.perf_counter()
+    result = fun(*args)
+    return (time.perf_counter() - t0, result)
+
+# ------------------------------------------------------------------------------
+#   Main
+# ------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    N_rows = DURATION_HOURS * 3600 * SAMPLE_RATE
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path_txt = Path(tmp_dir) / "synthetic.txt"
+        path_bin = Path(tmp_dir) / "synthetic.bin"
+
+        print("Creating synthetic %i h log at %i Hz: %i rows..." %
+              (DURATION_HOURS, SAMPLE_RATE, N_rows))
+        create_synthetic_log(path_txt, path_bin, N_rows)
+        print("Text log  : %.0f MB" % (path_txt.stat().st_size / 1e6))
+        print("Binary log: %.0f MB\n" % (path_bin.stat().st_size / 1e6))
+
+        [t_old, table_old] = time_it(genfromtxt_reference, path_txt)
+        [t_new, [_, table_new]] = time_it(R._read_text_log, path_txt, R.MHT())
+        [t_bin, _] = time_it(R.read_binary_log, path_bin)
+
+        for name in NAMES:
+            if name == "wall_time":
+                continue  # Not parsed by genfromtxt, NaN
+            assert np.array_equal(table_old[name], table_new[name],
+                                  equal_nan=True), name
+
+        print("%-28s  %9s  %9s" % ("reader", "time [s]", "speed-up"))
+        print("%-28s  %9.3f  %8.1fx" % ("genfromtxt (former)", t_old, 1))
+        print("%-28s  %9.3f  %8.1fx" % ("loadtxt text", t_new,
+                                        t_old / t_new))
+        print("%-28s  %9.3f  %8.1fx" % ("memory-mapped binary", t_bin,
+                                        t_old / t_bin))